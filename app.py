@@ -2,9 +2,10 @@
 Sistema de Matrícula Escolar 2026
 Aplicação principal em Streamlit
 """
+import os
 import streamlit as st
 from data_manager import DataManager
-from modulos import cadastro_geral, pei, socioeconomico, saude, questionario_saeb, anamnese_pei, dashboard, crud, busca, pdf_generator, export_zip, backup, registro_presenca, frequencia_aula, registro_lote, upload_facial_bulk
+from modulos import cadastro_geral, pei, socioeconomico, saude, questionario_saeb, anamnese_pei, dashboard, crud, busca, pdf_generator, export_zip, backup, registro_presenca, frequencia_aula, registro_lote, upload_facial_bulk, diagnostico
 
 # Configuração da página
 st.set_page_config(
@@ -29,10 +30,20 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# Inicializar data manager
+# Inicializar data manager (backend 'csv' por padrão; MATRICULA_BACKEND=sqlite usa SQLite)
+# MATRICULA_WRITE_BEHIND=attendance agrupa as inserções de presença em escritas periódicas
+# (MATRICULA_DURABILITY=fsync força a gravação física a cada flush)
+# MATRICULA_CACHE_MAX_MB limita a memória do cache de tabelas (cadastro e attendance ficam fixados)
 @st.cache_resource
 def get_data_manager():
-    return DataManager()
+    write_behind = [t.strip() for t in os.environ.get('MATRICULA_WRITE_BEHIND', '').split(',') if t.strip()]
+    cache_max_mb = os.environ.get('MATRICULA_CACHE_MAX_MB')
+    return DataManager(
+        backend=os.environ.get('MATRICULA_BACKEND', 'csv'),
+        write_behind=write_behind,
+        durability=os.environ.get('MATRICULA_DURABILITY', 'buffered'),
+        cache_max_bytes=int(float(cache_max_mb) * 1024 * 1024) if cache_max_mb else None
+    )
 
 data_manager = get_data_manager()
 
@@ -61,33 +72,37 @@ with st.sidebar:
             "🔍 Busca Inteligente",
             "📄 Gerar PDF Individual",
             "📦 Exportar em Lote (ZIP)",
-            "💾 Backup e Restauração"
+            "💾 Backup e Restauração",
+            "🩺 Diagnóstico"
         ],
         index=0
     )
     
     st.markdown("---")
     
-    # Estatísticas rápidas
+    # Estatísticas rápidas (cadastro e pei lidos na mesma versão)
     st.subheader("📈 Estatísticas")
-    df_cadastro = data_manager.get_data('cadastro')
-    
-    if len(df_cadastro) > 0:
-        st.metric("Total de Alunos", len(df_cadastro))
+    with data_manager.snapshot():
+        df_cadastro = data_manager.get_data('cadastro')
         
-        ativos = len(df_cadastro[df_cadastro['status'] == 'Ativo'])
-        st.metric("Alunos Ativos", ativos)
-        
-        df_pei = data_manager.get_data('pei')
-        com_pei = len(df_pei[df_pei['necessidade_especial'] == 'Sim'])
-        st.metric("Com PEI", com_pei)
-    else:
-        st.info("Nenhum aluno cadastrado")
+        if len(df_cadastro) > 0:
+            st.metric("Total de Alunos", len(df_cadastro))
+            
+            ativos = len(df_cadastro[df_cadastro['status'] == 'Ativo'])
+            st.metric("Alunos Ativos", ativos)
+            
+            df_pei = data_manager.get_data('pei')
+            com_pei = len(df_pei[df_pei['necessidade_especial'] == 'Sim'])
+            st.metric("Com PEI", com_pei)
+        else:
+            st.info("Nenhum aluno cadastrado")
     
     st.markdown("---")
     st.caption("Sistema de Matrícula Escolar v1.0")
 
-# Conteúdo principal
+# Conteúdo principal. Páginas de consulta leem todas as tabelas em uma
+# snapshot (mesma versão durante a renderização); páginas com câmera e
+# formulários não, pois precisam ver as escritas feitas enquanto rodam
 if menu_opcao == "🏠 Início":
     st.title("🎓 Sistema de Matrícula Escolar 2026")
     st.markdown("---")
@@ -213,23 +228,30 @@ elif menu_opcao == "📦🖼️ Upload em Lote de Faces":
     upload_facial_bulk.render_upload_facial_bulk(data_manager)
 
 elif menu_opcao == "📊 Dashboard":
-    dashboard.render_dashboard(data_manager)
+    with data_manager.snapshot():
+        dashboard.render_dashboard(data_manager)
 
 elif menu_opcao == "⚙️ Gerenciamento (CRUD)":
     crud.render_crud(data_manager)
 
 elif menu_opcao == "🔍 Busca Inteligente":
-    busca.render_busca(data_manager)
+    with data_manager.snapshot():
+        busca.render_busca(data_manager)
 
 elif menu_opcao == "📄 Gerar PDF Individual":
-    pdf_generator.render_pdf_generator(data_manager)
+    with data_manager.snapshot():
+        pdf_generator.render_pdf_generator(data_manager)
 
 elif menu_opcao == "📦 Exportar em Lote (ZIP)":
-    export_zip.render_export_zip(data_manager)
+    with data_manager.snapshot():
+        export_zip.render_export_zip(data_manager)
 
 elif menu_opcao == "💾 Backup e Restauração":
     backup.render_backup(data_manager)
 
+elif menu_opcao == "🩺 Diagnóstico":
+    diagnostico.render_diagnostico(data_manager)
+
 # Footer
 st.markdown("---")
 st.markdown(
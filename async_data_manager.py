@@ -0,0 +1,248 @@
+"""
+Fachada asyncio do DataManager
+Leituras e escritas rodam em um executor de threads limitado, sem bloquear o event loop
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from data_manager import DataManager
+
+
+def _private(valor):
+    """
+    Cópia do resultado para um dos chamadores de uma leitura compartilhada
+    
+    DataFrames viram visões rasas (colunas atribuídas por um chamador não
+    aparecem para os outros; alterações no lugar pedem get_data(copy=True));
+    dicionários e listas são copiados por fora.
+    """
+    if isinstance(valor, pd.DataFrame):
+        return valor.copy(deep=False)
+    if isinstance(valor, dict):
+        return {chave: _private(v) for chave, v in valor.items()}
+    if isinstance(valor, list):
+        return [_private(v) for v in valor]
+    return valor
+
+
+class AsyncDataManager:
+    """
+    DataManager com métodos awaitable para event loops (API HTTP local, quiosque)
+    
+    Cada chamada roda em um ThreadPoolExecutor com max_workers threads; o
+    DataManager continua fazendo o controle de concorrência (leituras
+    compartilhadas, escritas exclusivas). Leituras idênticas em andamento
+    são unificadas (single-flight): chamadas que chegam enquanto a mesma
+    leitura ainda roda aguardam o resultado dela em vez de enfileirar outra.
+    Depois que uma escrita termina, leituras novas não aproveitam as que
+    começaram antes dela.
+    
+    Usar a partir de um único event loop.
+    
+    Example:
+        adm = AsyncDataManager(data_dir='data', max_workers=4)
+        df = await adm.get_data('cadastro')
+        novo_id = await adm.add_record('pei', {'aluno_id': 1, 'necessidade_especial': 'Não'})
+        ativos = await adm.query('cadastro').where('status', '=', 'Ativo').execute()
+    """
+    
+    def __init__(self, data_manager=None, max_workers=4, **kwargs):
+        """
+        Args:
+            data_manager: DataManager existente (None cria um com kwargs)
+            max_workers: Threads do executor (limite de chamadas simultâneas)
+            **kwargs: Argumentos do DataManager (data_dir, backend...)
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers deve ser ao menos 1: {max_workers}")
+        self.data_manager = data_manager if data_manager is not None else DataManager(**kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='matricula-async')
+        # Leituras em andamento: chave -> asyncio.Future compartilhado
+        self._in_flight = {}
+        # Leituras que aproveitaram outra em andamento
+        self.coalesced = 0
+    
+    async def _run(self, func, *args, **kwargs):
+        """Roda func no executor e aguarda o resultado"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    async def _single_flight(self, chave, func, *args, **kwargs):
+        """
+        Roda a leitura ou aguarda a idêntica que já está em andamento
+        
+        O resultado é compartilhado; cada chamador recebe a sua cópia
+        (_private). Cancelar um chamador não cancela a leitura dos outros.
+        """
+        futuro = self._in_flight.get(chave)
+        if futuro is None:
+            futuro = asyncio.ensure_future(self._run(func, *args, **kwargs))
+            self._in_flight[chave] = futuro
+            
+            def concluida(f):
+                # Uma escrita pode já ter tirado a leitura do mapa (e outra igual entrado)
+                if self._in_flight.get(chave) is f:
+                    del self._in_flight[chave]
+            futuro.add_done_callback(concluida)
+        else:
+            self.coalesced += 1
+        return _private(await asyncio.shield(futuro))
+    
+    async def _write(self, tipos, func, *args, **kwargs):
+        """
+        Roda uma escrita nas tabelas tipos
+        
+        Ao fim, as leituras dessas tabelas (e backups) ainda em andamento
+        deixam de ser reaproveitadas: quem pedir depois da escrita lê de novo.
+        """
+        try:
+            return await self._run(func, *args, **kwargs)
+        finally:
+            for chave in [c for c in self._in_flight if c[1] in tipos or c[0] == 'create_backup']:
+                del self._in_flight[chave]
+    
+    async def get_data(self, tipo, copy=False, columns=None):
+        """
+        Versão awaitable de DataManager.get_data
+        
+        Args:
+            tipo: Tipo de dado
+            copy: Se True, retorna uma cópia completa e independente
+            columns: Lista de colunas desejadas (None = todas)
+        
+        Returns:
+            DataFrame com os dados
+        """
+        chave = ('get_data', tipo, tuple(columns) if columns is not None else None)
+        df = await self._single_flight(chave, self.data_manager.get_data, tipo, columns=columns)
+        return df.copy() if copy else df
+    
+    async def get_record(self, tipo, record_id):
+        """Versão awaitable de DataManager.get_record"""
+        return await self._single_flight(('get_record', tipo, record_id),
+                                         self.data_manager.get_record, tipo, record_id)
+    
+    def query(self, tipo):
+        """
+        Query builder com execução awaitable
+        
+        Os filtros são encadeados como em DataManager.query; execute(),
+        count(), first(), paginate() e explain() devem ser aguardados.
+        
+        Returns:
+            AsyncQuery
+        """
+        return AsyncQuery(self, tipo)
+    
+    async def add_record(self, tipo, dados):
+        """
+        Versão awaitable de DataManager.add_record
+        
+        Returns:
+            int: ID do novo registro
+        
+        Raises:
+            ValueError: Se validação falhar
+        """
+        return await self._write({tipo}, self.data_manager.add_record, tipo, dados)
+    
+    async def add_records(self, tipo, registros):
+        """Versão awaitable de DataManager.add_records"""
+        return await self._write({tipo}, self.data_manager.add_records, tipo, registros)
+    
+    async def update_record(self, tipo, record_id, dados):
+        """Versão awaitable de DataManager.update_record"""
+        return await self._write({tipo}, self.data_manager.update_record, tipo, record_id, dados)
+    
+    async def delete_record(self, tipo, record_id):
+        """Versão awaitable de DataManager.delete_record"""
+        return await self._write({tipo}, self.data_manager.delete_record, tipo, record_id)
+    
+    async def execute_transaction(self, operations):
+        """Versão awaitable de DataManager.execute_transaction"""
+        return await self._write({op[1] for op in operations}, self.data_manager.execute_transaction, operations)
+    
+    async def create_backup(self, backup_path=None):
+        """
+        Versão awaitable de DataManager.create_backup
+        
+        Pedidos simultâneos para o mesmo destino (inclusive o automático,
+        com timestamp) geram um único ZIP.
+        
+        Returns:
+            str: Caminho do arquivo de backup criado
+        """
+        return await self._single_flight(('create_backup', None, backup_path),
+                                         self.data_manager.create_backup, backup_path)
+    
+    async def close(self):
+        """Grava os buffers de write-behind, encerra a thread de flush e o executor"""
+        await self._run(self.data_manager.close)
+        self._executor.shutdown(wait=False)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class AsyncQuery:
+    """
+    QueryBuilder do DataManager com execução awaitable
+    
+    where/order_by/limit/offset encadeiam como no QueryBuilder; consultas
+    idênticas em andamento são unificadas (single-flight).
+    """
+    
+    def __init__(self, async_manager, tipo):
+        self._adm = async_manager
+        self._tipo = tipo
+        self._builder = async_manager.data_manager.query(tipo)
+    
+    def where(self, campo, operador, valor):
+        self._builder.where(campo, operador, valor)
+        return self
+    
+    def order_by(self, campo, desc=False):
+        self._builder.order_by(campo, desc)
+        return self
+    
+    def limit(self, limit):
+        self._builder.limit(limit)
+        return self
+    
+    def offset(self, offset):
+        self._builder.offset(offset)
+        return self
+    
+    def _key(self, metodo, *args):
+        """Chave da consulta: tabela, filtros, ordenação, offset/limit e método"""
+        b = self._builder
+        return ('query', self._tipo, metodo, args, repr(b._filters), b._order_by, b._order_desc,
+                b._limit, b._offset)
+    
+    async def _run(self, metodo, *args):
+        return await self._adm._single_flight(self._key(metodo, *args), getattr(self._builder, metodo), *args)
+    
+    async def execute(self):
+        """Resultados da query (DataFrame)"""
+        return await self._run('execute')
+    
+    async def count(self):
+        """Número de resultados"""
+        return await self._run('count')
+    
+    async def first(self):
+        """Primeiro resultado (dict) ou None"""
+        return await self._run('first')
+    
+    async def paginate(self, page=1, page_size=50):
+        """Página de resultados (mesmo formato de QueryBuilder.paginate)"""
+        return await self._run('paginate', page, page_size)
+    
+    async def explain(self):
+        """Plano de execução (QueryBuilder.explain)"""
+        return await self._run('explain')
@@ -0,0 +1,204 @@
+"""
+Agregados de presença mantidos incrementalmente
+Usados pelo DataManager para contagens por dia/aluno/turma/turno, taxas de frequência e sequências de faltas
+"""
+import bisect
+import heapq
+from collections import Counter
+
+
+class AttendanceAggregates:
+    """
+    Contagens de presença por aluno, por dia e por grupo, atualizadas a cada registro
+    
+    Cada aluno guarda a lista ordenada das datas em que tem presença (com
+    repetição, uma entrada por registro), de modo que a contagem em um
+    intervalo é uma busca binária. Os dias letivos são os dias com ao menos
+    uma presença registrada. Registros sem data não entram nos agregados.
+    
+    Grupos (turno, ano_escolar) guardam a mesma lista ordenada com as datas
+    de todos os seus alunos; set_group move as datas de um aluno quando ele
+    muda de grupo, de modo que as presenças contam no grupo atual do aluno.
+    """
+    
+    def __init__(self):
+        self._dias = []
+        self._total_dia = {}
+        self._datas_aluno = {}
+        self._total = 0
+        # campo → {aluno_id: grupo} e campo → {grupo: datas ordenadas}
+        self._grupo_aluno = {}
+        self._datas_grupo = {}
+    
+    def __len__(self):
+        return self._total
+    
+    def add(self, aluno_id, data):
+        """Contabiliza um registro de presença"""
+        if not data:
+            return
+        if data not in self._total_dia:
+            self._total_dia[data] = 0
+            bisect.insort(self._dias, data)
+        self._total_dia[data] += 1
+        bisect.insort(self._datas_aluno.setdefault(aluno_id, []), data)
+        for campo, grupos in self._grupo_aluno.items():
+            if aluno_id in grupos:
+                bisect.insort(self._datas_grupo[campo][grupos[aluno_id]], data)
+        self._total += 1
+    
+    def remove(self, aluno_id, data):
+        """Desconta um registro de presença (sem efeito se não estiver contabilizado)"""
+        datas = self._datas_aluno.get(aluno_id)
+        if not data or not datas:
+            return
+        posicao = bisect.bisect_left(datas, data)
+        if posicao == len(datas) or datas[posicao] != data:
+            return
+        
+        del datas[posicao]
+        if not datas:
+            del self._datas_aluno[aluno_id]
+        for campo, grupos in self._grupo_aluno.items():
+            if aluno_id in grupos:
+                datas_grupo = self._datas_grupo[campo][grupos[aluno_id]]
+                del datas_grupo[bisect.bisect_left(datas_grupo, data)]
+        
+        self._total_dia[data] -= 1
+        if not self._total_dia[data]:
+            del self._total_dia[data]
+            del self._dias[bisect.bisect_left(self._dias, data)]
+        self._total -= 1
+    
+    def set_group(self, campo, aluno_id, grupo):
+        """
+        Define o grupo do aluno em campo (None tira o aluno de qualquer grupo)
+        
+        As datas já contabilizadas do aluno passam do grupo anterior para o novo.
+        """
+        grupos = self._grupo_aluno.setdefault(campo, {})
+        datas_grupo = self._datas_grupo.setdefault(campo, {})
+        anterior = grupos.get(aluno_id)
+        if anterior == grupo:
+            return
+        
+        datas = self._datas_aluno.get(aluno_id, [])
+        if anterior is not None:
+            del grupos[aluno_id]
+            if datas:
+                restantes = Counter(datas)
+                mantidas = []
+                for data in datas_grupo[anterior]:
+                    if restantes[data]:
+                        restantes[data] -= 1
+                    else:
+                        mantidas.append(data)
+                datas_grupo[anterior] = mantidas
+        if grupo is not None:
+            grupos[aluno_id] = grupo
+            datas_grupo[grupo] = list(heapq.merge(datas_grupo.get(grupo, []), datas))
+    
+    @staticmethod
+    def _slice(datas, inicio, fim):
+        """Posições [i, j) das datas entre inicio e fim (None = sem limite)"""
+        i = 0 if inicio is None else bisect.bisect_left(datas, inicio)
+        j = len(datas) if fim is None else bisect.bisect_right(datas, fim)
+        return i, j
+    
+    def school_days(self, inicio=None, fim=None):
+        """Dias com ao menos uma presença no intervalo, em ordem"""
+        i, j = self._slice(self._dias, inicio, fim)
+        return self._dias[i:j]
+    
+    def count(self, inicio=None, fim=None, aluno_id=None):
+        """Registros no intervalo (apenas do aluno, se informado)"""
+        if aluno_id is not None:
+            i, j = self._slice(self._datas_aluno.get(aluno_id, []), inicio, fim)
+            return j - i
+        return sum(self._total_dia[data] for data in self.school_days(inicio, fim))
+    
+    def group_of(self, campo, aluno_id):
+        """Grupo atual do aluno em campo (None se não tiver)"""
+        return self._grupo_aluno.get(campo, {}).get(aluno_id)
+    
+    def by_day(self, inicio=None, fim=None, aluno_id=None):
+        """
+        Registros por dia no intervalo
+        
+        Returns:
+            dict: data → número de registros (apenas do aluno, se informado)
+        """
+        if aluno_id is None:
+            return {data: self._total_dia[data] for data in self.school_days(inicio, fim)}
+        
+        contagem = {}
+        datas = self._datas_aluno.get(aluno_id, [])
+        i, j = self._slice(datas, inicio, fim)
+        for data in datas[i:j]:
+            contagem[data] = contagem.get(data, 0) + 1
+        return contagem
+    
+    def by_student(self, inicio=None, fim=None, top=None):
+        """
+        Registros por aluno no intervalo
+        
+        Args:
+            top: Se informado, apenas os top alunos com mais registros
+        
+        Returns:
+            dict: aluno_id → número de registros (decrescente)
+        """
+        contagem = {}
+        for aluno_id, datas in self._datas_aluno.items():
+            i, j = self._slice(datas, inicio, fim)
+            if j > i:
+                contagem[aluno_id] = j - i
+        
+        if top is not None:
+            maiores = heapq.nlargest(top, contagem.items(), key=lambda item: item[1])
+        else:
+            maiores = sorted(contagem.items(), key=lambda item: item[1], reverse=True)
+        return dict(maiores)
+    
+    def by_group(self, campo, inicio=None, fim=None):
+        """
+        Registros por grupo (set_group) no intervalo
+        
+        Returns:
+            dict: grupo → número de registros (decrescente; grupos sem registros ficam de fora)
+        """
+        contagem = {}
+        for grupo, datas in self._datas_grupo.get(campo, {}).items():
+            i, j = self._slice(datas, inicio, fim)
+            if j > i:
+                contagem[grupo] = j - i
+        return dict(sorted(contagem.items(), key=lambda item: item[1], reverse=True))
+    
+    def frequency(self, aluno_id, inicio=None, fim=None):
+        """
+        Frequência de um aluno sobre os dias letivos do intervalo
+        
+        Returns:
+            dict: present_days, school_days, rate (%), current_absence_streak
+                  (faltas seguidas até o último dia letivo) e longest_absence_streak
+        """
+        dias = self.school_days(inicio, fim)
+        datas = self._datas_aluno.get(aluno_id, [])
+        i, j = self._slice(datas, inicio, fim)
+        presentes = set(datas[i:j])
+        
+        sequencia = maior = 0
+        for data in dias:
+            if data in presentes:
+                sequencia = 0
+            else:
+                sequencia += 1
+                maior = max(maior, sequencia)
+        
+        return {
+            'present_days': len(presentes),
+            'school_days': len(dias),
+            'rate': len(presentes) / len(dias) * 100 if dias else 0.0,
+            'current_absence_streak': sequencia,
+            'longest_absence_streak': maior
+        }
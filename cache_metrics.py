@@ -0,0 +1,94 @@
+"""
+Métricas do cache do DataManager (acertos, faltas, tempo de carga, descartes e invalidações)
+Expostas como dicionário em get_cache_stats e em texto no formato do Prometheus
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+
+class CacheMetrics:
+    """
+    Contadores por tabela do uso do cache
+    
+    - hits/misses: leituras servidas pelo cache / que precisaram carregar a tabela
+    - evictions: DataFrames descartados para o cache caber no orçamento de
+      memória (cache_max_bytes)
+    - invalidations: DataFrames descartados porque a tabela mudou (escrita
+      deste ou de outro processo) ou por clear_cache
+    - load_seconds/index_seconds: tempo acumulado lendo a tabela do
+      armazenamento e construindo os índices
+    
+    Os contadores podem ser incrementados por várias threads ao mesmo tempo
+    (leituras compartilhadas do DataManager).
+    """
+    
+    COUNTERS = ('hits', 'misses', 'evictions', 'invalidations', 'load_seconds', 'index_seconds')
+    
+    def __init__(self):
+        self._valores = {contador: {} for contador in self.COUNTERS}
+        self._lock = threading.Lock()
+    
+    def increment(self, contador, tipo, valor=1):
+        """Soma valor ao contador da tabela"""
+        with self._lock:
+            por_tipo = self._valores[contador]
+            por_tipo[tipo] = por_tipo.get(tipo, 0) + valor
+    
+    @contextmanager
+    def timer(self, contador, tipo):
+        """Acumula no contador o tempo gasto dentro do bloco"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.increment(contador, tipo, time.perf_counter() - inicio)
+    
+    def reset(self):
+        """Zera todos os contadores"""
+        with self._lock:
+            for por_tipo in self._valores.values():
+                por_tipo.clear()
+    
+    def snapshot(self):
+        """
+        Cópia dos contadores
+        
+        Returns:
+            dict: contador → {tipo: valor}
+        """
+        with self._lock:
+            return {contador: dict(por_tipo) for contador, por_tipo in self._valores.items()}
+
+
+def prometheus_text(stats, prefixo='matricula_cache'):
+    """
+    Converte as estatísticas do cache para o formato texto do Prometheus
+    
+    Args:
+        stats: Dicionário retornado por DataManager.get_cache_stats()
+        prefixo: Prefixo dos nomes das métricas
+    
+    Returns:
+        str: Uma linha por métrica e tabela, com HELP e TYPE
+    """
+    metricas = [
+        ('hits', 'hits_total', 'counter', 'Leituras servidas pelo cache'),
+        ('misses', 'misses_total', 'counter', 'Leituras que carregaram a tabela do armazenamento'),
+        ('evictions', 'evictions_total', 'counter', 'DataFrames descartados pelo orçamento de memória'),
+        ('invalidations', 'invalidations_total', 'counter', 'DataFrames descartados por escrita ou clear_cache'),
+        ('load_seconds', 'load_seconds_total', 'counter', 'Tempo lendo tabelas do armazenamento'),
+        ('index_seconds', 'index_seconds_total', 'counter', 'Tempo construindo índices'),
+        ('cache_sizes', 'rows', 'gauge', 'Linhas em cache'),
+        ('memory_bytes', 'memory_bytes', 'gauge', 'Memória dos DataFrames em cache (deep)'),
+        ('pending_writes', 'pending_rows', 'gauge', 'Linhas no buffer de write-behind'),
+    ]
+    
+    linhas = []
+    for chave, nome, tipo_metrica, descricao in metricas:
+        nome = f"{prefixo}_{nome}"
+        linhas.append(f"# HELP {nome} {descricao}")
+        linhas.append(f"# TYPE {nome} {tipo_metrica}")
+        for tabela, valor in sorted(stats.get(chave, {}).items()):
+            linhas.append(f'{nome}{{table="{tabela}"}} {valor}')
+    return "\n".join(linhas) + "\n"
@@ -9,9 +9,81 @@ import shutil
 import tempfile
 from datetime import datetime
 import threading
+import bisect
+import atexit
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from storage import (create_storage, serialize_rows, filter_date_range, partition_keys, partition_order,
+                     PARTITIONED_TABLES)
+from search_index import TrigramIndex
+from attendance_stats import AttendanceAggregates
+from cache_metrics import CacheMetrics, prometheus_text
+from rwlock import ReadWriteLock
+from schema import (apply_categories, concat_categorical, allow_value, drop_unused_categories,
+                    apply_types, as_text, text_frame, align_value, canonical_value, invalid_values)
+
+# Modos de durabilidade do write-behind
+DURABILITY_MODES = ('buffered', 'fsync')
+
+# Campos do cadastro com totais de presença por grupo (get_attendance_stats)
+ATTENDANCE_GROUP_FIELDS = ('turno', 'ano_escolar')
+
+
+def _write_behind_loop(ref, parar, intervalo):
+    """Thread do write-behind: grava os buffers a cada intervalo enquanto o DataManager existir"""
+    while not parar.wait(intervalo):
+        data_manager = ref()
+        if data_manager is None:
+            return
+        try:
+            data_manager.flush()
+        except OSError:
+            # As linhas continuam no buffer e são gravadas no próximo intervalo
+            pass
+        del data_manager
+
+
+def _own_columns(df, colunas):
+    """Troca as colunas que serão alteradas no lugar por cópias (o resto segue compartilhado)"""
+    for coluna in colunas:
+        df[coluna] = df[coluna].copy()
+
+
+def _flush_at_exit(ref):
+    """Garante a gravação dos buffers de write-behind no encerramento do processo"""
+    data_manager = ref()
+    if data_manager is not None:
+        data_manager.close()
+
+
+class TableSnapshot:
+    """
+    Versões das tabelas fixadas por uma leitura (DataManager.snapshot)
+    
+    Cada DataFrame do cache é uma versão imutável da tabela: as escritas
+    colocam um DataFrame novo no cache em vez de alterar o existente
+    (copy-on-write). A snapshot guarda, para cada tabela lida, a versão
+    vigente quando foi aberta; versões substituídas depois disso só ficam
+    em memória enquanto alguma snapshot aberta as referencia.
+    """
+    
+    def __init__(self):
+        self.thread = threading.get_ident()
+        # tipo -> DataFrame (versão fixada)
+        self.tables = {}
+        # Índices de texto/agregados das versões que já não são as do cache
+        self.indexes = {}
+    
+    def pinned_tables(self):
+        """Tipos com versão fixada"""
+        return sorted(self.tables)
+
 
 class DataManager:
-    def __init__(self, data_dir='data'):
+    def __init__(self, data_dir='data', append_only=True, backend='csv', write_behind=(),
+                 flush_interval_ms=500, flush_max_rows=100, durability='buffered',
+                 cache_max_bytes=None, pinned_tables=('cadastro', 'attendance')):
         self.data_dir = data_dir
         # Use absolute paths to avoid issues with relative paths
         base_dir = os.path.dirname(os.path.abspath(data_dir))
@@ -32,16 +104,60 @@ class DataManager:
             'attendance': os.path.join(data_dir, 'attendance.csv')
         }
         
-        # Cache de dados em memória para acesso rápido
-        self._cache = {}
-        self._cache_timestamp = {}
-        self._cache_ttl = 60  # TTL em segundos (1 minuto)
+        # Engine de armazenamento ('csv' ou 'sqlite')
+        self.backend = backend
+        self._storage = create_storage(backend, data_dir, self.files)
+        # Completa commits de transação interrompidos antes de ler qualquer tabela
+        self._storage.recover()
+        
+        # Journal da transação em andamento (tipo -> DataFrame de trabalho)
+        self._journal = None
+        # Textos sem conversão das colunas tipadas (schema.apply_types) por
+        # tipo: coluna -> {id: texto}, gravados de volta nas reescritas da
+        # tabela. Dentro de uma transação as alterações vão para uma cópia
+        self._unparsed = {}
+        self._journal_unparsed = {}
+        
+        # Cache de dados em memória para acesso rápido, validado pela assinatura
+        # do armazenamento (mtime/tamanho do CSV ou versão da tabela SQLite).
+        # Ordem LRU: a tabela usada mais recentemente fica no final
+        self._cache = OrderedDict()
+        self._cache_signature = {}
+        # Cache por coluna das leituras com projeção (get_data(tipo, columns=...)):
+        # tipo -> {'signature', 'rows', 'columns': {coluna: Series}, 'missing': set, 'bytes'},
+        # em ordem LRU; entra no orçamento de memória junto com as tabelas
+        self._column_cache = OrderedDict()
+        
+        # Orçamento de memória do cache (bytes, memory_usage(deep=True));
+        # None = sem limite. Tabelas fixadas nunca são descartadas pelo LRU
+        desconhecidos = [t for t in pinned_tables if t not in self.files]
+        if desconhecidos:
+            raise ValueError(f"Tipo(s) inválido(s) para fixar no cache: {', '.join(desconhecidos)}")
+        self._cache_max_bytes = cache_max_bytes
+        self._pinned_tables = set(pinned_tables)
+        self._cache_bytes = {}
+        # Acertos, faltas, descartes e tempo de carga por tabela
+        self._metrics = CacheMetrics()
         
         # Índices para busca rápida
         self._indexes = {}
         
-        # Lock para operações thread-safe
-        self._lock = threading.Lock()
+        # Lock de leitura/escrita: leituras sobre o cache são compartilhadas
+        # (_read_section); escritas e cargas de tabela são exclusivas e também
+        # usam o lock de escrita do armazenamento, exclusivo entre processos
+        # (_write_section). with self._lock equivale à seção exclusiva
+        self._lock = ReadWriteLock()
+        # Marca as threads em leitura compartilhada (usam a versão em cache)
+        # e guarda a snapshot aberta por cada thread
+        self._local = threading.local()
+        # Snapshots abertas (TableSnapshot), de todas as threads
+        self._snapshots = set()
+        self._snapshots_lock = threading.Lock()
+        
+        # Inserções anexam linhas ao final do CSV em vez de reescrever o arquivo
+        self._append_only = append_only
+        # Linhas anexadas desde a última reescrita completa (por tipo)
+        self._appended_rows = {}
         
         # Campos obrigatórios por tipo
         self._required_fields = {
@@ -55,10 +171,35 @@ class DataManager:
             'attendance': ['aluno_id', 'data']
         }
         
+        # Campos com índice de trigramas para busca por substring (nomes)
+        self._text_index_fields = {
+            'cadastro': ['nome_completo', 'nome_social', 'nome_mae']
+        }
+        
         # Configurações de paginação
         self._default_page_size = 50
         
-        self._init_files()
+        # Write-behind: inserções nas tabelas escolhidas ficam em um buffer em
+        # memória (já visíveis nas leituras) e são gravadas em uma única
+        # escrita a cada flush_interval_ms ou ao atingir flush_max_rows linhas
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Durabilidade inválida: {durability}")
+        desconhecidos = [t for t in write_behind if t not in self.files]
+        if desconhecidos:
+            raise ValueError(f"Tipo(s) inválido(s) para write-behind: {', '.join(desconhecidos)}")
+        self._write_behind = set(write_behind)
+        self._flush_interval = flush_interval_ms / 1000
+        self._flush_max_rows = flush_max_rows
+        self._durability = durability
+        self._pending = {}
+        self._in_transaction = False
+        self._flusher = None
+        self._flusher_stop = threading.Event()
+        if self._write_behind:
+            atexit.register(_flush_at_exit, weakref.ref(self))
+        
+        with self._storage.write_lock():
+            self._init_files()
     
     def _validate_data(self, tipo, dados):
         """
@@ -94,63 +235,484 @@ class DataManager:
                 except:
                     return False, "Data de nascimento inválida"
         
+        # Datas e números das colunas tipadas (schema.TYPED_COLUMNS)
+        return self._validate_typed(tipo, dados)
+    
+    def _validate_typed(self, tipo, dados):
+        """
+        Valida os valores das colunas tipadas do tipo presentes em dados
+        
+        Returns:
+            tuple: (valido: bool, mensagem_erro: str ou None)
+        """
+        for coluna in invalid_values(tipo, pd.DataFrame([dados], dtype=object)):
+            return False, f"Valor inválido em {coluna}: {dados[coluna]}"
         return True, None
     
-    def _invalidate_cache(self, tipo):
-        """Invalida cache para um tipo específico"""
+    def _validate_rows(self, tipo, registros):
+        """
+        Valida vários registros de uma vez (mesmas regras de _validate_data)
+        
+        As regras são aplicadas coluna a coluna sobre um DataFrame, em vez
+        de registro a registro.
+        
+        Args:
+            tipo: Tipo de dado (cadastro, pei, etc.)
+            registros: Lista de dicionários
+            
+        Returns:
+            list: Mensagem de erro de cada registro (None se válido)
+        """
+        if not registros:
+            return []
+        
+        df = pd.DataFrame(registros)
+        erros = [None] * len(df)
+        
+        def marcar(mask, mensagem):
+            # Mantém apenas o primeiro erro de cada registro
+            for posicao in mask.to_numpy().nonzero()[0]:
+                if erros[posicao] is None:
+                    erros[posicao] = mensagem
+        
+        # Verifica campos obrigatórios
+        for field in self._required_fields.get(tipo, []):
+            if field not in df.columns:
+                marcar(pd.Series(True, index=df.index), f"Campo obrigatório ausente ou vazio: {field}")
+                continue
+            vazio = df[field].isna() | (df[field].astype(str).str.strip() == '')
+            marcar(vazio, f"Campo obrigatório ausente ou vazio: {field}")
+        
+        # Validações específicas por tipo
+        if tipo == 'cadastro':
+            # Valida CPF (formato básico)
+            if 'cpf' in df.columns:
+                cpf = df['cpf'].where(df['cpf'].notna(), '').astype(str)
+                cpf = cpf.str.replace('.', '', regex=False).str.replace('-', '', regex=False).str.strip()
+                marcar((cpf != '') & ((cpf.str.len() != 11) | ~cpf.str.isdigit()),
+                       "CPF inválido: deve conter 11 dígitos")
+            
+            # Valida data de nascimento
+            if 'data_nascimento' in df.columns:
+                informada = df['data_nascimento'].notna() & (df['data_nascimento'].astype(str) != '')
+                datas = pd.to_datetime(df['data_nascimento'].where(informada), errors='coerce', format='mixed')
+                marcar(informada & datas.isna(), "Data de nascimento inválida")
+                marcar(informada & (datas > pd.Timestamp.now()), "Data de nascimento não pode ser futura")
+        
+        # Datas e números das colunas tipadas (schema.TYPED_COLUMNS)
+        for coluna, mascara in invalid_values(tipo, df.astype(object)).items():
+            marcar(mascara, f"Valor inválido em {coluna}")
+        
+        return erros
+    
+    @contextmanager
+    def _write_section(self):
+        """
+        Seção de escrita: exclusiva entre threads e entre processos
+        
+        Vários workers do Streamlit (ou scripts rodando com o app no ar) podem
+        usar o mesmo diretório de dados. Dentro da seção a leitura revalida o
+        cache pela assinatura do armazenamento, então a alteração é sempre
+        feita sobre a versão mais recente da tabela, e a assinatura gravada no
+        cache após a escrita não pode ser de uma escrita de outro processo.
+        Ao final, a snapshot da thread (se houver) passa a ver o estado novo.
+        """
+        with self._lock, self._storage.write_lock():
+            escrevendo = getattr(self._local, 'writing', False)
+            self._local.writing = True
+            try:
+                yield
+            finally:
+                self._local.writing = escrevendo
+                self._renew_snapshot()
+    
+    @contextmanager
+    def _read_section(self, *tipos):
+        """
+        Seção de leitura das tabelas indicadas
+        
+        Com todas as tabelas em cache e válidas a seção é compartilhada:
+        várias threads (sessões do Streamlit) leem ao mesmo tempo, inclusive
+        enquanto uma escrita grava o arquivo (ReadWriteLock.downgrade), sempre
+        sobre a versão que estava em cache quando a seção começou. Se alguma
+        tabela precisa ser carregada (ou há transação em andamento) a seção é
+        exclusiva, como uma escrita, pois a carga altera o cache e os índices.
+        Se o cache ficou desatualizado por uma escrita deste processo ainda
+        em andamento, a leitura espera o fim dela (que atualiza o cache) em
+        vez de recarregar a tabela. Dentro de outra leitura compartilhada,
+        continua na mesma versão. Tabelas já fixadas pela snapshot da thread
+        não precisam estar em cache.
+        """
+        if getattr(self._local, 'shared', False):
+            yield
+            return
+        snapshot = self._active_snapshot()
+        tipos = [t for t in tipos if snapshot is None or t not in snapshot.tables]
+        for apos_escrita in (False, True):
+            with self._lock.read(apos_escrita):
+                if not self._in_transaction and all(self._is_cache_valid(t) for t in tipos):
+                    self._local.shared = True
+                    try:
+                        yield
+                    finally:
+                        self._local.shared = False
+                    return
+                if not self._lock.downgraded():
+                    break
+        with self._lock:
+            yield
+    
+    def _cache_usable(self, tipo):
+        """
+        Se o cache do tipo pode ser usado sem recarregar
+        
+        Numa leitura compartilhada vale a versão em cache no início da seção
+        (a assinatura pode mudar no meio, durante a gravação de uma escrita).
+        A versão fixada pela snapshot da thread também dispensa a recarga.
+        """
+        snapshot = self._active_snapshot()
+        if snapshot is not None and tipo in snapshot.tables:
+            return True
+        if getattr(self._local, 'shared', False) and tipo in self._cache:
+            return True
+        return self._is_cache_valid(tipo)
+    
+    @contextmanager
+    def snapshot(self):
+        """
+        Leituras sobre as versões das tabelas vigentes na abertura (MVCC)
+        
+        Dentro do bloco, cada tabela é fixada na primeira leitura da thread
+        e as leituras seguintes (get_data, get_record, buscas, consultas,
+        estatísticas...) usam sempre essa versão, mesmo que outra thread
+        grave a tabela no meio. Se uma escrita substitui uma tabela que a
+        snapshot ainda não leu, a snapshot fixa a versão anterior à escrita:
+        o conjunto de tabelas (ex.: cadastro e pei no mesmo dashboard) é
+        sempre o de um mesmo instante. As leituras não esperam as escritas
+        além do trecho curto em que o cache é trocado.
+        
+        Uma escrita feita pela própria thread solta as versões fixadas: as
+        leituras seguintes veem o estado novo, incluindo a própria escrita.
+        Leituras que vão direto ao armazenamento sem a tabela em cache
+        (colunas, páginas e intervalos de datas) não são fixadas. Snapshots
+        aninhadas na mesma thread reutilizam a externa.
+        
+        Yields:
+            TableSnapshot: Versões fixadas
+        """
+        atual = getattr(self._local, 'snapshot', None)
+        if atual is not None:
+            yield atual
+            return
+        
+        snapshot = TableSnapshot()
+        # Registrada fora de escritas: nenhuma troca de versão pela metade
+        with self._lock.read(), self._snapshots_lock:
+            self._snapshots.add(snapshot)
+        self._local.snapshot = snapshot
+        try:
+            yield snapshot
+        finally:
+            self._local.snapshot = None
+            with self._snapshots_lock:
+                self._snapshots.discard(snapshot)
+            # Versões liberadas mesmo que o chamador guarde o objeto
+            snapshot.tables.clear()
+            snapshot.indexes.clear()
+    
+    def _active_snapshot(self):
+        """Snapshot da thread atual (None fora dela ou numa escrita, que sempre usa a versão atual)"""
+        if getattr(self._local, 'writing', False):
+            return None
+        return getattr(self._local, 'snapshot', None)
+    
+    def _renew_snapshot(self):
+        """Após uma escrita da thread, a snapshot dela volta a fixar as versões atuais"""
+        snapshot = getattr(self._local, 'snapshot', None)
+        if snapshot is not None:
+            snapshot.tables.clear()
+            snapshot.indexes.clear()
+    
+    def _retire_version(self, tipo):
+        """
+        A versão em cache do tipo deixa de ser a atual (escrita, recarga ou descarte)
+        
+        As snapshots de outras threads que ainda não leram o tipo passam a
+        fixar essa versão, a vigente quando foram abertas. Chamado com o
+        lock exclusivo, antes de trocar ou remover o DataFrame do cache.
+        """
+        anterior = self._cache.get(tipo)
+        if anterior is None or not self._snapshots:
+            return
+        eu = threading.get_ident()
+        with self._snapshots_lock:
+            for snapshot in self._snapshots:
+                if snapshot.thread != eu:
+                    snapshot.tables.setdefault(tipo, anterior)
+    
+    def _preserve_for_snapshots(self, tipo):
+        """
+        Antes de gravar uma tabela que não está em cache, carrega a versão
+        atual se alguma snapshot aberta (de outra thread) ainda não a leu
+        
+        Assim a escrita a substitui no cache (_retire_version) e a snapshot
+        continua lendo a versão anterior à escrita.
+        """
+        if tipo in self._cache or not self._snapshots:
+            return
+        eu = threading.get_ident()
+        with self._snapshots_lock:
+            precisa = any(s.thread != eu and tipo not in s.tables for s in self._snapshots)
+        if precisa:
+            self._get_data_internal(tipo)
+    
+    def _indexes_for(self, tipo):
+        """
+        Índices da versão lida pela thread
+        
+        Os índices do cache acompanham só a versão atual; para uma versão
+        mais antiga fixada pela snapshot, os índices (de texto, agregados)
+        ficam na própria snapshot e as demais buscas percorrem o DataFrame.
+        """
+        # A versão de trabalho de uma transação não tem índices (as posições
+        # do índice aluno_id são as do cache)
+        if self._journal is not None and tipo in self._journal:
+            return {}
+        snapshot = self._active_snapshot()
+        if snapshot is not None and tipo in snapshot.tables and snapshot.tables[tipo] is not self._cache.get(tipo):
+            return snapshot.indexes.setdefault(tipo, {})
+        return self._indexes.setdefault(tipo, {})
+    
+    def _invalidate_cache(self, tipo, contador='invalidations'):
+        """
+        Invalida cache para um tipo específico
+        
+        Args:
+            tipo: Tipo de dado
+            contador: Métrica do descarte ('invalidations' para escritas,
+                      'evictions' para falta de memória no orçamento)
+        """
+        self._retire_version(tipo)
         if tipo in self._cache:
             del self._cache[tipo]
-        if tipo in self._cache_timestamp:
-            del self._cache_timestamp[tipo]
+            self._metrics.increment(contador, tipo)
+        self._cache_bytes.pop(tipo, None)
+        self._column_cache.pop(tipo, None)
+        self._unparsed.pop(tipo, None)
+        if tipo in self._cache_signature:
+            del self._cache_signature[tipo]
         if tipo in self._indexes:
             del self._indexes[tipo]
     
+    def _cache_put(self, tipo, df, custo=None):
+        """
+        Guarda o DataFrame no cache como o mais recente e aplica o orçamento
+        
+        Args:
+            tipo: Tipo de dado
+            df: DataFrame a manter em cache
+            custo: Bytes do DataFrame (None = medir com memory_usage(deep=True))
+        """
+        if self._cache.get(tipo) is not df:
+            self._retire_version(tipo)
+        self._cache[tipo] = df
+        self._cache.move_to_end(tipo)
+        # Com a tabela inteira em cache as projeções saem dela
+        self._column_cache.pop(tipo, None)
+        if custo is None:
+            custo = int(df.memory_usage(deep=True).sum())
+        self._cache_bytes[tipo] = custo
+        self._evict_over_budget(manter=tipo)
+    
+    def _evict_over_budget(self, manter=None):
+        """
+        Descarta as tabelas usadas há mais tempo até o cache caber no orçamento
+        
+        O orçamento inclui as colunas do cache por coluna (projeções); as
+        projeções de tabelas que não estão inteiras em cache saem primeiro,
+        e descartar uma tabela descarta também a projeção dela. Tabelas
+        fixadas e a tabela recém-guardada (manter) não são descartadas, mesmo
+        que sozinhas passem do orçamento. Linhas no buffer de write-behind não
+        se perdem: são reincorporadas na próxima carga.
+        """
+        if self._cache_max_bytes is None:
+            return
+        
+        total = self._cached_bytes()
+        for tipo in list(dict.fromkeys(list(self._column_cache) + list(self._cache))):
+            if total <= self._cache_max_bytes:
+                break
+            if tipo == manter or tipo in self._pinned_tables:
+                continue
+            total -= self._cache_bytes.get(tipo, 0)
+            total -= self._column_cache.get(tipo, {}).get('bytes', 0)
+            if tipo not in self._cache:
+                self._metrics.increment('evictions', tipo)
+            self._invalidate_cache(tipo, 'evictions')
+    
+    def _cached_bytes(self):
+        """Memória das tabelas e das projeções em cache (bytes)"""
+        return sum(self._cache_bytes.values()) + sum(e['bytes'] for e in self._column_cache.values())
+    
     def _is_cache_valid(self, tipo):
-        """Verifica se cache é válido"""
-        if tipo not in self._cache or tipo not in self._cache_timestamp:
+        """
+        Verifica se cache é válido
+        
+        O cache vale enquanto a assinatura do armazenamento não mudar; escritas
+        de outro processo (scripts, outro worker) são vistas no próximo acesso.
+        """
+        if tipo not in self._cache or tipo not in self._cache_signature:
             return False
         
-        elapsed = (datetime.now() - self._cache_timestamp[tipo]).total_seconds()
-        return elapsed < self._cache_ttl
+        return self._storage.signature(tipo) == self._cache_signature[tipo]
     
     def _build_indexes(self, tipo, df):
-        """Cria índices para busca rápida"""
-        if len(df) == 0:
-            return
+        """
+        Cria índices para busca rápida
         
+        Usado apenas na carga completa da tabela; depois disso os índices são
+        mantidos incrementalmente por _index_record/_unindex_record.
+        """
         self._indexes[tipo] = {}
+        # Os grupos dos agregados de presença vêm do cadastro: refeitos com ele
+        if tipo == 'cadastro':
+            self._indexes.get('attendance', {}).pop('presencas', None)
         
         # Índice por ID
         if 'id' in df.columns:
-            self._indexes[tipo]['id'] = df.set_index('id').to_dict('index')
+            self._indexes[tipo]['id'] = {}
+        
+        # Índice por aluno (tabelas satélite): aluno_id → posições das linhas
+        # no DataFrame do cache, em ordem
+        if 'aluno_id' in df.columns and 'id' in df.columns:
+            self._indexes[tipo]['aluno_id'] = {}
+        
+        # Índices específicos por tipo (os de texto são criados na primeira busca)
+        if tipo == 'cadastro' and 'cpf' in df.columns:
+            self._indexes[tipo]['cpf'] = {}
+        
+        # Uma única passada sobre os registros
+        for posicao, registro in enumerate(self._records(df)):
+            self._index_record(tipo, registro, posicao)
+    
+    @staticmethod
+    def _records(df):
+        """
+        Registros do DataFrame como dicionários de tipos nativos
+        
+        Equivale a df.to_dict('records'), mas converte coluna a coluna
+        (tolist) em vez de valor a valor, o que é bem mais rápido. Colunas
+        tipadas (datas, números) saem no texto canônico do armazenamento,
+        como os índices e os registros sempre as guardaram.
+        """
+        colunas = list(df.columns)
+        return [dict(zip(colunas, valores))
+                for valores in zip(*(as_text(df[coluna]).tolist() for coluna in colunas))]
+    
+    @staticmethod
+    def _cpf_key(registro):
+        """Chave do índice de CPF (sem pontuação) de um registro de cadastro"""
+        cpf = registro.get('cpf')
+        return str(cpf).replace('.', '').replace('-', '').strip() if pd.notna(cpf) else None
+    
+    def _index_record(self, tipo, registro, posicao):
+        """
+        Adiciona um único registro aos índices existentes do tipo
+        
+        Args:
+            tipo: Tipo de dado
+            registro: Registro (dicionário de _records)
+            posicao: Posição da linha no DataFrame do cache
+        """
+        indexes = self._indexes.setdefault(tipo, {})
+        
+        if 'id' in registro:
+            record_id = registro['id']
+            indexes.setdefault('id', {})[record_id] = {k: v for k, v in registro.items() if k != 'id'}
+            
+            if 'aluno_id' in registro:
+                bisect.insort(indexes.setdefault('aluno_id', {}).setdefault(registro['aluno_id'], []), posicao)
         
-        # Índices específicos por tipo
         if tipo == 'cadastro':
-            # Índice por CPF
-            if 'cpf' in df.columns:
-                cpf_index = {}
-                for idx, row in df.iterrows():
-                    if pd.notna(row.get('cpf')):
-                        cpf = str(row['cpf']).replace('.', '').replace('-', '').strip()
-                        if cpf:
-                            cpf_index[cpf] = row.to_dict()
-                self._indexes[tipo]['cpf'] = cpf_index
-            
-            # Índice por nome (primeira palavra para busca rápida)
-            if 'nome_completo' in df.columns:
-                name_index = {}
-                for idx, row in df.iterrows():
-                    if pd.notna(row.get('nome_completo')):
-                        first_name = str(row['nome_completo']).split()[0].upper()
-                        if first_name not in name_index:
-                            name_index[first_name] = []
-                        name_index[first_name].append(row.to_dict())
-                self._indexes[tipo]['nome'] = name_index
+            cpf = self._cpf_key(registro)
+            if cpf:
+                # Lista por CPF: CPFs repetidos não se sobrescrevem no índice
+                indexes.setdefault('cpf', {}).setdefault(cpf, []).append(registro)
+            self._set_attendance_groups(registro)
+        
+        # Índices de texto já construídos (TrigramIndex por campo)
+        for campo, indice in indexes.get('texto', {}).items():
+            if 'id' in registro and campo in registro:
+                indice.add(registro['id'], registro[campo])
+        
+        # Agregados de presença já construídos
+        if 'presencas' in indexes:
+            indexes['presencas'].add(registro.get('aluno_id'), registro.get('data'))
+    
+    def _unindex_record(self, tipo, registro, posicao):
+        """Remove um único registro (na posição posicao do cache) dos índices do tipo"""
+        indexes = self._indexes.get(tipo)
+        if not indexes:
+            return
+        
+        record_id = registro.get('id')
+        indexes.get('id', {}).pop(record_id, None)
+        
+        self._remove_from_bucket(indexes.get('aluno_id', {}), registro.get('aluno_id'),
+                                 lambda p: p == posicao)
+        
+        if tipo == 'cadastro':
+            self._remove_from_bucket(indexes.get('cpf', {}), self._cpf_key(registro),
+                                     lambda r: r.get('id') == record_id)
+            self._set_attendance_groups({'id': record_id})
+        
+        for indice in indexes.get('texto', {}).values():
+            indice.remove(record_id)
+        
+        if 'presencas' in indexes:
+            indexes['presencas'].remove(registro.get('aluno_id'), registro.get('data'))
+    
+    def _set_attendance_groups(self, registro):
+        """Turno/turma do aluno nos agregados de presença já construídos (sem o campo = sem grupo)"""
+        agregados = self._indexes.get('attendance', {}).get('presencas')
+        if agregados is None or 'id' not in registro:
+            return
+        for campo in ATTENDANCE_GROUP_FIELDS:
+            grupo = registro.get(campo)
+            agregados.set_group(campo, registro['id'], grupo if pd.notna(grupo) and grupo != '' else None)
+    
+    def _shift_positions(self, tipo, removidas):
+        """Corrige as posições do índice aluno_id depois que as linhas removidas saíram do cache"""
+        removidas = sorted(removidas)
+        index = self._indexes.get(tipo, {}).get('aluno_id', {})
+        for chave, posicoes in index.items():
+            index[chave] = [p - bisect.bisect_left(removidas, p) for p in posicoes]
+    
+    def _reindex_positions(self, tipo, df):
+        """Refaz o índice aluno_id depois que as linhas do cache mudaram de ordem"""
+        indexes = self._indexes.get(tipo, {})
+        if 'aluno_id' not in indexes:
+            return
+        index = {}
+        for posicao, aluno_id in enumerate(df['aluno_id'].tolist()):
+            index.setdefault(aluno_id, []).append(posicao)
+        indexes['aluno_id'] = index
+    
+    @staticmethod
+    def _remove_from_bucket(index, chave, pertence):
+        """Remove da lista index[chave] os itens do registro; apaga a chave se ficar vazia"""
+        if chave not in index:
+            return
+        restantes = [item for item in index[chave] if not pertence(item)]
+        if restantes:
+            index[chave] = restantes
+        else:
+            del index[chave]
     
     def _init_files(self):
-        """Inicializa arquivos CSV se não existirem"""
+        """Inicializa as tabelas (arquivos CSV ou tabelas SQLite) se não existirem"""
         # Cadastro Geral
-        if not os.path.exists(self.files['cadastro']):
+        if not self._storage.exists('cadastro'):
             df = pd.DataFrame(columns=[
                 # Identificação básica
                 'id', 'nome_completo', 'nome_social', 'data_nascimento', 'cpf', 'codigo_inep', 
@@ -184,10 +746,10 @@ class DataManager:
                 # Metadados
                 'data_matricula', 'foto_path'
             ])
-            df.to_csv(self.files['cadastro'], index=False)
+            self._storage.write_table('cadastro', df)
         
         # PEI - Plano Educacional Individualizado
-        if not os.path.exists(self.files['pei']):
+        if not self._storage.exists('pei'):
             df = pd.DataFrame(columns=[
                 'id', 'aluno_id', 'necessidade_especial', 'tipo_deficiencia',
                 'laudo_medico', 'data_laudo', 'cid', 'medicacao',
@@ -195,10 +757,10 @@ class DataManager:
                 'acompanhamento_especializado', 'recursos_necessarios',
                 'observacoes', 'data_cadastro'
             ])
-            df.to_csv(self.files['pei'], index=False)
+            self._storage.write_table('pei', df)
         
         # Socioeconômico
-        if not os.path.exists(self.files['socioeconomico']):
+        if not self._storage.exists('socioeconomico'):
             df = pd.DataFrame(columns=[
                 'id', 'aluno_id', 'renda_familiar', 'qtd_pessoas_casa',
                 'tipo_moradia', 'possui_internet', 'possui_computador',
@@ -207,10 +769,10 @@ class DataManager:
                 'profissao_responsavel', 'escolaridade_mae', 'escolaridade_pai',
                 'transporte_escolar', 'tempo_deslocamento', 'data_cadastro'
             ])
-            df.to_csv(self.files['socioeconomico'], index=False)
+            self._storage.write_table('socioeconomico', df)
         
         # Saúde
-        if not os.path.exists(self.files['saude']):
+        if not self._storage.exists('saude'):
             df = pd.DataFrame(columns=[
                 'id', 'aluno_id', 'tipo_sanguineo', 'fator_rh',
                 'alergias', 'doencas_cronicas', 'medicamentos_uso_continuo',
@@ -219,10 +781,10 @@ class DataManager:
                 'telefone_emergencia', 'parentesco_emergencia',
                 'observacoes_saude', 'data_cadastro'
             ])
-            df.to_csv(self.files['saude'], index=False)
+            self._storage.write_table('saude', df)
         
         # Questionário SAEB/SPAECE
-        if not os.path.exists(self.files['questionario_saeb']):
+        if not self._storage.exists('questionario_saeb'):
             df = pd.DataFrame(columns=[
                 'id', 'aluno_id', 'sexo', 'idade', 'lingua_familia', 'cor_raca',
                 'deficiencia', 'tea', 'altas_habilidades',
@@ -247,10 +809,10 @@ class DataManager:
                 'escola_prof_acreditam', 'escola_motivacao_continuar',
                 'expectativa_futura', 'data_cadastro'
             ])
-            df.to_csv(self.files['questionario_saeb'], index=False)
+            self._storage.write_table('questionario_saeb', df)
         
         # Anamnese Pedagógica PEI
-        if not os.path.exists(self.files['anamnese_pei']):
+        if not self._storage.exists('anamnese_pei'):
             df = pd.DataFrame(columns=[
                 'id', 'aluno_id', 'data_preenchimento', 'filiacao', 'turma_serie',
                 'desenvolvimento_motor', 'coordenacao_motora_fina', 'coordenacao_motora_grossa',
@@ -277,72 +839,433 @@ class DataManager:
                 'observacoes_gerais', 'parecer_tecnico', 'profissional_responsavel',
                 'formacao_profissional', 'registro_profissional', 'data_cadastro'
             ])
-            df.to_csv(self.files['anamnese_pei'], index=False)
+            self._storage.write_table('anamnese_pei', df)
         
         # Face Embeddings (for face recognition)
-        if not os.path.exists(self.files['face_embeddings']):
+        if not self._storage.exists('face_embeddings'):
             df = pd.DataFrame(columns=[
                 'id', 'aluno_id', 'embedding', 'photo_path', 'data_cadastro'
             ])
-            df.to_csv(self.files['face_embeddings'], index=False)
+            self._storage.write_table('face_embeddings', df)
         
         # Attendance Records
-        if not os.path.exists(self.files['attendance']):
+        if not self._storage.exists('attendance'):
             df = pd.DataFrame(columns=[
                 'id', 'aluno_id', 'data', 'hora', 'tipo', 'verificado', 
                 'confianca', 'observacoes', 'data_registro'
             ])
-            df.to_csv(self.files['attendance'], index=False)
+            self._storage.write_table('attendance', df)
+    
+    def _normalize_types(self, df, tipo=None, originais=None):
+        """
+        Converte colunas de ID para inteiro (mesmo tratamento da leitura do CSV)
+        
+        Com tipo, as colunas categóricas do esquema (schema.CATEGORICAL_COLUMNS)
+        passam a 'category' e as tipadas (schema.TYPED_COLUMNS) a datetime64/float64;
+        originais recebe o texto dos valores sem conversão (schema.apply_types).
+        """
+        if 'id' in df.columns:
+            df['id'] = pd.to_numeric(df['id'], errors='coerce').fillna(0).astype(int)
+        if 'aluno_id' in df.columns:
+            df['aluno_id'] = pd.to_numeric(df['aluno_id'], errors='coerce').fillna(0).astype(int)
+        if tipo is not None:
+            df = apply_types(tipo, apply_categories(tipo, df), originais=originais)
+        return df
     
     def _get_data_internal(self, tipo):
         """Internal version without lock"""
-        # Verifica cache
-        if self._is_cache_valid(tipo):
-            return self._cache[tipo].copy()
-        
-        # Carrega do arquivo
+        # Dentro de uma transação, lê a versão de trabalho do journal
+        if self._journal is not None and tipo in self._journal:
+            return self._journal[tipo]
+        
+        # Versão fixada pela snapshot da thread
+        snapshot = self._active_snapshot()
+        if snapshot is not None and tipo in snapshot.tables:
+            self._metrics.increment('hits', tipo)
+            return snapshot.tables[tipo].copy(deep=False)
+        
+        # Verifica cache (visão rasa, sem duplicar os dados)
+        if self._cache_usable(tipo):
+            self._metrics.increment('hits', tipo)
+            self._cache.move_to_end(tipo)
+            if snapshot is not None:
+                snapshot.tables[tipo] = self._cache[tipo]
+            return self._cache[tipo].copy(deep=False)
+        
+        # Carrega do armazenamento
         if tipo in self.files:
-            try:
-                df = pd.read_csv(self.files[tipo], dtype=str, keep_default_na=False)
-                if 'id' in df.columns and len(df) > 0:
-                    df['id'] = pd.to_numeric(df['id'], errors='coerce').fillna(0).astype(int)
-                if 'aluno_id' in df.columns and len(df) > 0:
-                    df['aluno_id'] = pd.to_numeric(df['aluno_id'], errors='coerce').fillna(0).astype(int)
-                
-                # Atualiza cache
-                self._cache[tipo] = df.copy()
-                self._cache_timestamp[tipo] = datetime.now()
-                
-                # Constrói índices
-                self._build_indexes(tipo, df)
-                
-                return df.copy()
-            except (FileNotFoundError, pd.errors.EmptyDataError):
+            self._metrics.increment('misses', tipo)
+            # Versão em cache desatualizada (escrita de outro processo)
+            if tipo in self._cache:
+                self._metrics.increment('invalidations', tipo)
+            
+            # A assinatura é lida antes da carga: uma escrita concorrente força nova leitura
+            signature = self._storage.signature(tipo)
+            with self._metrics.timer('load_seconds', tipo):
+                df = self._storage.load(tipo)
+            if df is None:
                 return pd.DataFrame()
+            originais = {}
+            df = self._normalize_types(df, tipo, originais)
+            self._unparsed[tipo] = originais
+            
+            # Inserções ainda no buffer de write-behind fazem parte da tabela
+            # (na posição que terão nas partições depois do flush)
+            if self._pending.get(tipo):
+                inicio = len(df)
+                df = self._partition_ordered(tipo, concat_categorical(tipo, [df] + self._pending[tipo]), inicio)
+            
+            # Atualiza cache
+            self._cache_signature[tipo] = signature
+            self._cache_put(tipo, df)
+            
+            # Constrói índices
+            with self._metrics.timer('index_seconds', tipo):
+                self._build_indexes(tipo, df)
+            
+            if snapshot is not None:
+                snapshot.tables[tipo] = df
+            return df.copy(deep=False)
         return pd.DataFrame()
     
-    def get_data(self, tipo):
+    def _get_columns_internal(self, tipo, columns):
+        """
+        Internal version without lock: apenas as colunas pedidas
+        
+        Se a tabela inteira já está em cache (ou há transação/buffer de
+        write-behind), a projeção é feita sobre ela. Caso contrário só as
+        colunas que ainda não estão no cache por coluna são lidas do
+        armazenamento; o cache por coluna vale enquanto a assinatura não mudar.
+        """
+        columns = list(dict.fromkeys(columns))
+        if ((self._journal is not None and tipo in self._journal) or tipo not in self.files
+                or self._pending.get(tipo) or self._cache_usable(tipo)):
+            df = self._get_data_internal(tipo)
+            return df[[c for c in columns if c in df.columns]]
+        
+        signature = self._storage.signature(tipo)
+        entrada = self._column_cache.get(tipo)
+        if entrada is None or entrada['signature'] != signature:
+            entrada = {'signature': signature, 'rows': None, 'columns': {}, 'missing': set(), 'bytes': 0}
+            self._column_cache[tipo] = entrada
+        self._column_cache.move_to_end(tipo)
+        
+        faltantes = [c for c in columns if c not in entrada['columns'] and c not in entrada['missing']]
+        if not faltantes:
+            self._metrics.increment('hits', tipo)
+        else:
+            self._metrics.increment('misses', tipo)
+            with self._metrics.timer('load_seconds', tipo):
+                parcial = self._storage.load(tipo, columns=faltantes)
+                # A tabela mudou depois da validação: relê todas as colunas pedidas
+                if parcial is not None and entrada['rows'] not in (None, len(parcial)):
+                    entrada['columns'].clear()
+                    entrada['missing'].clear()
+                    faltantes = columns
+                    parcial = self._storage.load(tipo, columns=faltantes)
+            if parcial is None:
+                del self._column_cache[tipo]
+                return pd.DataFrame()
+            
+            parcial = self._normalize_types(parcial, tipo)
+            for coluna in faltantes:
+                if coluna in parcial.columns:
+                    entrada['columns'][coluna] = parcial[coluna]
+                    entrada['rows'] = len(parcial)
+                else:
+                    entrada['missing'].add(coluna)
+            entrada['bytes'] = sum(int(serie.memory_usage(deep=True)) for serie in entrada['columns'].values())
+            self._evict_over_budget(manter=tipo)
+        
+        return pd.DataFrame({c: entrada['columns'][c] for c in columns if c in entrada['columns']}, copy=False)
+    
+    def get_data(self, tipo, copy=False, columns=None):
         """
         Retorna dados do tipo especificado com cache
         
+        Por padrão retorna uma visão rasa do cache: várias leituras
+        compartilham o mesmo buffer. Novas colunas e colunas reatribuídas
+        ficam só no DataFrame do chamador; para alterar valores no lugar
+        (df.loc/df.at) use copy=True, senão a alteração chega ao cache.
+        
         Args:
             tipo: Tipo de dado
+            copy: Se True, retorna uma cópia completa e independente
+            columns: Lista de colunas desejadas (None = todas). Só essas colunas
+                     são lidas e guardadas em cache; colunas inexistentes são
+                     ignoradas
             
         Returns:
             DataFrame com os dados
         """
-        with self._lock:
-            return self._get_data_internal(tipo)
+        with self._read_section(tipo):
+            if columns is not None:
+                df = self._get_columns_internal(tipo, columns)
+            else:
+                df = self._get_data_internal(tipo)
+            return df.copy() if copy else df
     
-    def _save_data_internal(self, tipo, df):
-        """Internal version without lock"""
+    def get_data_range(self, tipo, data_inicio, data_fim=None):
+        """
+        Retorna os registros de uma tabela particionada por data dentro do intervalo
+        
+        No backend CSV só as partições mensais do intervalo são lidas (por
+        exemplo attendance/2026-10.csv); com a tabela inteira em cache, o
+        filtro é feito sobre o cache.
+        
+        Args:
+            tipo: Tipo de dado particionado (ex.: 'attendance')
+            data_inicio: Data inicial 'AAAA-MM-DD' (inclusive)
+            data_fim: Data final 'AAAA-MM-DD' (inclusive; padrão: data_inicio)
+            
+        Returns:
+            DataFrame com os registros do intervalo
+        """
+        if tipo not in PARTITIONED_TABLES:
+            raise ValueError(f"Tipo sem particionamento por data: {tipo}")
+        coluna = PARTITIONED_TABLES[tipo]
+        data_fim = data_fim or data_inicio
+        
+        with self._read_section(tipo):
+            if (self._journal is not None and tipo in self._journal) or self._cache_usable(tipo):
+                return filter_date_range(self._get_data_internal(tipo), coluna, data_inicio, data_fim)
+            
+            df = self._storage.load_range(tipo, data_inicio, data_fim)
+            if df is None:
+                return pd.DataFrame()
+            df = self._normalize_types(df, tipo)
+            
+            # Inserções ainda no buffer de write-behind
+            pendentes = [filter_date_range(p, coluna, data_inicio, data_fim) for p in self._pending.get(tipo, [])]
+            if pendentes:
+                df = concat_categorical(tipo, [df] + pendentes)
+            return df
+    
+    def _save_data_internal(self, tipo, df, manter_cache=False):
+        """
+        Internal version without lock
+        
+        Com manter_cache=True o chamador já aplicou a alteração nos índices;
+        o DataFrame gravado passa a ser o cache em vez de ser descartado.
+        """
+        # Dentro de uma transação, apenas registra a nova versão no journal
+        if self._journal is not None and tipo in self.files:
+            self._journal[tipo] = df
+            return True
+        
         if tipo in self.files:
-            df.to_csv(self.files[tipo], index=False)
-            # Invalida cache
-            self._invalidate_cache(tipo)
+            self._preserve_for_snapshots(tipo)
+            # Gravação do arquivo (o trecho lento): leitores continuam sobre o cache atual
+            with self._lock.downgrade():
+                self._storage.write_table(tipo, text_frame(df, self._unparsed.get(tipo)))
+            self._appended_rows[tipo] = 0
+            # A tabela gravada já inclui as linhas do buffer de write-behind
+            self._pending.pop(tipo, None)
+            if manter_cache:
+                self._refresh_cache_after_write(tipo, df, True)
+            else:
+                # Invalida cache
+                self._invalidate_cache(tipo)
             return True
         return False
     
+    def _unparsed_for_write(self, tipo):
+        """
+        Textos sem conversão da tabela (coluna -> {id: texto}) que uma escrita pode alterar
+        
+        Dentro de uma transação é uma cópia: o rollback mantém os do cache.
+        """
+        if self._journal is None:
+            return self._unparsed.setdefault(tipo, {})
+        if tipo not in self._journal_unparsed:
+            self._journal_unparsed[tipo] = {c: dict(v) for c, v in self._unparsed.get(tipo, {}).items()}
+        return self._journal_unparsed[tipo]
+    
+    def _refresh_cache_after_write(self, tipo, df, cache_atual):
+        """
+        Mantém o DataFrame gravado como cache, com a assinatura pós-escrita
+        
+        Os índices não são reconstruídos: o chamador já os atualizou para a
+        linha alterada. Se o cache não estava atualizado antes da escrita
+        (outro processo alterou a tabela), ele é descartado.
+        """
+        if not cache_atual:
+            self._invalidate_cache(tipo)
+            return
+        self._cache_signature[tipo] = self._storage.signature(tipo)
+        # Atualização/exclusão de uma linha: mantém o custo medido na carga
+        self._cache_put(tipo, df, self._cache_bytes.get(tipo))
+    
+    def _can_append(self, tipo, registros):
+        """
+        Verifica se os registros podem ser anexados ao final do CSV
+        
+        O append só é possível com o tipo em cache (cabeçalho conhecido) e
+        quando nenhum registro traz colunas novas; caso contrário o arquivo
+        precisa ser reescrito com o novo cabeçalho.
+        """
+        if not self._append_only or self._journal is not None or tipo not in self._cache:
+            return False
+        
+        columns = self._cache[tipo].columns
+        if len(columns) == 0 or not self._storage.exists(tipo):
+            return False
+        
+        return all(key in columns for dados in registros for key in dados)
+    
+    def _partition_ordered(self, tipo, df, inicio=0):
+        """
+        DataFrame na ordem de load() depois de linhas novas ou alteradas a partir de inicio
+        
+        Tabelas particionadas são lidas mês a mês, cada partição na ordem do
+        arquivo. Inserções no mês mais recente (o caso comum) já ficam no fim
+        e só as linhas a partir de inicio são verificadas; uma inserção em mês
+        anterior ou uma data movida para outro mês muda a posição da linha.
+        
+        Returns:
+            O próprio df se já está em ordem; senão uma cópia reordenada
+        """
+        if not self._storage.is_partitioned(tipo):
+            return df
+        coluna = PARTITIONED_TABLES[tipo]
+        if partition_keys(df.iloc[max(inicio - 1, 0):], coluna).is_monotonic_increasing:
+            return df
+        return df.iloc[partition_order(df, coluna)].reset_index(drop=True)
+    
+    def _append_to_cache(self, tipo, novo_df):
+        """Acrescenta linhas novas ao DataFrame do cache e aos índices, na ordem de load()"""
+        inicio = len(self._cache[tipo])
+        df = concat_categorical(tipo, [self._cache[tipo], novo_df])
+        ordenado = self._partition_ordered(tipo, df, inicio)
+        self._cache_put(tipo, ordenado,
+                        self._cache_bytes.get(tipo, 0) + int(novo_df.memory_usage(deep=True).sum()))
+        for posicao, registro in enumerate(self._records(novo_df), inicio):
+            self._index_record(tipo, registro, posicao)
+        if ordenado is not df:
+            self._reindex_positions(tipo, ordenado)
+    
+    def _append_records_internal(self, tipo, registros):
+        """
+        Anexa registros ao armazenamento (uma escrita) e atualiza cache e índices no lugar
+        
+        Custo proporcional aos registros inseridos, e não ao tamanho da tabela.
+        """
+        columns = list(self._cache[tipo].columns)
+        cache_atual = self._storage.signature(tipo) == self._cache_signature.get(tipo)
+        
+        # O engine devolve as linhas como seriam lidas do arquivo (mesmos tipos)
+        novo_df = self._storage.append_rows(tipo, registros, columns)
+        novo_df = self._normalize_types(novo_df, tipo)
+        self._appended_rows[tipo] = self._appended_rows.get(tipo, 0) + len(registros)
+        
+        if not cache_atual:
+            # Outro processo escreveu nesse meio tempo: relê no próximo acesso
+            self._invalidate_cache(tipo)
+            return
+        
+        self._cache_signature[tipo] = self._storage.signature(tipo)
+        self._append_to_cache(tipo, novo_df)
+    
+    def _buffer_records_internal(self, tipo, registros):
+        """
+        Coloca registros no buffer de write-behind (sem escrita imediata)
+        
+        As linhas entram no cache e nos índices com os mesmos valores que
+        teriam após a gravação, então as leituras já as enxergam. Outros
+        processos só as veem depois do flush.
+        """
+        columns = list(self._cache[tipo].columns)
+        _, novo_df = serialize_rows(registros, columns)
+        novo_df = self._normalize_types(novo_df, tipo)
+        
+        self._pending.setdefault(tipo, []).append(novo_df)
+        self._append_to_cache(tipo, novo_df)
+        
+        if sum(len(pendente) for pendente in self._pending[tipo]) >= self._flush_max_rows:
+            self._flush_internal(tipo)
+        elif self._flusher is None:
+            self._flusher = threading.Thread(
+                target=_write_behind_loop,
+                args=(weakref.ref(self), self._flusher_stop, self._flush_interval),
+                name='matricula-write-behind', daemon=True
+            )
+            self._flusher.start()
+    
+    def _flush_internal(self, tipo=None):
+        """Internal version without lock; retorna o número de linhas gravadas"""
+        tipos = [tipo] if tipo is not None else list(self._pending)
+        gravadas = 0
+        
+        for t in tipos:
+            pendentes = self._pending.get(t)
+            if not pendentes:
+                continue
+            novo_df = concat_categorical(t, pendentes)
+            
+            with self._storage.write_lock():
+                cache_atual = self._is_cache_valid(t)
+                self._storage.append_rows(t, self._records(novo_df), list(novo_df.columns))
+                del self._pending[t]
+                self._appended_rows[t] = self._appended_rows.get(t, 0) + len(novo_df)
+                
+                if cache_atual:
+                    self._cache_signature[t] = self._storage.signature(t)
+                else:
+                    # Outro processo escreveu nesse meio tempo: relê no próximo acesso
+                    self._invalidate_cache(t)
+                
+                if self._durability == 'fsync':
+                    self._storage.sync(t)
+            gravadas += len(novo_df)
+        
+        return gravadas
+    
+    def flush(self, tipo=None):
+        """
+        Grava as inserções pendentes no buffer de write-behind
+        
+        Args:
+            tipo: Tipo de dado (None grava todos os tipos)
+            
+        Returns:
+            int: Número de linhas gravadas
+        """
+        with self._lock:
+            return self._flush_internal(tipo)
+    
+    def close(self):
+        """Grava os buffers de write-behind e encerra a thread de flush"""
+        self._flusher_stop.set()
+        self.flush()
+    
+    def compact(self, tipo=None):
+        """
+        Reescreve o(s) CSV(s) por completo a partir dos dados atuais
+        
+        Inserções apenas anexam linhas ao arquivo; atualizações e exclusões
+        continuam reescrevendo a tabela (e funcionam como compactação). Este
+        método força a reescrita canônica, por exemplo após muitas inserções
+        ou edição manual do arquivo.
+        
+        Args:
+            tipo: Tipo de dado (None compacta todos os tipos com linhas anexadas)
+            
+        Returns:
+            list: Tipos que foram reescritos
+        """
+        with self._write_section():
+            if tipo is None:
+                tipos = [t for t, n in self._appended_rows.items() if n > 0]
+            else:
+                tipos = [tipo]
+            
+            compactados = []
+            for t in tipos:
+                df = self._get_data_internal(t)
+                if len(df.columns) > 0 and self._save_data_internal(t, df):
+                    compactados.append(t)
+            return compactados
+    
     def save_data(self, tipo, df):
         """
         Salva dados do tipo especificado e invalida cache
@@ -354,16 +1277,61 @@ class DataManager:
         Returns:
             bool: True se salvou com sucesso
         """
-        with self._lock:
+        with self._write_section():
             return self._save_data_internal(tipo, df)
     
+    def _add_record_internal(self, tipo, dados):
+        """Internal version without lock (dados já validados)"""
+        return self._add_records_internal(tipo, [dados])[0]
+    
+    def _add_records_internal(self, tipo, registros):
+        """Internal version without lock (registros já validados); retorna os IDs"""
+        df = self._get_data_internal(tipo)
+        
+        # Gera novos IDs em um único bloco da sequência da tabela
+        # (registros com 'id' reservado com allocate_ids mantêm o seu)
+        sem_id = [dados for dados in registros if dados.get('id') is None]
+        if sem_id:
+            for dados, novo_id in zip(sem_id, self._storage.allocate_ids(tipo, len(sem_id))):
+                dados['id'] = novo_id
+        
+        agora = datetime.now()
+        for dados in registros:
+            # Datas e números gravados no formato canônico
+            for coluna in dados:
+                dados[coluna] = canonical_value(coluna, dados[coluna])
+            
+            # Adiciona data de cadastro se não existir
+            if 'data_cadastro' in df.columns and 'data_cadastro' not in dados:
+                dados['data_cadastro'] = agora.strftime('%Y-%m-%d %H:%M:%S')
+            
+            # Adiciona data de matrícula para cadastro geral
+            if tipo == 'cadastro' and 'data_matricula' not in dados:
+                dados['data_matricula'] = agora.strftime('%Y-%m-%d')
+        
+        # Anexa ao final do arquivo quando possível (sem reescrever o CSV);
+        # nas tabelas com write-behind, a escrita é adiada para o flush
+        if self._can_append(tipo, registros):
+            if tipo in self._write_behind and not self._in_transaction:
+                self._buffer_records_internal(tipo, registros)
+            else:
+                self._append_records_internal(tipo, registros)
+        else:
+            # Converte para DataFrame e concatena
+            novo_df = pd.DataFrame(registros)
+            df = pd.concat([df, novo_df], ignore_index=True)
+            self._save_data_internal(tipo, df)
+        
+        return [dados['id'] for dados in registros]
+    
     def add_record(self, tipo, dados):
         """
         Adiciona novo registro com validação
         
         Args:
             tipo: Tipo de dado
-            dados: Dicionário com os dados
+            dados: Dicionário com os dados (um 'id' reservado com
+                   allocate_ids é mantido; sem 'id', um novo é gerado)
             
         Returns:
             int: ID do novo registro ou None se falhou
@@ -376,31 +1344,110 @@ class DataManager:
         if not valido:
             raise ValueError(f"Validação falhou: {erro}")
         
-        with self._lock:
-            df = self._get_data_internal(tipo)
-            
-            # Gera novo ID
-            if len(df) == 0:
-                novo_id = 1
-            else:
-                novo_id = df['id'].max() + 1
-            
-            dados['id'] = novo_id
-            
-            # Adiciona data de cadastro se não existir
-            if 'data_cadastro' in df.columns and 'data_cadastro' not in dados:
-                dados['data_cadastro'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Adiciona data de matrícula para cadastro geral
-            if tipo == 'cadastro' and 'data_matricula' not in dados:
-                dados['data_matricula'] = datetime.now().strftime('%Y-%m-%d')
+        with self._write_section():
+            return self._add_record_internal(tipo, dados)
+    
+    def add_records(self, tipo, registros):
+        """
+        Adiciona vários registros de uma vez
+        
+        A validação é feita em uma passada vetorizada, os IDs vêm de um único
+        bloco da sequência e as linhas válidas são gravadas em uma só escrita
+        (append no CSV, um INSERT em lote no SQLite). Registros inválidos são
+        reportados sem interromper o lote.
+        
+        Args:
+            tipo: Tipo de dado
+            registros: Lista de dicionários com os dados
             
-            # Converte para DataFrame e concatena
-            novo_df = pd.DataFrame([dados])
-            df = pd.concat([df, novo_df], ignore_index=True)
+        Returns:
+            list: Um resultado por registro, na ordem recebida:
+                  {'sucesso': bool, 'id': int ou None, 'erro': str ou None}
+        """
+        erros = self._validate_rows(tipo, registros)
+        validos = [dict(dados) for dados, erro in zip(registros, erros) if erro is None]
+        
+        with self._write_section():
+            ids = iter(self._add_records_internal(tipo, validos) if validos else [])
+        
+        return [
+            {'sucesso': True, 'id': next(ids), 'erro': None} if erro is None
+            else {'sucesso': False, 'id': None, 'erro': erro}
+            for erro in erros
+        ]
+    
+    def allocate_ids(self, tipo, quantidade=1):
+        """
+        Reserva IDs novos na sequência persistida da tabela
+        
+        A alocação é O(1) e segura entre threads e processos (lock de arquivo
+        no CSV, transação no SQLite). IDs nunca são reutilizados, mesmo após
+        exclusões ou transações desfeitas.
+        
+        Args:
+            tipo: Tipo de dado
+            quantidade: Número de IDs (blocos para inserções em lote)
             
-            self._save_data_internal(tipo, df)
-            return novo_id
+        Returns:
+            range: IDs reservados, em ordem crescente
+        """
+        return self._storage.allocate_ids(tipo, quantidade)
+    
+    def _update_record_internal(self, tipo, record_id, dados):
+        """Internal version without lock"""
+        df = self._get_data_internal(tipo)
+        
+        if len(df) == 0:
+            return False
+        
+        # Atualiza os dados
+        idx = df[df['id'] == record_id].index
+        if len(idx) == 0:
+            return False
+        
+        alteracoes = {key: value for key, value in dados.items() if key in df.columns}
+        # Valores como seriam lidos do armazenamento: o cache mantido no lugar
+        # fica idêntico a uma releitura
+        if alteracoes:
+            _, linha = serialize_rows([alteracoes], list(alteracoes))
+            alteracoes = self._normalize_types(linha, tipo).iloc[0].to_dict()
+        
+        cache_atual = self._journal is None and self._is_cache_valid(tipo)
+        anterior = self._records(df.loc[idx[:1]])[0] if cache_atual else None
+        
+        # As colunas alteradas deixam de compartilhar o buffer do cache e de
+        # ter o texto original sem conversão
+        _own_columns(df, list(alteracoes))
+        originais = self._unparsed_for_write(tipo)
+        for key in alteracoes:
+            originais.get(key, {}).pop(record_id, None)
+        for key, value in alteracoes.items():
+            value = align_value(df, key, value)
+            allow_value(df, key, value)
+            df.at[idx[0], key] = value
+        drop_unused_categories(tipo, df, list(alteracoes))
+        
+        if self._storage.row_writes and self._journal is None:
+            # Escrita apenas da linha alterada (que pode estar no buffer de write-behind)
+            self._flush_internal(tipo)
+            self._storage.update_row(tipo, record_id, alteracoes)
+            self._refresh_cache_after_write(tipo, df, cache_atual)
+        else:
+            self._save_data_internal(tipo, df, manter_cache=cache_atual)
+        
+        # Índices atualizados junto com o cache, depois da gravação: leitores
+        # que rodam durante a gravação veem cache e índices da versão anterior
+        if cache_atual and tipo in self._cache:
+            posicao = df.index.get_loc(idx[0])
+            self._unindex_record(tipo, anterior, posicao)
+            self._index_record(tipo, self._records(df.loc[idx[:1]])[0], posicao)
+            # Data movida para outro mês: a linha vai para a posição da nova partição
+            if PARTITIONED_TABLES.get(tipo) in alteracoes:
+                ordenado = self._partition_ordered(tipo, df)
+                if ordenado is not df:
+                    self._cache_put(tipo, ordenado, self._cache_bytes.get(tipo))
+                    self._reindex_positions(tipo, ordenado)
+        return True
     
     def update_record(self, tipo, record_id, dados):
         """
@@ -422,24 +1469,40 @@ class DataManager:
             if field in self._required_fields.get(tipo, []):
                 if dados[field] is None or str(dados[field]).strip() == '':
                     raise ValueError(f"Campo obrigatório não pode ser vazio: {field}")
+        valido, erro = self._validate_typed(tipo, dados)
+        if not valido:
+            raise ValueError(f"Validação falhou: {erro}")
         
-        with self._lock:
-            df = self._get_data_internal(tipo)
-            
-            if len(df) == 0:
-                return False
-            
-            # Atualiza os dados
-            idx = df[df['id'] == record_id].index
-            if len(idx) > 0:
-                for key, value in dados.items():
-                    if key in df.columns:
-                        df.at[idx[0], key] = value
-                
-                self._save_data_internal(tipo, df)
-                return True
-            
+        with self._write_section():
+            return self._update_record_internal(tipo, record_id, dados)
+    
+    def _delete_record_internal(self, tipo, record_id):
+        """Internal version without lock"""
+        df = self._get_data_internal(tipo)
+        
+        if len(df) == 0:
             return False
+        
+        cache_atual = self._journal is None and self._is_cache_valid(tipo)
+        mascara = df['id'] == record_id
+        removidos = self._records(df[mascara]) if cache_atual else []
+        removidas = mascara.to_numpy().nonzero()[0].tolist()
+        
+        df = drop_unused_categories(tipo, df[~mascara].reset_index(drop=True))
+        
+        if self._storage.row_writes and self._journal is None:
+            # Escrita apenas da linha removida (que pode estar no buffer de write-behind)
+            self._flush_internal(tipo)
+            self._storage.delete_row(tipo, record_id)
+            self._refresh_cache_after_write(tipo, df, cache_atual)
+        else:
+            self._save_data_internal(tipo, df, manter_cache=cache_atual)
+        
+        if cache_atual and tipo in self._cache:
+            for registro, posicao in zip(removidos, removidas):
+                self._unindex_record(tipo, registro, posicao)
+            self._shift_positions(tipo, removidas)
+        return True
     
     def delete_record(self, tipo, record_id):
         """
@@ -452,20 +1515,18 @@ class DataManager:
         Returns:
             bool: True se deletou com sucesso
         """
-        with self._lock:
-            df = self._get_data_internal(tipo)
-            
-            if len(df) == 0:
-                return False
-            
-            df = df[df['id'] != record_id]
-            self._save_data_internal(tipo, df)
-            return True
+        with self._write_section():
+            return self._delete_record_internal(tipo, record_id)
     
     def execute_transaction(self, operations):
         """
         Executa múltiplas operações de forma atômica
         
+        No backend CSV as operações são registradas em um journal em memória
+        e aplicadas sobre versões de trabalho das tabelas; o commit grava cada
+        tabela alterada uma única vez (arquivo temporário + rename). No
+        backend SQLite é usada a transação nativa do banco.
+        
         Args:
             operations: Lista de tuplas (operacao, tipo, *args)
                        operacao pode ser: 'add', 'update', 'delete'
@@ -480,88 +1541,138 @@ class DataManager:
             ]
         """
         results = []
-        backups = {}
-        
-        try:
-            with self._lock:
-                # Faz backup de todos os tipos afetados
-                tipos_afetados = set(op[1] for op in operations)
-                for tipo in tipos_afetados:
-                    backups[tipo] = self._get_data_internal(tipo).copy()
-                
+        tipos_afetados = set(op[1] for op in operations)
+        commit_iniciado = False
+        
+        with self._write_section():
+            # Inserções pendentes do write-behind são gravadas antes; dentro da
+            # transação as inserções não passam pelo buffer
+            self._flush_internal()
+            self._in_transaction = True
+            if not self._storage.transactional:
+                self._journal = {}
+            
+            try:
                 # Executa operações SEM nested locks
-                for operation in operations:
-                    op_type = operation[0]
-                    tipo = operation[1]
-                    
-                    if op_type == 'add':
-                        dados = operation[2]
-                        # Valida
-                        valido, erro = self._validate_data(tipo, dados)
-                        if not valido:
-                            raise ValueError(f"Validação falhou: {erro}")
+                with self._storage.transaction():
+                    for operation in operations:
+                        op_type = operation[0]
+                        tipo = operation[1]
+                        
+                        if op_type == 'add':
+                            dados = operation[2]
+                            # Valida
+                            valido, erro = self._validate_data(tipo, dados)
+                            if not valido:
+                                raise ValueError(f"Validação falhou: {erro}")
+                            
+                            novo_id = self._add_record_internal(tipo, dados)
+                            results.append(('add', tipo, novo_id))
+                        
+                        elif op_type == 'update':
+                            record_id = operation[2]
+                            dados = operation[3]
+                            valido, erro = self._validate_typed(tipo, dados)
+                            if not valido:
+                                raise ValueError(f"Validação falhou: {erro}")
+                            atualizado = self._update_record_internal(tipo, record_id, dados)
+                            results.append(('update', tipo, atualizado))
+                        
+                        elif op_type == 'delete':
+                            record_id = operation[2]
+                            self._delete_record_internal(tipo, record_id)
+                            results.append(('delete', tipo, True))
                         
-                        # Adiciona
-                        df = self._get_data_internal(tipo)
-                        novo_id = 1 if len(df) == 0 else df['id'].max() + 1
-                        dados['id'] = novo_id
-                        if 'data_cadastro' in df.columns and 'data_cadastro' not in dados:
-                            dados['data_cadastro'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        novo_df = pd.DataFrame([dados])
-                        df = pd.concat([df, novo_df], ignore_index=True)
-                        self._save_data_internal(tipo, df)
-                        results.append(('add', tipo, novo_id))
-                    
-                    elif op_type == 'update':
-                        record_id = operation[2]
-                        dados = operation[3]
-                        # Atualiza
-                        df = self._get_data_internal(tipo)
-                        idx = df[df['id'] == record_id].index
-                        if len(idx) > 0:
-                            for key, value in dados.items():
-                                if key in df.columns:
-                                    df.at[idx[0], key] = value
-                            self._save_data_internal(tipo, df)
-                            results.append(('update', tipo, True))
                         else:
-                            results.append(('update', tipo, False))
+                            raise ValueError(f"Operação inválida: {op_type}")
                     
-                    elif op_type == 'delete':
-                        record_id = operation[2]
-                        df = self._get_data_internal(tipo)
-                        df = df[df['id'] != record_id]
-                        self._save_data_internal(tipo, df)
-                        results.append(('delete', tipo, True))
-                    
-                    else:
-                        raise ValueError(f"Operação inválida: {op_type}")
+                    # Commit do journal: uma escrita atômica por tabela alterada.
+                    # Durante a gravação os leitores continuam sobre o cache,
+                    # que ainda tem as versões anteriores à transação
+                    if self._journal:
+                        commit_iniciado = True
+                        journal, self._journal = self._journal, None
+                        self._in_transaction = False
+                        with self._lock.downgrade():
+                            self._storage.commit_tables({
+                                tipo: text_frame(df, self._journal_unparsed.get(tipo, self._unparsed.get(tipo)))
+                                for tipo, df in journal.items()
+                            })
+                        for tipo in journal:
+                            self._appended_rows[tipo] = 0
+                            self._invalidate_cache(tipo)
                 
                 return True, results, None
                 
-        except Exception as e:
-            # Rollback: restaura backups
-            for tipo, backup_df in backups.items():
-                self._save_data_internal(tipo, backup_df)
+            except Exception as e:
+                # Rollback: o journal é descartado sem tocar no disco; no SQLite
+                # o banco já desfez as escritas e o cache em memória é descartado
+                if self._storage.transactional or commit_iniciado:
+                    for tipo in tipos_afetados:
+                        self._invalidate_cache(tipo)
+                
+                return False, results, str(e)
             
-            return False, results, str(e)
+            finally:
+                self._journal = None
+                self._journal_unparsed = {}
+                self._in_transaction = False
     
     def clear_cache(self):
         """Limpa todo o cache"""
         with self._lock:
+            for tipo in self._cache:
+                self._retire_version(tipo)
+                self._metrics.increment('invalidations', tipo)
             self._cache.clear()
-            self._cache_timestamp.clear()
+            self._cache_signature.clear()
+            self._cache_bytes.clear()
+            self._column_cache.clear()
+            self._unparsed.clear()
             self._indexes.clear()
     
     def get_cache_stats(self):
-        """Retorna estatísticas do cache"""
-        stats = {
-            'cached_types': list(self._cache.keys()),
-            'cache_sizes': {k: len(v) for k, v in self._cache.items()},
-            'indexes': {k: list(v.keys()) for k, v in self._indexes.items()}
-        }
+        """
+        Retorna estatísticas do cache
+        
+        Além das tabelas e índices em cache, inclui por tabela: acertos e
+        faltas (hits/misses), descartes pelo orçamento de memória
+        (evictions), invalidações por escrita ou clear_cache (invalidations),
+        tempo acumulado de leitura do armazenamento e de construção de
+        índices (load_seconds/index_seconds) e a memória de cada DataFrame (memory_bytes, com
+        memory_usage(deep=True) medido na carga), usada no orçamento do LRU.
+        Em 'snapshots': snapshots abertas e versões substituídas que elas
+        ainda mantêm em memória.
+        """
+        with self._lock:
+            stats = {
+                'cached_types': list(self._cache.keys()),
+                'cache_sizes': {k: len(v) for k, v in self._cache.items()},
+                'indexes': {k: list(v.keys()) for k, v in self._indexes.items()},
+                'pending_writes': {k: sum(len(p) for p in v) for k, v in self._pending.items() if v},
+                'memory_bytes': dict(self._cache_bytes),
+                'projected_columns': {k: list(v['columns']) for k, v in self._column_cache.items()},
+                'projected_memory_bytes': {k: v['bytes'] for k, v in self._column_cache.items()},
+                'cache_max_bytes': self._cache_max_bytes,
+                'pinned_tables': sorted(self._pinned_tables)
+            }
+            # Snapshots abertas e versões antigas que elas ainda mantêm em memória
+            with self._snapshots_lock:
+                antigas = {id(df) for s in self._snapshots for t, df in s.tables.items()
+                           if df is not self._cache.get(t)}
+                stats['snapshots'] = {'open': len(self._snapshots), 'retained_versions': len(antigas)}
+            stats.update(self._metrics.snapshot())
         return stats
     
+    def get_cache_metrics_text(self):
+        """Estatísticas do cache no formato texto do Prometheus"""
+        return prometheus_text(self.get_cache_stats())
+    
+    def reset_cache_metrics(self):
+        """Zera os contadores de acertos, faltas, descartes e tempos"""
+        with self._lock:
+            self._metrics.reset()
+    
     def get_record(self, tipo, record_id):
         """
         Retorna registro específico usando índice quando possível
@@ -573,19 +1684,21 @@ class DataManager:
         Returns:
             dict: Dados do registro ou None
         """
-        # Tenta usar índice primeiro (mais rápido)
-        if tipo in self._indexes and 'id' in self._indexes[tipo]:
-            return self._indexes[tipo]['id'].get(record_id)
+        # Revalida o cache (e seus índices) antes de usar o índice
+        with self._read_section(tipo):
+            df = self._get_data_internal(tipo)
+            indexes = self._indexes_for(tipo)
+            if 'id' in indexes:
+                return indexes['id'].get(record_id)
         
         # Fallback para busca no DataFrame
-        df = self.get_data(tipo)
         
         if len(df) == 0:
             return None
         
         record = df[df['id'] == record_id]
         if len(record) > 0:
-            return record.iloc[0].to_dict()
+            return self._records(record.iloc[:1])[0]
         
         return None
     
@@ -601,15 +1714,24 @@ class DataManager:
         """
         cpf_clean = str(cpf).replace('.', '').replace('-', '').strip()
         
-        if 'cadastro' in self._indexes and 'cpf' in self._indexes['cadastro']:
-            return self._indexes['cadastro']['cpf'].get(cpf_clean)
+        with self._read_section('cadastro'):
+            self._get_data_internal('cadastro')
+            indexes = self._indexes_for('cadastro')
+            if 'cpf' in indexes:
+                registros = indexes['cpf'].get(cpf_clean)
+                # Com CPF repetido, vale o último registro (como antes)
+                return registros[-1] if registros else None
         
         # Fallback para busca tradicional
-        return self.search_records('cadastro', 'cpf', cpf).to_dict('records')[0] if len(self.search_records('cadastro', 'cpf', cpf)) > 0 else None
+        registros = self._records(self.search_records('cadastro', 'cpf', cpf))
+        return registros[0] if registros else None
     
     def search_by_name(self, nome):
         """
-        Busca otimizada por nome usando índice
+        Busca otimizada por nome usando índice de trigramas
+        
+        Encontra o trecho em qualquer posição do nome completo ou do nome
+        social, ignorando acentos e maiúsculas.
         
         Args:
             nome: Nome ou parte do nome
@@ -620,34 +1742,108 @@ class DataManager:
         if not nome:
             return []
         
-        first_word = str(nome).split()[0].upper()
+        with self._read_section('cadastro'):
+            df = self._get_data_internal('cadastro')
+            if len(df) == 0:
+                return []
+            
+            ids = set()
+            for campo in ['nome_completo', 'nome_social']:
+                encontrados = self._text_search_internal('cadastro', campo, nome)
+                if encontrados:
+                    ids |= encontrados
+        
+        return self._records(df[df['id'].isin(list(ids))])
+    
+    def _text_search_internal(self, tipo, campo, valor):
+        """
+        IDs dos registros cujo campo contém valor, pelo índice de trigramas
         
-        if 'cadastro' in self._indexes and 'nome' in self._indexes['cadastro']:
-            # Busca usando índice
-            results = []
-            for key, records in self._indexes['cadastro']['nome'].items():
-                if first_word in key or key in first_word:
-                    results.extend(records)
-            return results
+        O índice de cada campo é construído na primeira busca e depois mantido
+        incrementalmente por _index_record/_unindex_record.
         
-        # Fallback para busca tradicional
-        df = self.search_records('cadastro', 'nome_completo', nome)
-        return df.to_dict('records') if len(df) > 0 else []
+        Returns:
+            set: IDs encontrados, ou None se o campo não tiver índice de texto
+        """
+        if campo not in self._text_index_fields.get(tipo, []):
+            return None
+        
+        df = self._get_data_internal(tipo)
+        if self._journal is not None or 'id' not in df.columns or campo not in df.columns:
+            return None
+        
+        texto = self._indexes_for(tipo).setdefault('texto', {})
+        if campo not in texto:
+            indice = TrigramIndex()
+            for record_id, valor_campo in zip(df['id'].tolist(), as_text(df[campo]).tolist()):
+                indice.add(record_id, valor_campo)
+            texto[campo] = indice
+        
+        return texto[campo].search(valor)
+    
+    def _text_search(self, tipo, campo, valor):
+        """Versão com lock de _text_search_internal"""
+        with self._read_section(tipo):
+            return self._text_search_internal(tipo, campo, valor)
     
     def search_records(self, tipo, campo, valor):
-        """Busca registros por campo"""
-        df = self.get_data(tipo)
+        """
+        Busca registros por campo
+        
+        Nos campos de nome do cadastro a busca usa o índice de trigramas
+        (substring sem diferenciar acentos e maiúsculas).
+        """
+        with self._read_section(tipo):
+            df = self._get_data_internal(tipo)
+            ids = self._text_search_internal(tipo, campo, valor) if len(df) > 0 else None
         
         if len(df) == 0 or campo not in df.columns:
             return pd.DataFrame()
         
-        # Busca case-insensitive para strings
-        if df[campo].dtype == 'object':
-            mask = df[campo].astype(str).str.contains(str(valor), case=False, na=False)
+        if ids is not None:
+            return df[df['id'].isin(list(ids))]
+        
+        # Busca case-insensitive para strings (inclusive colunas categóricas);
+        # datas e números convertidos são comparados no texto do armazenamento
+        serie = as_text(df[campo])
+        if serie.dtype == 'object' or isinstance(serie.dtype, pd.CategoricalDtype):
+            mask = serie.astype(str).str.contains(str(valor), case=False, na=False)
             return df[mask]
         else:
             return df[df[campo] == valor]
     
+    def get_by_aluno(self, tipo, aluno_id):
+        """
+        Retorna os registros de um aluno em uma tabela satélite usando índice
+        
+        Substitui o filtro df[df['aluno_id'] == aluno_id], que percorre a
+        tabela inteira, por uma consulta ao índice aluno_id → posições; as
+        linhas saem do DataFrame do cache, com os mesmos tipos de get_data.
+        
+        Args:
+            tipo: Tipo de dado (pei, socioeconomico, saude, attendance...)
+            aluno_id: ID do aluno
+            
+        Returns:
+            DataFrame com os registros do aluno (vazio se não houver)
+        """
+        with self._read_section(tipo):
+            df = self._get_data_internal(tipo)
+            if len(df) == 0 or 'aluno_id' not in df.columns:
+                return df.iloc[0:0]
+            
+            try:
+                aluno_id = int(aluno_id)
+            except (TypeError, ValueError):
+                return df.iloc[0:0]
+            
+            indexes = self._indexes_for(tipo)
+            if 'aluno_id' not in indexes:
+                # Sem índice (tabela sem coluna id): busca tradicional
+                return df[df['aluno_id'] == aluno_id]
+            
+            return df.iloc[indexes['aluno_id'].get(aluno_id, [])]
+    
     def get_all_student_data(self, aluno_id):
         """Retorna todos os dados de um aluno"""
         dados = {}
@@ -658,42 +1854,172 @@ class DataManager:
             dados['cadastro'] = cadastro
         
         # PEI
-        pei_df = self.get_data('pei')
-        if len(pei_df) > 0:
-            pei = pei_df[pei_df['aluno_id'] == aluno_id]
-            if len(pei) > 0:
-                dados['pei'] = pei.iloc[0].to_dict()
+        pei = self.get_by_aluno('pei', aluno_id)
+        if len(pei) > 0:
+            dados['pei'] = self._records(pei.iloc[:1])[0]
         
         # Socioeconômico
-        socio_df = self.get_data('socioeconomico')
-        if len(socio_df) > 0:
-            socio = socio_df[socio_df['aluno_id'] == aluno_id]
-            if len(socio) > 0:
-                dados['socioeconomico'] = socio.iloc[0].to_dict()
+        socio = self.get_by_aluno('socioeconomico', aluno_id)
+        if len(socio) > 0:
+            dados['socioeconomico'] = self._records(socio.iloc[:1])[0]
         
         # Saúde
-        saude_df = self.get_data('saude')
-        if len(saude_df) > 0:
-            saude = saude_df[saude_df['aluno_id'] == aluno_id]
-            if len(saude) > 0:
-                dados['saude'] = saude.iloc[0].to_dict()
+        saude = self.get_by_aluno('saude', aluno_id)
+        if len(saude) > 0:
+            dados['saude'] = self._records(saude.iloc[:1])[0]
         
         # Questionário SAEB
-        saeb_df = self.get_data('questionario_saeb')
-        if len(saeb_df) > 0:
-            saeb = saeb_df[saeb_df['aluno_id'] == aluno_id]
-            if len(saeb) > 0:
-                dados['questionario_saeb'] = saeb.iloc[0].to_dict()
+        saeb = self.get_by_aluno('questionario_saeb', aluno_id)
+        if len(saeb) > 0:
+            dados['questionario_saeb'] = self._records(saeb.iloc[:1])[0]
         
         # Anamnese Pedagógica PEI
-        anamnese_df = self.get_data('anamnese_pei')
-        if len(anamnese_df) > 0:
-            anamnese = anamnese_df[anamnese_df['aluno_id'] == aluno_id]
-            if len(anamnese) > 0:
-                dados['anamnese_pei'] = anamnese.iloc[0].to_dict()
+        anamnese = self.get_by_aluno('anamnese_pei', aluno_id)
+        if len(anamnese) > 0:
+            dados['anamnese_pei'] = self._records(anamnese.iloc[:1])[0]
         
         return dados
     
+    def get_students_bundle(self, ids):
+        """
+        Retorna os dados completos de vários alunos de uma só vez
+        
+        Cada tabela é lida uma única vez e unida aos IDs pedidos por hash
+        (isin + dicionário), em vez de uma consulta por aluno e por tabela.
+        Usado nas exportações em lote (ZIP e PDFs).
+        
+        Args:
+            ids: IDs dos alunos
+            
+        Returns:
+            dict: aluno_id → dados no mesmo formato de get_all_student_data
+        """
+        bundle = {int(aluno_id): {} for aluno_id in ids}
+        if not bundle:
+            return bundle
+        
+        tipos = ['cadastro', 'pei', 'socioeconomico', 'saude', 'questionario_saeb', 'anamnese_pei']
+        with self._read_section(*tipos):
+            tabelas = {tipo: self._get_data_internal(tipo) for tipo in tipos}
+        
+        for tipo, df in tabelas.items():
+            chave = 'id' if tipo == 'cadastro' else 'aluno_id'
+            if len(df) == 0 or chave not in df.columns:
+                continue
+            
+            # Primeiro registro de cada aluno, como em get_all_student_data
+            selecionados = df[df[chave].isin(list(bundle))].drop_duplicates(chave)
+            for registro in self._records(selecionados):
+                aluno_id = registro[chave]
+                if tipo == 'cadastro':
+                    # Mesmo formato de get_record (sem a chave 'id')
+                    del registro['id']
+                bundle[aluno_id][tipo] = registro
+        
+        return bundle
+    
+    def _attendance_aggregates_internal(self):
+        """
+        Agregados de presença (AttendanceAggregates) sobre a tabela attendance
+        
+        Construídos na primeira consulta com uma passada pelos registros e
+        depois mantidos incrementalmente por _index_record/_unindex_record a
+        cada inserção, atualização ou exclusão. Os totais por turno e turma
+        seguem o cadastro atual: as escritas no cadastro movem as presenças
+        do aluno para o novo grupo. São descartados junto com os índices
+        quando attendance ou cadastro mudam por fora (reescrita completa,
+        outro processo).
+        """
+        # Cadastro primeiro: se for recarregado, descarta os agregados antigos
+        df_alunos = self._get_data_internal('cadastro')
+        df = self._get_data_internal('attendance')
+        
+        def construir():
+            agregados = AttendanceAggregates()
+            if 'aluno_id' in df.columns and 'data' in df.columns:
+                for aluno_id, data in zip(df['aluno_id'].tolist(), as_text(df['data']).tolist()):
+                    agregados.add(aluno_id, data)
+            if 'id' in df_alunos.columns:
+                for campo in ATTENDANCE_GROUP_FIELDS:
+                    if campo in df_alunos.columns:
+                        for aluno_id, grupo in zip(df_alunos['id'].tolist(), df_alunos[campo].tolist()):
+                            if pd.notna(grupo) and grupo != '':
+                                agregados.set_group(campo, aluno_id, grupo)
+            return agregados
+        
+        # Dentro de uma transação a versão de trabalho não tem índices
+        if self._journal is not None and 'attendance' in self._journal:
+            return construir()
+        
+        indexes = self._indexes_for('attendance')
+        if 'presencas' not in indexes:
+            indexes['presencas'] = construir()
+        return indexes['presencas']
+    
+    def get_attendance_stats(self, data_inicio=None, data_fim=None, aluno_id=None, top=10):
+        """
+        Estatísticas de presença a partir dos agregados (sem varrer os registros)
+        
+        Args:
+            data_inicio: Data inicial 'AAAA-MM-DD' (None = sem limite)
+            data_fim: Data final 'AAAA-MM-DD' (None = sem limite)
+            aluno_id: Restringe as contagens a um aluno
+            top: Número de alunos em by_student
+            
+        Returns:
+            dict: {
+                'total': registros no intervalo,
+                'school_days': dias com presença no intervalo,
+                'by_day': Series data (datetime64) → registros,
+                'by_student': Series aluno_id → registros (top alunos),
+                'by_shift': Series turno → registros,
+                'by_class': Series ano_escolar → registros
+            }
+        """
+        with self._read_section('attendance', 'cadastro'):
+            agregados = self._attendance_aggregates_internal()
+            if aluno_id is not None:
+                aluno_id = int(aluno_id)
+            total = agregados.count(data_inicio, data_fim, aluno_id)
+            
+            if aluno_id is None:
+                mais_presentes = agregados.by_student(data_inicio, data_fim, top=top)
+            else:
+                mais_presentes = {aluno_id: total} if total else {}
+            
+            def por_grupo(campo):
+                if aluno_id is None:
+                    return pd.Series(agregados.by_group(campo, data_inicio, data_fim), dtype=int)
+                grupo = agregados.group_of(campo, aluno_id)
+                return pd.Series({grupo: total} if grupo is not None and total else {}, dtype=int)
+            
+            por_dia = pd.Series(agregados.by_day(data_inicio, data_fim, aluno_id), dtype=int)
+            por_dia.index = pd.to_datetime(por_dia.index, format='%Y-%m-%d', errors='coerce')
+            return {
+                'total': total,
+                'school_days': len(agregados.school_days(data_inicio, data_fim)),
+                'by_day': por_dia,
+                'by_student': pd.Series(mais_presentes, dtype=int),
+                'by_shift': por_grupo('turno'),
+                'by_class': por_grupo('ano_escolar')
+            }
+    
+    def get_student_frequency(self, aluno_id, data_inicio=None, data_fim=None):
+        """
+        Frequência de um aluno sobre os dias letivos (dias com alguma presença)
+        
+        Args:
+            aluno_id: ID do aluno
+            data_inicio: Data inicial 'AAAA-MM-DD' (None = sem limite)
+            data_fim: Data final 'AAAA-MM-DD' (None = sem limite)
+            
+        Returns:
+            dict: present_days, school_days, rate (%), current_absence_streak e
+                  longest_absence_streak
+        """
+        with self._read_section('attendance', 'cadastro'):
+            return self._attendance_aggregates_internal().frequency(int(aluno_id), data_inicio, data_fim)
+    
     def create_backup(self, backup_path=None):
         """
         Cria backup de todos os arquivos CSV em formato ZIP
@@ -715,12 +2041,14 @@ class DataManager:
         if not os.path.exists(backup_dir):
             os.makedirs(backup_dir)
         
-        # Cria arquivo ZIP com todos os CSVs
+        # Inserções pendentes do write-behind entram no backup
+        self.flush()
+        
+        # Cria arquivo ZIP com todos os CSVs (exportados pelo engine de armazenamento)
         with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
             for tipo, filepath in self.files.items():
-                if os.path.exists(filepath):
-                    # Adiciona arquivo ao ZIP mantendo apenas o nome do arquivo
-                    zipf.write(filepath, os.path.basename(filepath))
+                # Adiciona arquivo ao ZIP mantendo apenas o nome do arquivo
+                self._storage.write_to_zip(zipf, tipo, os.path.basename(filepath))
         
         return backup_path
     
@@ -765,19 +2093,25 @@ class DataManager:
                         return False, f"Arquivo CSV inválido ({filename}): {str(e)}"
                 
                 # Faz backup dos arquivos atuais antes de substituir
+                # (incluindo as inserções pendentes do write-behind)
                 # Usa método mais seguro para recriar diretório
+                self.flush()
                 shutil.rmtree(self.backup_before_restore_dir, ignore_errors=True)
                 os.makedirs(self.backup_before_restore_dir, exist_ok=True)
                 
-                for filepath in self.files.values():
-                    if os.path.exists(filepath):
-                        shutil.copy2(filepath, self.backup_before_restore_dir)
+                for tipo, filepath in self.files.items():
+                    if self._storage.exists(tipo):
+                        dst = os.path.join(self.backup_before_restore_dir, os.path.basename(filepath))
+                        self._storage.export_csv(tipo, dst)
                 
-                # Copia arquivos restaurados para o diretório de dados
-                for filename in expected_files:
-                    src = os.path.join(temp_dir, filename)
-                    dst = os.path.join(self.data_dir, filename)
-                    shutil.copy2(src, dst)
+                # Carrega os arquivos restaurados no armazenamento
+                with self._write_section():
+                    for tipo, filepath in self.files.items():
+                        src = os.path.join(temp_dir, os.path.basename(filepath))
+                        self._preserve_for_snapshots(tipo)
+                        self._storage.import_csv(tipo, src)
+                        self._pending.pop(tipo, None)
+                        self._invalidate_cache(tipo)
                 
                 return True, "Backup restaurado com sucesso!"
                 
@@ -851,12 +2185,8 @@ class DataManager:
             if name == 'cadastro':
                 data = self._dm.get_record('cadastro', self._aluno_id)
             elif name in ['pei', 'socioeconomico', 'saude', 'questionario_saeb', 'anamnese_pei']:
-                df = self._dm.get_data(name)
-                if len(df) > 0:
-                    records = df[df['aluno_id'] == self._aluno_id]
-                    data = records.iloc[0].to_dict() if len(records) > 0 else None
-                else:
-                    data = None
+                records = self._dm.get_by_aluno(name, self._aluno_id)
+                data = self._dm._records(records.iloc[:1])[0] if len(records) > 0 else None
             else:
                 raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
             
@@ -925,21 +2255,28 @@ class DataManager:
         if page_size < 1:
             page_size = self._default_page_size
         
-        # Carrega todos os dados
-        df = self.get_data(tipo)
-        total_records = len(df)
-        total_pages = (total_records + page_size - 1) // page_size  # Arredonda para cima
-        
-        # Ajusta página se for maior que o total
-        if page > total_pages and total_pages > 0:
-            page = total_pages
-        
-        # Calcula índices
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        
-        # Extrai página
-        page_data = df.iloc[start_idx:end_idx]
+        with self._read_section(tipo):
+            # Tabela em memória (cache válido, transação ou buffer de write-behind): fatia o cache
+            if ((self._journal is not None and tipo in self._journal) or tipo not in self.files
+                    or self._pending.get(tipo) or self._cache_usable(tipo)):
+                df = self._get_data_internal(tipo)
+                total_records = len(df)
+                total_pages = (total_records + page_size - 1) // page_size  # Arredonda para cima
+                
+                # Ajusta página se for maior que o total
+                if page > total_pages and total_pages > 0:
+                    page = total_pages
+                
+                # Calcula índices e extrai página
+                start_idx = (page - 1) * page_size
+                page_data = df.iloc[start_idx:start_idx + page_size]
+            else:
+                # Lê do armazenamento apenas as linhas da página (sem carregar a tabela)
+                page_data, total_records = self._load_page_internal(tipo, (page - 1) * page_size, page_size)
+                total_pages = (total_records + page_size - 1) // page_size
+                if page > total_pages and total_pages > 0:
+                    page = total_pages
+                    page_data, total_records = self._load_page_internal(tipo, (page - 1) * page_size, page_size)
         
         return {
             'data': page_data,
@@ -951,6 +2288,16 @@ class DataManager:
             'has_prev': page > 1
         }
     
+    def _load_page_internal(self, tipo, offset, limit):
+        """Internal version without lock: (página, total) lidos direto do armazenamento"""
+        resultado = self._storage.load_page(tipo, offset, limit)
+        if resultado is None:
+            return pd.DataFrame(), 0
+        df, total = resultado
+        # Mesmo índice que a fatia do DataFrame completo teria
+        df.index = pd.RangeIndex(offset, offset + len(df))
+        return self._normalize_types(df, tipo), total
+    
     def search_records_paginated(self, tipo, campo, valor, page=1, page_size=None):
         """
         Busca registros com paginação
@@ -1069,52 +2416,148 @@ class DataManager:
             self._offset = offset
             return self
         
-        def execute(self):
+        # Custo relativo das máscaras (menor primeiro): igualdade é vetorizada e
+        # seletiva; operações de string percorrem cada valor em Python
+        _MASK_COST = {'=': 0, 'in': 0, '>': 1, '<': 1, '>=': 1, '<=': 1,
+                      '!=': 2, 'contains': 3, 'startswith': 3, 'endswith': 3}
+        
+        def _index_lookup(self, indexes, df, campo, operador, valor):
             """
-            Executa a query e retorna resultados
+            Resolve um filtro por índice (chamado com o lock do DataManager)
             
             Returns:
-                DataFrame: Resultados da query
+                set: IDs candidatos, ou None se nenhum índice atende o filtro
             """
-            # Carrega dados
-            df = self._dm.get_data(self._tipo)
-            
-            if len(df) == 0:
-                return df
+            if operador in ('=', 'in'):
+                valores = [valor] if operador == '=' else list(valor)
+                if campo == 'id' and 'id' in indexes:
+                    return {v for v in valores if v in indexes['id']}
+                if campo == 'aluno_id' and 'aluno_id' in indexes:
+                    ids = df['id'].to_numpy()
+                    return {int(ids[p]) for v in valores for p in indexes['aluno_id'].get(v, [])}
+                if campo == 'cpf' and 'cpf' in indexes:
+                    # O índice usa o CPF sem pontuação: confirma o valor exato
+                    ids = set()
+                    for v in valores:
+                        chave = self._dm._cpf_key({'cpf': v})
+                        if not chave:
+                            return None
+                        ids.update(r['id'] for r in indexes['cpf'].get(chave, []) if r.get('cpf') == v)
+                    return ids
+            elif operador in ('contains', 'startswith'):
+                return self._dm._text_search_internal(self._tipo, campo, valor)
+            return None
+        
+        def _plan(self, df):
+            """
+            Monta o plano: filtros por índice primeiro (menor conjunto de
+            candidatos antes), depois máscaras em ordem de custo
             
-            # Aplica filtros
-            for filter_def in self._filters:
-                campo = filter_def['campo']
-                operador = filter_def['operador']
-                valor = filter_def['valor']
-                
-                if campo not in df.columns:
+            Os filtros são combinados com E, então a ordem não muda o resultado.
+            Chamado com o lock do DataManager.
+            """
+            indexes = self._dm._indexes_for(self._tipo)
+            por_indice = []
+            mascaras = []
+            for filtro in self._filters:
+                if filtro['campo'] not in df.columns:
                     continue
-                
-                if operador == '=':
-                    df = df[df[campo] == valor]
-                elif operador == '!=':
-                    df = df[df[campo] != valor]
-                elif operador == '>':
-                    df = df[df[campo] > valor]
+                ids = self._index_lookup(indexes, df, filtro['campo'], filtro['operador'], filtro['valor'])
+                if ids is None:
+                    mascaras.append(dict(filtro))
+                    continue
+                por_indice.append({**filtro, 'ids': ids})
+                if filtro['operador'] == 'startswith':
+                    # O trigrama ignora acentos/maiúsculas e a posição: o prefixo
+                    # exato é conferido por máscara nos candidatos
+                    mascaras.append(dict(filtro))
+            
+            por_indice.sort(key=lambda passo: len(passo['ids']))
+            mascaras.sort(key=lambda passo: self._MASK_COST.get(passo['operador'], 4))
+            return por_indice, mascaras
+        
+        @staticmethod
+        def _apply_mask(df, filtro):
+            campo = filtro['campo']
+            operador = filtro['operador']
+            valor = filtro['valor']
+            
+            if operador == '=':
+                return df[df[campo] == valor]
+            elif operador == '!=':
+                return df[df[campo] != valor]
+            elif operador in ('>', '<', '>=', '<='):
+                # Colunas categóricas não têm ordem: compara os valores
+                coluna = df[campo]
+                if isinstance(coluna.dtype, pd.CategoricalDtype):
+                    coluna = coluna.astype(object)
+                if operador == '>':
+                    return df[coluna > valor]
                 elif operador == '<':
-                    df = df[df[campo] < valor]
+                    return df[coluna < valor]
                 elif operador == '>=':
-                    df = df[df[campo] >= valor]
-                elif operador == '<=':
-                    df = df[df[campo] <= valor]
-                elif operador == 'contains':
-                    df = df[df[campo].astype(str).str.contains(str(valor), case=False, na=False)]
-                elif operador == 'startswith':
-                    df = df[df[campo].astype(str).str.startswith(str(valor), na=False)]
-                elif operador == 'endswith':
-                    df = df[df[campo].astype(str).str.endswith(str(valor), na=False)]
-                elif operador == 'in':
-                    df = df[df[campo].isin(valor)]
-            
-            # Ordena
+                    return df[coluna >= valor]
+                return df[coluna <= valor]
+            elif operador == 'contains':
+                return df[df[campo].astype(str).str.contains(str(valor), case=False, na=False)]
+            elif operador == 'startswith':
+                return df[df[campo].astype(str).str.startswith(str(valor), na=False)]
+            elif operador == 'endswith':
+                return df[df[campo].astype(str).str.endswith(str(valor), na=False)]
+            elif operador == 'in':
+                return df[df[campo].isin(valor)]
+            return df
+        
+        def _candidates(self):
+            """
+            Lê a tabela e resolve os filtros por índice sob um único lock
+            
+            Returns:
+                tuple: (DataFrame, IDs candidatos ou None, máscaras pendentes)
+            """
+            with self._dm._read_section(self._tipo):
+                df = self._dm._get_data_internal(self._tipo)
+                if len(df) == 0:
+                    return df, None, []
+                por_indice, mascaras = self._plan(df)
+            
+            ids = None
+            for passo in por_indice:
+                ids = set(passo['ids']) if ids is None else ids & passo['ids']
+                if not ids:
+                    break
+            return df, ids, mascaras
+        
+        def _filtered(self):
+            """Aplica os filtros (sem ordenação, offset ou limit)"""
+            df, ids, mascaras = self._candidates()
+            if len(df) == 0:
+                return df
+            
+            if ids is not None:
+                df = df[df['id'].isin(list(ids))]
+            
+            for filtro in mascaras:
+                if len(df) == 0:
+                    break
+                df = self._apply_mask(df, filtro)
+            return df
+        
+        def _sorted(self, df):
             if self._order_by and self._order_by in df.columns:
-                df = df.sort_values(by=self._order_by, ascending=not self._order_desc)
+                # Categóricas são ordenadas pelo valor, não pela ordem das categorias
+                df = df.sort_values(by=self._order_by, ascending=not self._order_desc,
+                                    key=lambda s: s.astype(object) if isinstance(s.dtype, pd.CategoricalDtype) else s)
+            return df
+        
+        def execute(self):
+            """
+            Executa a query e retorna resultados
+            
+            Returns:
+                DataFrame: Resultados da query
+            """
+            df = self._sorted(self._filtered())
             
             # Aplica offset e limit
             if self._offset > 0:
@@ -1129,20 +2572,81 @@ class DataManager:
             """
             Retorna número de registros que correspondem aos filtros
             
+            Quando todos os filtros são resolvidos por índice, conta os IDs
+            candidatos sem montar DataFrame.
+            
             Returns:
                 int: Número de registros
             """
-            return len(self.execute())
+            df, ids, mascaras = self._candidates()
+            if len(df) == 0:
+                return 0
+            
+            if ids is not None and not mascaras:
+                total = len(ids)
+            elif ids is None and not mascaras:
+                total = len(df)
+            else:
+                total = len(self._filtered())
+            
+            total = max(total - self._offset, 0)
+            return total if self._limit is None else min(total, self._limit)
         
         def first(self):
             """
             Retorna primeiro registro
             
+            Sem ordenação e com filtros resolvidos por índice, localiza a linha
+            direto na tabela sem montar o DataFrame do resultado.
+            
             Returns:
                 dict ou None: Primeiro registro ou None se não houver resultados
             """
-            df = self.limit(1).execute()
-            return df.iloc[0].to_dict() if len(df) > 0 else None
+            df, ids, mascaras = self._candidates()
+            if len(df) == 0:
+                return None
+            
+            if not mascaras and not self._order_by:
+                if ids is None:
+                    posicoes = range(len(df))
+                else:
+                    posicoes = df['id'].isin(list(ids)).to_numpy().nonzero()[0]
+                if self._offset >= len(posicoes):
+                    return None
+                posicao = posicoes[self._offset]
+                return self._dm._records(df.iloc[posicao:posicao + 1])[0]
+            
+            df = self._sorted(self._filtered()).iloc[self._offset:]
+            return self._dm._records(df.iloc[:1])[0] if len(df) > 0 else None
+        
+        def explain(self):
+            """
+            Descreve o plano escolhido para a query
+            
+            Returns:
+                str: Passos na ordem de execução, com o método (índice ou máscara)
+            """
+            with self._dm._read_section(self._tipo):
+                df = self._dm._get_data_internal(self._tipo)
+                por_indice, mascaras = self._plan(df) if len(df) > 0 else ([], [])
+            
+            linhas = [f"QUERY {self._tipo} ({len(df)} registros)"]
+            passo_num = 1
+            for passo in por_indice:
+                linhas.append(f"  {passo_num}. INDEX {passo['campo']} {passo['operador']} {passo['valor']!r}"
+                              f" → {len(passo['ids'])} candidato(s)")
+                passo_num += 1
+            for passo in mascaras:
+                linhas.append(f"  {passo_num}. SCAN  {passo['campo']} {passo['operador']} {passo['valor']!r}")
+                passo_num += 1
+            ignorados = [f['campo'] for f in self._filters if f['campo'] not in df.columns]
+            if ignorados:
+                linhas.append(f"  (filtros ignorados, campo inexistente: {', '.join(ignorados)})")
+            if self._order_by:
+                linhas.append(f"  ORDER BY {self._order_by} {'DESC' if self._order_desc else 'ASC'}")
+            if self._offset or self._limit is not None:
+                linhas.append(f"  OFFSET {self._offset} LIMIT {self._limit}")
+            return '\n'.join(linhas)
         
         def paginate(self, page=1, page_size=50):
             """
@@ -1155,17 +2659,12 @@ class DataManager:
             Returns:
                 dict: Resultado paginado
             """
-            # Executa query sem limit/offset
-            original_limit = self._limit
-            original_offset = self._offset
+            # Sem filtros nem ordenação: lê só a página (get_data_paginated)
+            if not self._filters and self._order_by is None:
+                return self._dm.get_data_paginated(self._tipo, page, page_size)
             
-            self._limit = None
-            self._offset = 0
-            all_results = self.execute()
-            
-            # Restaura
-            self._limit = original_limit
-            self._offset = original_offset
+            # Filtra uma vez (sem limit/offset da query) e ordena apenas o resultado
+            all_results = self._sorted(self._filtered())
             
             # Pagina
             total_records = len(all_results)
@@ -1245,18 +2744,16 @@ class DataManager:
         if not os.path.exists(backup_dir):
             os.makedirs(backup_dir)
         
-        # Calcula tamanho original
-        original_size = 0
-        files_to_backup = []
-        for tipo, filepath in self.files.items():
-            if os.path.exists(filepath):
-                original_size += os.path.getsize(filepath)
-                files_to_backup.append(filepath)
+        # Inserções pendentes do write-behind entram no backup
+        self.flush()
         
         # Cria ZIP com compressão máxima
         with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=compression_level) as zipf:
-            for filepath in files_to_backup:
-                zipf.write(filepath, os.path.basename(filepath))
+            for tipo, filepath in self.files.items():
+                self._storage.write_to_zip(zipf, tipo, os.path.basename(filepath))
+            
+            # Calcula tamanho original
+            original_size = sum(info.file_size for info in zipf.infolist())
         
         # Calcula estatísticas
         compressed_size = os.path.getsize(backup_path)
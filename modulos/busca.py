@@ -50,14 +50,9 @@ def render_busca_rapida(data_manager):
         if termo_busca.isdigit():
             resultados = df_cadastro[df_cadastro['id'] == int(termo_busca)]
         
-        # Buscar por nome se não encontrou por ID
+        # Buscar por nome se não encontrou por ID (índice de trigramas, sem acentos)
         if len(resultados) == 0:
-            mask = df_cadastro['nome_completo'].str.contains(
-                termo_busca, 
-                case=False, 
-                na=False
-            )
-            resultados = df_cadastro[mask]
+            resultados = data_manager.search_records('cadastro', 'nome_completo', termo_busca)
         
         # Mostrar resultados
         if len(resultados) == 0:
@@ -86,25 +81,25 @@ def render_busca_avancada(data_manager):
             nome = st.text_input("Nome (parcial)")
             ano_escolar = st.multiselect(
                 "Ano Escolar",
-                options=df_cadastro['ano_escolar'].unique()
+                options=list(df_cadastro['ano_escolar'].unique())
             )
             cidade = st.multiselect(
                 "Cidade",
-                options=df_cadastro['cidade'].unique()
+                options=list(df_cadastro['cidade'].unique())
             )
         
         with col2:
             status = st.multiselect(
                 "Status",
-                options=df_cadastro['status'].unique()
+                options=list(df_cadastro['status'].unique())
             )
             turno = st.multiselect(
                 "Turno",
-                options=df_cadastro['turno'].unique()
+                options=list(df_cadastro['turno'].unique())
             )
             uf = st.multiselect(
                 "UF",
-                options=df_cadastro['uf'].unique()
+                options=list(df_cadastro['uf'].unique())
             )
         
         # Filtros adicionais
@@ -128,12 +123,8 @@ def render_busca_avancada(data_manager):
             resultados = df_cadastro.copy()
             
             if nome:
-                mask = resultados['nome_completo'].str.contains(
-                    nome, 
-                    case=False, 
-                    na=False
-                )
-                resultados = resultados[mask]
+                encontrados = data_manager.search_records('cadastro', 'nome_completo', nome)
+                resultados = resultados[resultados['id'].isin(encontrados['id'])]
             
             if ano_escolar:
                 resultados = resultados[resultados['ano_escolar'].isin(ano_escolar)]
@@ -213,6 +204,13 @@ def render_busca_avancada(data_manager):
                     for _, aluno in resultados.iterrows():
                         mostrar_detalhes_aluno(data_manager, aluno)
 
+def formatar_data(valor):
+    """Data para exibição (dd/mm/aaaa); vazio se não informada"""
+    if pd.isna(valor) or valor == '':
+        return ''
+    data = pd.to_datetime(valor, errors='coerce')
+    return data.strftime('%d/%m/%Y') if pd.notna(data) else str(valor)
+
 def mostrar_detalhes_aluno(data_manager, aluno):
     """Mostra detalhes completos de um aluno"""
     with st.expander(f"👤 {aluno['nome_completo']} (ID: {aluno['id']})", expanded=False):
@@ -221,7 +219,7 @@ def mostrar_detalhes_aluno(data_manager, aluno):
         
         with col1:
             st.write("**Dados Pessoais**")
-            st.write(f"📅 Nascimento: {aluno['data_nascimento']}")
+            st.write(f"📅 Nascimento: {formatar_data(aluno['data_nascimento'])}")
             st.write(f"📱 Telefone: {aluno['telefone']}")
             if aluno['email']:
                 st.write(f"📧 Email: {aluno['email']}")
@@ -245,7 +243,7 @@ def mostrar_detalhes_aluno(data_manager, aluno):
             st.write(f"📊 Status: {aluno['status']}")
             if aluno['escola_origem']:
                 st.write(f"🏫 Escola Origem: {aluno['escola_origem']}")
-            st.write(f"📅 Matrícula: {aluno['data_matricula']}")
+            st.write(f"📅 Matrícula: {formatar_data(aluno['data_matricula'])}")
         
         # Verificar módulos complementares
         aluno_id = aluno['id']
@@ -253,8 +251,7 @@ def mostrar_detalhes_aluno(data_manager, aluno):
         col1, col2, col3 = st.columns(3)
         
         # PEI
-        df_pei = data_manager.get_data('pei')
-        pei = df_pei[df_pei['aluno_id'] == aluno_id]
+        pei = data_manager.get_by_aluno('pei', aluno_id)
         
         with col1:
             if len(pei) > 0:
@@ -266,8 +263,7 @@ def mostrar_detalhes_aluno(data_manager, aluno):
                 st.warning("⚠️ PEI não cadastrado")
         
         # Socioeconômico
-        df_socio = data_manager.get_data('socioeconomico')
-        socio = df_socio[df_socio['aluno_id'] == aluno_id]
+        socio = data_manager.get_by_aluno('socioeconomico', aluno_id)
         
         with col2:
             if len(socio) > 0:
@@ -278,8 +274,7 @@ def mostrar_detalhes_aluno(data_manager, aluno):
                 st.warning("⚠️ Socioeconômico não cadastrado")
         
         # Saúde
-        df_saude = data_manager.get_data('saude')
-        saude = df_saude[df_saude['aluno_id'] == aluno_id]
+        saude = data_manager.get_by_aluno('saude', aluno_id)
         
         with col3:
             if len(saude) > 0:
@@ -443,18 +443,15 @@ def render_cadastro_geral(data_manager):
             else:
                 # Processar foto se fornecida
                 foto_path = ""
+                temp_id = None
                 if foto is not None:
                     try:
                         # Criar diretório de fotos se não existir
                         fotos_dir = os.path.join('data', 'fotos')
                         os.makedirs(fotos_dir, exist_ok=True)
                         
-                        # Gerar ID temporário para o nome da foto
-                        df_temp = data_manager.get_data('cadastro')
-                        if len(df_temp) == 0:
-                            temp_id = 1
-                        else:
-                            temp_id = df_temp['id'].max() + 1
+                        # Reservar o ID do aluno para o nome da foto
+                        temp_id = data_manager.allocate_ids('cadastro')[0]
                         
                         # Abrir e redimensionar imagem para tamanho padrão (3x4)
                         img = Image.open(foto)
@@ -563,6 +560,10 @@ def render_cadastro_geral(data_manager):
                     'foto_path': foto_path
                 }
                 
+                # Usa o ID já reservado para a foto
+                if temp_id is not None:
+                    dados['id'] = temp_id
+                
                 try:
                     novo_id = data_manager.add_record('cadastro', dados)
                     st.success(f"✅ Cadastro completo realizado com sucesso! ID do aluno: {novo_id}")
@@ -581,8 +582,8 @@ def render_lista_alunos(data_manager):
         st.info("Nenhum aluno cadastrado ainda.")
         return
     
-    # Obter dados do PEI para verificar alunos especiais
-    df_pei = data_manager.get_data('pei')
+    # Obter dados do PEI para verificar alunos especiais (só as colunas usadas)
+    df_pei = data_manager.get_data('pei', columns=['aluno_id', 'necessidade_especial'])
     
     # Filtros
     col1, col2, col3 = st.columns(3)
@@ -717,6 +718,8 @@ def render_lista_alunos(data_manager):
                         # Criar ZIP em memória
                         zip_buffer = io.BytesIO()
                         
+                        bundle = data_manager.get_students_bundle(df_filtrado['id'].tolist())
+                        
                         with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
                             for _, row in df_filtrado.iterrows():
                                 aluno_id = int(row['id'])
@@ -729,7 +732,8 @@ def render_lista_alunos(data_manager):
                                     incluir_anamnese=True,
                                     incluir_socio=True,
                                     incluir_saeb=True,
-                                    incluir_saude=True
+                                    incluir_saude=True,
+                                    dados_aluno=bundle.get(aluno_id)
                                 )
                                 
                                 if pdf_buffer:
@@ -770,6 +774,8 @@ def render_lista_alunos(data_manager):
                         # Criar ZIP em memória
                         zip_buffer = io.BytesIO()
                         
+                        bundle = data_manager.get_students_bundle(df_filtrado['id'].tolist())
+                        
                         with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
                             # Adicionar PDFs
                             for _, row in df_filtrado.iterrows():
@@ -783,7 +789,8 @@ def render_lista_alunos(data_manager):
                                     incluir_anamnese=True,
                                     incluir_socio=True,
                                     incluir_saeb=True,
-                                    incluir_saude=True
+                                    incluir_saude=True,
+                                    dados_aluno=bundle.get(aluno_id)
                                 )
                                 
                                 if pdf_buffer:
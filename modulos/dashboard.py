@@ -5,18 +5,19 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from schema import age_in_years
 
 def render_dashboard(data_manager):
     """Renderiza dashboard com estatísticas"""
     st.header("📊 Dashboard - Matrícula Escolar 2026")
     st.markdown("---")
     
-    # Carregar dados
+    # Carregar dados (do questionário SAEB só é preciso saber quem respondeu)
     df_cadastro = data_manager.get_data('cadastro')
     df_pei = data_manager.get_data('pei')
     df_socio = data_manager.get_data('socioeconomico')
     df_saude = data_manager.get_data('saude')
-    df_saeb = data_manager.get_data('questionario_saeb')
+    df_saeb = data_manager.get_data('questionario_saeb', columns=['aluno_id'])
     
     # Verificar se há dados
     if len(df_cadastro) == 0:
@@ -134,6 +135,25 @@ def render_dashboard(data_manager):
             fig.update_layout(showlegend=False, yaxis={'categoryorder':'total ascending'})
             st.plotly_chart(fig, use_container_width=True)
     
+    # Faixa etária (data de nascimento já vem como datetime64 do DataManager)
+    if 'data_nascimento' in df_cadastro.columns:
+        st.subheader("🎂 Alunos por Faixa Etária")
+        idades = age_in_years(df_cadastro['data_nascimento'])
+        faixas = pd.cut(idades.astype('float'), bins=[0, 6, 11, 15, 18, 200], right=False,
+                        labels=['0-5 anos', '6-10 anos', '11-14 anos', '15-17 anos', '18+ anos'])
+        faixa_counts = faixas.value_counts(sort=False).reset_index()
+        faixa_counts.columns = ['Faixa Etária', 'Quantidade']
+        
+        fig = px.bar(
+            faixa_counts,
+            x='Faixa Etária',
+            y='Quantidade',
+            color='Quantidade',
+            color_continuous_scale='Purples'
+        )
+        fig.update_layout(showlegend=False)
+        st.plotly_chart(fig, use_container_width=True)
+    
     # Análise Socioeconômica
     if len(df_socio) > 0:
         st.markdown("---")
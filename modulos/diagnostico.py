@@ -0,0 +1,86 @@
+"""
+Módulo de Diagnóstico do Cache e do Armazenamento
+"""
+import streamlit as st
+import pandas as pd
+
+def render_diagnostico(data_manager):
+    """Renderiza métricas do cache do DataManager"""
+    st.header("🩺 Diagnóstico do Cache")
+    st.markdown("---")
+    
+    stats = data_manager.get_cache_stats()
+    
+    # Métricas gerais
+    acertos = sum(stats['hits'].values())
+    faltas = sum(stats['misses'].values())
+    total_leituras = acertos + faltas
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Backend", data_manager.backend)
+    with col2:
+        taxa = acertos / total_leituras * 100 if total_leituras > 0 else 0
+        st.metric("Taxa de Acerto", f"{taxa:.1f}%", help=f"{acertos} acertos, {faltas} faltas")
+    with col3:
+        limite = stats['cache_max_bytes']
+        memoria = sum(stats['memory_bytes'].values()) + sum(stats['projected_memory_bytes'].values())
+        st.metric("Memória em Cache", f"{memoria / 1024 / 1024:.2f} MB",
+                  help=f"Orçamento: {limite / 1024 / 1024:.0f} MB" if limite else "Sem limite de memória")
+    with col4:
+        st.metric("Descartes", sum(stats['evictions'].values()),
+                  help=f"Por falta de memória; {sum(stats['invalidations'].values())} invalidações por escrita")
+    
+    st.markdown("---")
+    
+    # Tabela por tipo de dado
+    st.markdown("### 📋 Por Tabela")
+    tabelas = sorted(set(stats['hits']) | set(stats['misses']) | set(stats['cached_types']) |
+                     set(stats['projected_columns']))
+    if len(tabelas) == 0:
+        st.info("📝 Nenhuma tabela lida ainda.")
+    else:
+        linhas = []
+        for tabela in tabelas:
+            linhas.append({
+                'Tabela': tabela,
+                'Em Cache': tabela in stats['cached_types'],
+                'Fixada': tabela in stats['pinned_tables'],
+                'Linhas': stats['cache_sizes'].get(tabela, 0),
+                'Memória (KB)': round((stats['memory_bytes'].get(tabela, 0) +
+                                       stats['projected_memory_bytes'].get(tabela, 0)) / 1024, 1),
+                'Acertos': stats['hits'].get(tabela, 0),
+                'Faltas': stats['misses'].get(tabela, 0),
+                'Descartes': stats['evictions'].get(tabela, 0),
+                'Invalidações': stats['invalidations'].get(tabela, 0),
+                'Leitura (ms)': round(stats['load_seconds'].get(tabela, 0) * 1000, 1),
+                'Índices (ms)': round(stats['index_seconds'].get(tabela, 0) * 1000, 1),
+                'Pendentes': stats['pending_writes'].get(tabela, 0),
+                'Índices': ', '.join(stats['indexes'].get(tabela, []))
+            })
+        st.dataframe(pd.DataFrame(linhas), use_container_width=True)
+    
+    # Formato Prometheus (para coleta externa)
+    with st.expander("📈 Métricas (formato Prometheus)"):
+        texto = data_manager.get_cache_metrics_text()
+        st.code(texto, language="text")
+        st.download_button(
+            label="⬇️ Download métricas",
+            data=texto,
+            file_name="matricula_cache_metrics.txt",
+            mime="text/plain"
+        )
+    
+    # Ações
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("🧹 Limpar Cache", use_container_width=True):
+            data_manager.clear_cache()
+            st.success("✅ Cache limpo!")
+            st.rerun()
+    with col2:
+        if st.button("🔄 Zerar Contadores", use_container_width=True):
+            data_manager.reset_cache_metrics()
+            st.success("✅ Contadores zerados!")
+            st.rerun()
@@ -26,14 +26,14 @@ def render_export_zip(data_manager):
     with col1:
         filtro_status = st.multiselect(
             "Filtrar por Status",
-            options=df_cadastro['status'].unique(),
+            options=list(df_cadastro['status'].unique()),
             default=list(df_cadastro['status'].unique())
         )
     
     with col2:
         filtro_ano = st.multiselect(
             "Filtrar por Ano Escolar",
-            options=df_cadastro['ano_escolar'].unique(),
+            options=list(df_cadastro['ano_escolar'].unique()),
             default=list(df_cadastro['ano_escolar'].unique())
         )
     
@@ -120,6 +120,8 @@ def gerar_zip_export(data_manager, df_alunos, incluir_pei=True, incluir_socio=Tr
     """Gera arquivo ZIP com PDFs e dados"""
     zip_buffer = io.BytesIO()
     
+    bundle = data_manager.get_students_bundle(df_alunos['id'].tolist())
+    
     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
         # Gerar PDFs individuais
         for idx, (_, aluno) in enumerate(df_alunos.iterrows(), 1):
@@ -132,7 +134,8 @@ def gerar_zip_export(data_manager, df_alunos, incluir_pei=True, incluir_socio=Tr
                     aluno_id,
                     incluir_pei,
                     incluir_socio,
-                    incluir_saude
+                    incluir_saude,
+                    dados_aluno=bundle.get(int(aluno_id))
                 )
                 
                 # Adicionar PDF ao ZIP
@@ -185,13 +188,13 @@ def gerar_zip_export(data_manager, df_alunos, incluir_pei=True, incluir_socio=Tr
         
         # Gerar relatório resumido
         if exportar_relatorio:
-            relatorio = gerar_relatorio_resumido(data_manager, df_alunos)
+            relatorio = gerar_relatorio_resumido(data_manager, df_alunos, bundle)
             zip_file.writestr("relatorio_resumido.txt", relatorio.encode('utf-8'))
     
     zip_buffer.seek(0)
     return zip_buffer.getvalue()
 
-def gerar_relatorio_resumido(data_manager, df_alunos):
+def gerar_relatorio_resumido(data_manager, df_alunos, bundle=None):
     """Gera relatório resumido em texto"""
     relatorio = []
     relatorio.append("=" * 80)
@@ -205,21 +208,21 @@ def gerar_relatorio_resumido(data_manager, df_alunos):
     relatorio.append("\n1. ESTATÍSTICAS GERAIS")
     relatorio.append("-" * 80)
     
-    # Por status
+    # Por status (texto: contagens só dos valores presentes no filtro)
     relatorio.append("\nPor Status:")
-    status_counts = df_alunos['status'].value_counts()
+    status_counts = df_alunos['status'].astype(str).value_counts()
     for status, count in status_counts.items():
         relatorio.append(f"  - {status}: {count} ({count/len(df_alunos)*100:.1f}%)")
     
     # Por ano escolar
     relatorio.append("\nPor Ano Escolar:")
-    ano_counts = df_alunos['ano_escolar'].value_counts().sort_index()
+    ano_counts = df_alunos['ano_escolar'].astype(str).value_counts().sort_index()
     for ano, count in ano_counts.items():
         relatorio.append(f"  - {ano}: {count}")
     
     # Por turno
     relatorio.append("\nPor Turno:")
-    turno_counts = df_alunos['turno'].value_counts()
+    turno_counts = df_alunos['turno'].astype(str).value_counts()
     for turno, count in turno_counts.items():
         relatorio.append(f"  - {turno}: {count}")
     
@@ -228,9 +231,8 @@ def gerar_relatorio_resumido(data_manager, df_alunos):
     relatorio.append("2. COMPLETUDE DOS CADASTROS")
     relatorio.append("-" * 80)
     
-    df_pei = data_manager.get_data('pei')
-    df_socio = data_manager.get_data('socioeconomico')
-    df_saude = data_manager.get_data('saude')
+    if bundle is None:
+        bundle = data_manager.get_students_bundle(df_alunos['id'].tolist())
     
     com_pei = 0
     com_socio = 0
@@ -238,11 +240,11 @@ def gerar_relatorio_resumido(data_manager, df_alunos):
     completos = 0
     
     for _, aluno in df_alunos.iterrows():
-        aluno_id = aluno['id']
+        dados_aluno = bundle.get(int(aluno['id']), {})
         
-        tem_pei = len(df_pei[df_pei['aluno_id'] == aluno_id]) > 0
-        tem_socio = len(df_socio[df_socio['aluno_id'] == aluno_id]) > 0
-        tem_saude = len(df_saude[df_saude['aluno_id'] == aluno_id]) > 0
+        tem_pei = 'pei' in dados_aluno
+        tem_socio = 'socioeconomico' in dados_aluno
+        tem_saude = 'saude' in dados_aluno
         
         if tem_pei:
             com_pei += 1
@@ -258,6 +260,10 @@ def gerar_relatorio_resumido(data_manager, df_alunos):
     relatorio.append(f"Alunos com dados de saúde: {com_saude} ({com_saude/len(df_alunos)*100:.1f}%)")
     relatorio.append(f"Alunos com cadastro completo: {completos} ({completos/len(df_alunos)*100:.1f}%)")
     
+    df_pei = data_manager.get_data('pei')
+    df_socio = data_manager.get_data('socioeconomico')
+    df_saude = data_manager.get_data('saude')
+    
     # Análise socioeconômica (se disponível)
     if len(df_socio) > 0:
         relatorio.append("\n" + "-" * 80)
@@ -270,7 +276,7 @@ def gerar_relatorio_resumido(data_manager, df_alunos):
         if len(df_socio_filtrado) > 0:
             # Renda
             relatorio.append("\nDistribuição de Renda Familiar:")
-            renda_counts = df_socio_filtrado['renda_familiar'].value_counts()
+            renda_counts = df_socio_filtrado['renda_familiar'].astype(str).value_counts()
             for renda, count in renda_counts.items():
                 relatorio.append(f"  - {renda}: {count}")
             
@@ -304,7 +310,7 @@ def gerar_relatorio_resumido(data_manager, df_alunos):
         if len(df_saude_filtrado) > 0:
             # Tipo sanguíneo
             relatorio.append("\nDistribuição de Tipo Sanguíneo:")
-            tipo_counts = df_saude_filtrado['tipo_sanguineo'].value_counts()
+            tipo_counts = df_saude_filtrado['tipo_sanguineo'].astype(str).value_counts()
             for tipo, count in tipo_counts.items():
                 relatorio.append(f"  - {tipo}: {count}")
             
@@ -6,6 +6,13 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
 from .reconhecimento_facial import FaceRecognitionSystem
+from .busca import formatar_data
+
+def formatar_confianca(valor):
+    """Confiança para exibição (85.00%); vazio se não informada"""
+    if isinstance(valor, str):
+        return valor
+    return f"{valor:.2%}" if pd.notna(valor) else ''
 
 def render_frequencia_aula(data_manager):
     """
@@ -89,9 +96,8 @@ def render_marcar_presenca(data_manager, face_system):
         st.metric("Alunos Cadastrados", face_system.get_student_count())
     
     with col2:
-        df_attendance = data_manager.get_data('attendance')
         hoje = datetime.now().strftime('%Y-%m-%d')
-        presencas_hoje = len(df_attendance[df_attendance['data'] == hoje]) if len(df_attendance) > 0 else 0
+        presencas_hoje = len(data_manager.get_data_range('attendance', hoje))
         st.metric("Presenças Hoje", presencas_hoje)
     
     with col3:
@@ -117,7 +123,7 @@ def render_marcar_presenca(data_manager, face_system):
                     st.info(f"""
                     **👤 Aluno:** {aluno['nome_completo']}
                     
-                    **📅 Data:** {attendance_data['data']}
+                    **📅 Data:** {formatar_data(attendance_data['data'])}
                     
                     **🕐 Hora:** {attendance_data['hora']}
                     """)
@@ -126,7 +132,7 @@ def render_marcar_presenca(data_manager, face_system):
                     st.info(f"""
                     **✅ Status:** {attendance_data['verificado']}
                     
-                    **📊 Confiança:** {attendance_data['confianca']}
+                    **📊 Confiança:** {formatar_confianca(attendance_data['confianca'])}
                     
                     **🔒 Observações:** {attendance_data['observacoes']}
                     """)
@@ -139,15 +145,9 @@ def render_registros_hoje(data_manager):
     """Renderiza registros de presença de hoje"""
     st.subheader("📋 Registros de Hoje")
     
-    df_attendance = data_manager.get_data('attendance')
-    
-    if len(df_attendance) == 0:
-        st.info("📝 Nenhum registro de presença ainda.")
-        return
-    
-    # Filtrar registros de hoje
+    # Apenas a partição do mês atual é lida
     hoje = datetime.now().strftime('%Y-%m-%d')
-    df_hoje = df_attendance[df_attendance['data'] == hoje]
+    df_hoje = data_manager.get_data_range('attendance', hoje)
     
     if len(df_hoje) == 0:
         st.info("📝 Nenhum registro de presença hoje.")
@@ -171,7 +171,7 @@ def render_registros_hoje(data_manager):
                 'Hora': registro['hora'],
                 'Tipo': registro['tipo'],
                 'Verificado': registro['verificado'],
-                'Confiança': registro['confianca']
+                'Confiança': formatar_confianca(registro['confianca'])
             })
     
     if len(registros) > 0:
@@ -194,10 +194,10 @@ def render_registros_hoje(data_manager):
         # Tabela de registros
         st.dataframe(df_registros, use_container_width=True)
         
-        # Gráfico por turno
-        if 'Turno' in df_registros.columns:
+        # Gráfico por turno (agregados mantidos pelo DataManager)
+        turno_counts = data_manager.get_attendance_stats(hoje, hoje)['by_shift']
+        if len(turno_counts) > 0:
             st.markdown("### 📊 Distribuição por Turno")
-            turno_counts = df_registros['Turno'].value_counts()
             st.bar_chart(turno_counts)
         
         # Opção de exportar
@@ -217,12 +217,6 @@ def render_historico_completo(data_manager):
     """Renderiza histórico completo de presenças"""
     st.subheader("📊 Histórico Completo")
     
-    df_attendance = data_manager.get_data('attendance')
-    
-    if len(df_attendance) == 0:
-        st.info("📝 Nenhum registro de presença ainda.")
-        return
-    
     # Filtros
     st.markdown("### 🔍 Filtros")
     col1, col2, col3 = st.columns(3)
@@ -251,22 +245,19 @@ def render_historico_completo(data_manager):
         ]
         aluno_filtro = st.selectbox("Aluno", opcoes_alunos)
     
-    # Aplicar filtros
-    df_filtrado = df_attendance.copy()
-    
     # Converter datas
     data_inicio_str = data_inicio.strftime('%Y-%m-%d')
     data_fim_str = data_fim.strftime('%Y-%m-%d')
     
-    df_filtrado = df_filtrado[
-        (df_filtrado['data'] >= data_inicio_str) &
-        (df_filtrado['data'] <= data_fim_str)
-    ]
+    # Aplicar filtros (apenas as partições mensais do período são lidas)
+    df_filtrado = data_manager.get_data_range('attendance', data_inicio_str, data_fim_str)
     
     # Filtro de aluno
+    aluno_selecionado = None
     if aluno_filtro != "Todos":
-        aluno_id = int(aluno_filtro.split(' - ')[0])
-        df_filtrado = df_filtrado[df_filtrado['aluno_id'] == str(aluno_id)]
+        aluno_selecionado = int(aluno_filtro.split(' - ')[0])
+        if len(df_filtrado) > 0:
+            df_filtrado = df_filtrado[df_filtrado['aluno_id'] == aluno_selecionado]
     
     if len(df_filtrado) == 0:
         st.info("📝 Nenhum registro encontrado para os filtros selecionados.")
@@ -284,11 +275,11 @@ def render_historico_completo(data_manager):
                 'Nome': aluno['nome_completo'],
                 'Ano Escolar': aluno['ano_escolar'],
                 'Turno': aluno['turno'],
-                'Data': registro['data'],
+                'Data': formatar_data(registro['data']),
                 'Hora': registro['hora'],
                 'Tipo': registro['tipo'],
                 'Verificado': registro['verificado'],
-                'Confiança': registro['confianca']
+                'Confiança': formatar_confianca(registro['confianca'])
             })
     
     if len(registros) > 0:
@@ -308,25 +299,42 @@ def render_historico_completo(data_manager):
             media_diaria = len(df_registros) / dias_unicos if dias_unicos > 0 else 0
             st.metric("Média Diária", f"{media_diaria:.1f}")
         
+        # Frequência do aluno sobre os dias letivos do período
+        if aluno_selecionado is not None:
+            frequencia = data_manager.get_student_frequency(aluno_selecionado, data_inicio_str, data_fim_str)
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Frequência", f"{frequencia['rate']:.1f}%",
+                          help=f"{frequencia['present_days']} de {frequencia['school_days']} dias letivos")
+            with col2:
+                st.metric("Faltas Seguidas (atual)", frequencia['current_absence_streak'])
+            with col3:
+                st.metric("Maior Sequência de Faltas", frequencia['longest_absence_streak'])
+        
         st.markdown("---")
         
         # Tabela de registros
         st.dataframe(df_registros, use_container_width=True)
         
-        # Gráficos
+        # Gráficos (contagens vindas dos agregados, sem groupby sobre os registros)
         st.markdown("### 📊 Análises")
+        estatisticas = data_manager.get_attendance_stats(data_inicio_str, data_fim_str,
+                                                         aluno_id=aluno_selecionado, top=10)
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.markdown("#### Presenças por Data")
-            presencas_por_data = df_registros.groupby('Data').size()
-            st.line_chart(presencas_por_data)
+            st.line_chart(estatisticas['by_day'])
         
         with col2:
             st.markdown("#### Presenças por Aluno (Top 10)")
-            presencas_por_aluno = df_registros['Nome'].value_counts().head(10)
-            st.bar_chart(presencas_por_aluno)
+            presencas_por_aluno = estatisticas['by_student']
+            nomes = {}
+            for aluno_id in presencas_por_aluno.index:
+                aluno = data_manager.get_record('cadastro', aluno_id)
+                nomes[aluno_id] = aluno['nome_completo'] if aluno else str(aluno_id)
+            st.bar_chart(presencas_por_aluno.rename(index=nomes))
         
         # Opção de exportar
         st.markdown("---")
@@ -344,7 +352,8 @@ def render_historico_completo(data_manager):
         
         with col2:
             if st.button("📥 Exportar Completo (CSV)", use_container_width=True):
-                # Exportar todos os registros
+                # Exportar todos os registros (histórico inteiro, lido só aqui)
+                df_attendance = data_manager.get_data('attendance')
                 todos_registros = []
                 for _, registro in df_attendance.iterrows():
                     aluno_id = int(registro['aluno_id'])
@@ -354,11 +363,11 @@ def render_historico_completo(data_manager):
                         todos_registros.append({
                             'ID': aluno_id,
                             'Nome': aluno['nome_completo'],
-                            'Data': registro['data'],
+                            'Data': formatar_data(registro['data']),
                             'Hora': registro['hora'],
                             'Tipo': registro['tipo'],
                             'Verificado': registro['verificado'],
-                            'Confiança': registro['confianca']
+                            'Confiança': formatar_confianca(registro['confianca'])
                         })
                 
                 df_todos = pd.DataFrame(todos_registros)
@@ -88,8 +88,14 @@ def render_pdf_generator(data_manager):
             except Exception as e:
                 st.error(f"❌ Erro ao gerar PDF: {str(e)}")
 
-def gerar_pdf_aluno(data_manager, aluno_id, incluir_pei=True, incluir_anamnese=True, incluir_socio=True, incluir_saeb=True, incluir_saude=True):
-    """Gera PDF completo da ficha do aluno"""
+def gerar_pdf_aluno(data_manager, aluno_id, incluir_pei=True, incluir_anamnese=True, incluir_socio=True, incluir_saeb=True, incluir_saude=True, dados_aluno=None):
+    """
+    Gera PDF completo da ficha do aluno
+    
+    Em exportações em lote, passe dados_aluno com a entrada do aluno em
+    data_manager.get_students_bundle(ids) para não consultar as tabelas
+    a cada ficha.
+    """
     buffer = io.BytesIO()
     
     # Criar documento
@@ -125,8 +131,12 @@ def gerar_pdf_aluno(data_manager, aluno_id, incluir_pei=True, incluir_anamnese=T
     elements.append(Paragraph("FICHA DE MATRÍCULA ESCOLAR 2026", title_style))
     elements.append(Spacer(1, 0.5*cm))
     
+    # Dados do aluno (já preparados em lote ou consultados pelos índices)
+    if dados_aluno is None:
+        dados_aluno = data_manager.get_all_student_data(aluno_id)
+    
     # Dados do Cadastro Geral
-    cadastro = data_manager.get_record('cadastro', aluno_id)
+    cadastro = dados_aluno.get('cadastro')
     
     if cadastro:
         # Adicionar foto se disponível
@@ -321,15 +331,12 @@ def gerar_pdf_aluno(data_manager, aluno_id, incluir_pei=True, incluir_anamnese=T
     
     # PEI
     if incluir_pei:
-        df_pei = data_manager.get_data('pei')
-        pei = df_pei[df_pei['aluno_id'] == aluno_id]
+        pei_data = dados_aluno.get('pei')
         
-        if len(pei) > 0:
+        if pei_data:
             elements.append(PageBreak())
             elements.append(Paragraph("PLANO EDUCACIONAL INDIVIDUALIZADO (PEI)", heading_style))
             
-            pei_data = pei.iloc[0].to_dict()
-            
             dados_pei = [
                 ['Necessidade Especial:', pei_data.get('necessidade_especial', '')],
                 ['Tipo de Deficiência:', pei_data.get('tipo_deficiencia', '')],
@@ -358,15 +365,12 @@ def gerar_pdf_aluno(data_manager, aluno_id, incluir_pei=True, incluir_anamnese=T
     
     # Socioeconômico
     if incluir_socio:
-        df_socio = data_manager.get_data('socioeconomico')
-        socio = df_socio[df_socio['aluno_id'] == aluno_id]
+        socio_data = dados_aluno.get('socioeconomico')
         
-        if len(socio) > 0:
+        if socio_data:
             elements.append(PageBreak())
             elements.append(Paragraph("QUESTIONÁRIO SOCIOECONÔMICO", heading_style))
             
-            socio_data = socio.iloc[0].to_dict()
-            
             dados_socio = [
                 ['Renda Familiar:', socio_data.get('renda_familiar', '')],
                 ['Pessoas na Residência:', str(socio_data.get('qtd_pessoas_casa', ''))],
@@ -398,15 +402,12 @@ def gerar_pdf_aluno(data_manager, aluno_id, incluir_pei=True, incluir_anamnese=T
     
     # Saúde
     if incluir_saude:
-        df_saude = data_manager.get_data('saude')
-        saude = df_saude[df_saude['aluno_id'] == aluno_id]
+        saude_data = dados_aluno.get('saude')
         
-        if len(saude) > 0:
+        if saude_data:
             elements.append(PageBreak())
             elements.append(Paragraph("FICHA DE SAÚDE", heading_style))
             
-            saude_data = saude.iloc[0].to_dict()
-            
             dados_saude = [
                 ['Tipo Sanguíneo:', saude_data.get('tipo_sanguineo', '')],
                 ['Fator RH:', saude_data.get('fator_rh', '')],
@@ -437,15 +438,12 @@ def gerar_pdf_aluno(data_manager, aluno_id, incluir_pei=True, incluir_anamnese=T
     
     # Anamnese Pedagógica (PEI)
     if incluir_anamnese:
-        df_anamnese = data_manager.get_data('anamnese_pei')
-        anamnese = df_anamnese[df_anamnese['aluno_id'] == aluno_id]
+        anamnese_data = dados_aluno.get('anamnese_pei')
         
-        if len(anamnese) > 0:
+        if anamnese_data:
             elements.append(PageBreak())
             elements.append(Paragraph("ANAMNESE PEDAGÓGICA (PEI)", heading_style))
             
-            anamnese_data = anamnese.iloc[0].to_dict()
-            
             dados_anamnese = [
                 ['Data Preenchimento:', anamnese_data.get('data_preenchimento', '')],
                 ['Turma/Série:', anamnese_data.get('turma_serie', '')],
@@ -486,15 +484,12 @@ def gerar_pdf_aluno(data_manager, aluno_id, incluir_pei=True, incluir_anamnese=T
     
     # Questionário SAEB
     if incluir_saeb:
-        df_saeb = data_manager.get_data('questionario_saeb')
-        saeb = df_saeb[df_saeb['aluno_id'] == aluno_id]
+        saeb_data = dados_aluno.get('questionario_saeb')
         
-        if len(saeb) > 0:
+        if saeb_data:
             elements.append(PageBreak())
             elements.append(Paragraph("QUESTIONÁRIO SAEB/SPAECE", heading_style))
             
-            saeb_data = saeb.iloc[0].to_dict()
-            
             dados_saeb = [
                 ['Sexo:', saeb_data.get('sexo', '')],
                 ['Idade:', saeb_data.get('idade', '')],
@@ -71,9 +71,8 @@ def render_registro_lote(data_manager):
         st.metric("👥 Alunos Cadastrados", face_system.get_student_count())
     
     with col2:
-        df_attendance = data_manager.get_data('attendance')
         hoje = datetime.now().strftime('%Y-%m-%d')
-        presencas_hoje = len(df_attendance[df_attendance['data'] == hoje]) if len(df_attendance) > 0 else 0
+        presencas_hoje = len(data_manager.get_data_range('attendance', hoje))
         st.metric("✅ Presenças Hoje", presencas_hoje)
     
     with col3:
@@ -387,13 +386,15 @@ def register_batch_attendance(data_manager, identified):
         identified: Lista de alunos identificados
     """
     try:
-        df_attendance = data_manager.get_data('attendance')
-        
         hoje = datetime.now().strftime('%Y-%m-%d')
         agora = datetime.now().strftime('%H:%M:%S')
         
+        # Presenças de hoje (apenas a partição do mês atual é lida)
+        df_attendance = data_manager.get_data_range('attendance', hoje)
+        
         registros_novos = 0
         registros_duplicados = 0
+        novos_registros = []
         
         for ident in identified:
             aluno_id = ident['aluno_id']
@@ -415,11 +416,8 @@ def register_batch_attendance(data_manager, identified):
             if len(aluno) == 0:
                 continue
             
-            # Criar novo registro
-            novo_id = df_attendance['id'].max() + 1 if len(df_attendance) > 0 else 1
-            
+            # Criar novo registro (gravado em lote ao final)
             novo_registro = {
-                'id': novo_id,
                 'aluno_id': aluno_id,
                 'nome_aluno': ident['aluno_nome'],
                 'data': hoje,
@@ -430,12 +428,16 @@ def register_batch_attendance(data_manager, identified):
                 'method': 'batch_upload'
             }
             
-            # Adicionar ao DataFrame
-            df_attendance = pd.concat([df_attendance, pd.DataFrame([novo_registro])], ignore_index=True)
+            novos_registros.append(novo_registro)
             registros_novos += 1
         
-        # Salvar dados
-        data_manager.save_data('attendance', df_attendance)
+        # Salvar todos os novos registros em uma única escrita
+        if novos_registros:
+            resultados = data_manager.add_records('attendance', novos_registros)
+            falhas = [r['erro'] for r in resultados if not r['sucesso']]
+            registros_novos -= len(falhas)
+            for erro in falhas:
+                st.warning(f"⚠️ Presença não registrada: {erro}")
         
         # Mensagem de sucesso
         st.success(f"""
@@ -0,0 +1,154 @@
+"""
+Lock de leitura/escrita usado pelo DataManager
+Várias threads leem o cache ao mesmo tempo; escritas são exclusivas
+"""
+import threading
+from contextlib import contextmanager
+
+
+class ReadWriteLock:
+    """
+    Lock com leitores compartilhados e um escritor por vez
+    
+    - read(): compartilhado entre leitores; espera enquanto há um escritor
+      ativo ou aguardando (preferência ao escritor, leitores contínuos não
+      impedem as escritas). Ao fim de cada escrita, os leitores que estavam
+      esperando entram antes do próximo escritor (escritas seguidas também
+      não impedem as leituras)
+    - write() / with lock: exclusivo; reentrante na thread que o detém
+    - downgrade(): dentro da escrita, libera os leitores durante um trecho
+      lento que não altera o estado em memória (ex.: gravação do arquivo).
+      Outros escritores continuam bloqueados; na saída, a escrita volta a
+      ser exclusiva assim que os leitores em andamento terminam
+    
+    Leituras são reentrantes, e uma leitura feita pela própria thread
+    escritora não espera (já tem acesso). Não há promoção de leitura para
+    escrita: pedir a escrita dentro de uma leitura trava a thread.
+    """
+    
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._leitores = 0
+        self._dono = None
+        self._profundidade = 0
+        self._escritores_esperando = 0
+        self._leitores_esperando = 0
+        # Leitores liberados ao fim da última escrita, com vez antes dos escritores
+        self._lote_leitores = 0
+        self._rebaixado = False
+        self._local = threading.local()
+    
+    def _leitura_bloqueada(self, apos_escrita=False):
+        if self._dono is not None:
+            return apos_escrita or not self._rebaixado
+        return self._escritores_esperando > 0 and self._lote_leitores == 0
+    
+    def acquire_read(self, apos_escrita=False):
+        with self._cond:
+            self._leitores_esperando += 1
+            try:
+                while self._leitura_bloqueada(apos_escrita):
+                    self._cond.wait()
+            finally:
+                self._leitores_esperando -= 1
+                self._lote_leitores = min(self._lote_leitores, self._leitores_esperando + 1)
+            if self._lote_leitores > 0:
+                self._lote_leitores -= 1
+            self._leitores += 1
+    
+    def release_read(self):
+        with self._cond:
+            self._leitores -= 1
+            if self._leitores == 0:
+                self._cond.notify_all()
+    
+    def acquire_write(self):
+        eu = threading.get_ident()
+        with self._cond:
+            if self._dono == eu:
+                self._profundidade += 1
+                return
+            self._escritores_esperando += 1
+            try:
+                while self._dono is not None or self._leitores > 0 or self._lote_leitores > 0:
+                    self._cond.wait()
+            finally:
+                self._escritores_esperando -= 1
+            self._dono = eu
+            self._profundidade = 1
+    
+    def release_write(self):
+        with self._cond:
+            if self._dono != threading.get_ident():
+                raise RuntimeError("Lock de escrita liberado por thread que não o detém")
+            self._profundidade -= 1
+            if self._profundidade == 0:
+                self._dono = None
+                self._lote_leitores = self._leitores_esperando
+                self._cond.notify_all()
+    
+    def owned(self):
+        """Se a thread atual detém a escrita"""
+        return self._dono == threading.get_ident()
+    
+    def downgraded(self):
+        """Se há uma escrita em andamento no trecho liberado aos leitores"""
+        return self._dono is not None and self._rebaixado
+    
+    @contextmanager
+    def read(self, apos_escrita=False):
+        """
+        Seção de leitura (compartilhada)
+        
+        Com apos_escrita=True, uma escrita em andamento (mesmo no trecho
+        liberado por downgrade) é esperada até o fim.
+        """
+        if getattr(self._local, 'leituras', 0) > 0 or self.owned():
+            yield
+            return
+        self.acquire_read(apos_escrita)
+        self._local.leituras = 1
+        try:
+            yield
+        finally:
+            self._local.leituras = 0
+            self.release_read()
+    
+    @contextmanager
+    def write(self):
+        """Seção de escrita (exclusiva)"""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+    
+    def __enter__(self):
+        self.acquire_write()
+        return self
+    
+    def __exit__(self, *exc):
+        self.release_write()
+    
+    @contextmanager
+    def downgrade(self):
+        """Libera leitores durante o bloco; a escrita continua reservada a esta thread"""
+        with self._cond:
+            if not self.owned():
+                raise RuntimeError("downgrade() exige o lock de escrita")
+            if self._rebaixado:
+                aninhado = True
+            else:
+                aninhado = False
+                self._rebaixado = True
+                self._cond.notify_all()
+        if aninhado:
+            yield
+            return
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._rebaixado = False
+                while self._leitores > 0:
+                    self._cond.wait()
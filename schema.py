@@ -0,0 +1,339 @@
+"""
+Esquema das tabelas: colunas categóricas (campos de escolha com poucos valores distintos)
+e colunas tipadas (datas e números)
+Usado pelo DataManager para manter essas colunas como 'category', datetime64 e
+float64 do pandas em memória; no armazenamento continuam como texto
+"""
+import numpy as np
+import pandas as pd
+
+# Colunas categóricas por tipo: cada valor distinto é guardado uma vez e as
+# linhas guardam apenas um código inteiro (menos memória, value_counts/isin
+# mais rápidos). Campos de texto livre não entram aqui.
+CATEGORICAL_COLUMNS = {
+    'cadastro': [
+        'sexo', 'cor_raca', 'nacionalidade', 'uf_nascimento', 'uf_emissor', 'modelo_certidao',
+        'tipo_certidao', 'zona', 'uf', 'aluno_deficiencia', 'possui_laudo_medico', 'medicacao_uso',
+        'rendimento_ano_anterior', 'movimento_escolar', 'ano_escolar', 'turno', 'status',
+        'utiliza_transporte', 'poder_responsavel_transporte', 'tipo_veiculo'
+    ],
+    'pei': [
+        'necessidade_especial', 'laudo_medico', 'adaptacao_curricular', 'acompanhamento_especializado'
+    ],
+    'socioeconomico': [
+        'renda_familiar', 'qtd_pessoas_casa', 'tipo_moradia', 'possui_internet', 'possui_computador',
+        'possui_smartphone', 'bolsa_familia', 'auxilio_brasil', 'beneficio_social',
+        'situacao_trabalho_responsavel', 'escolaridade_mae', 'escolaridade_pai',
+        'transporte_escolar', 'tempo_deslocamento'
+    ],
+    'saude': [
+        'tipo_sanguineo', 'fator_rh', 'vacinacao_em_dia', 'plano_saude', 'parentesco_emergencia'
+    ],
+    'questionario_saeb': [
+        'sexo', 'idade', 'lingua_familia', 'cor_raca', 'deficiencia', 'tea', 'altas_habilidades',
+        'mora_mae', 'mora_pai', 'mora_avo', 'mora_avoh', 'mora_outros',
+        'escolaridade_mae', 'escolaridade_pai',
+        'responsavel_le', 'responsavel_conversa', 'responsavel_incentiva_estudar',
+        'responsavel_incentiva_tarefas', 'responsavel_incentiva_aulas', 'responsavel_participa_reunioes',
+        'bairro_asfalto', 'bairro_agua_tratada', 'bairro_iluminacao',
+        'qtd_geladeira', 'qtd_computador', 'qtd_quartos', 'qtd_televisao',
+        'qtd_banheiro', 'qtd_carro', 'qtd_celular_internet',
+        'casa_tv_internet', 'casa_wifi', 'casa_mesa_estudar', 'casa_microondas',
+        'casa_aspirador', 'casa_maquina_lavar', 'casa_freezer', 'casa_garagem',
+        'tempo_escola', 'transporte_gratuito', 'passe_escolar', 'meio_transporte_principal',
+        'idade_entrada_escola', 'trajetoria_educacao', 'reprovacao', 'abandono',
+        'tempo_estudar', 'tempo_extracurriculares', 'tempo_trabalho_domestico',
+        'tempo_trabalho_remunerado', 'tempo_lazer',
+        'prof_explica', 'prof_pergunta', 'prof_debate', 'prof_grupos',
+        'prof_bullying', 'prof_racismo', 'prof_genero',
+        'escola_interesse', 'escola_motivacao', 'escola_opinioes', 'escola_seguranca',
+        'escola_vontade_prof', 'escola_dificuldade', 'escola_avaliacoes',
+        'escola_prof_acreditam', 'escola_motivacao_continuar', 'expectativa_futura'
+    ],
+    'anamnese_pei': [
+        'turma_serie', 'desenvolvimento_motor', 'coordenacao_motora_fina', 'coordenacao_motora_grossa',
+        'lateralidade', 'equilibrio',
+        'atencao_concentracao', 'memoria', 'raciocinio_logico', 'resolucao_problemas',
+        'pensamento_abstrato', 'funcoes_executivas',
+        'linguagem_oral', 'articulacao', 'vocabulario', 'compreensao_verbal',
+        'expressao_verbal', 'linguagem_escrita',
+        'interacao_social', 'relacionamento_pares', 'relacionamento_professores',
+        'regulacao_emocional', 'autoestima', 'ansiedade', 'impulsividade', 'agressividade',
+        'bullying_vitima', 'bullying_agressor', 'comportamento_opositor', 'autolesao',
+        'fuga_escola', 'isolamento_voluntario',
+        'desempenho_portugues', 'desempenho_matematica', 'desempenho_ciencias',
+        'desempenho_historia', 'desempenho_geografia', 'desempenho_ingles',
+        'desempenho_ed_fisica', 'desempenho_artes',
+        'leitura', 'escrita', 'compreensao_leitora', 'producao_textual',
+        'acompanhamento_psicologia', 'acompanhamento_psicopedagogia', 'acompanhamento_fonoaudiologia',
+        'acompanhamento_terapia_ocupacional', 'acompanhamento_neurologia', 'acompanhamento_psiquiatria',
+        'acompanhamento_assistente_social', 'participacao_familia'
+    ],
+    'attendance': ['tipo', 'verificado'],
+}
+
+# Colunas tipadas por tipo: convertidas uma vez na leitura e gravadas de volta
+# no formato canônico abaixo. A coluna tem sempre o mesmo tipo: valores em
+# outro formato reconhecível são convertidos e os sem conversão viram NaT/NaN
+# em memória, com o texto original guardado à parte (apply_types) e gravado
+# de volta sem alteração (text_frame). A validação impede que novos valores
+# assim sejam gravados.
+TYPED_COLUMNS = {
+    'cadastro': {'data_nascimento': 'date', 'data_matricula': 'date'},
+    'pei': {'data_cadastro': 'datetime'},
+    'socioeconomico': {'data_cadastro': 'datetime'},
+    'saude': {'data_cadastro': 'datetime'},
+    'questionario_saeb': {'data_cadastro': 'datetime'},
+    'anamnese_pei': {'data_cadastro': 'datetime'},
+    'face_embeddings': {'data_cadastro': 'datetime'},
+    'attendance': {'data': 'date', 'data_registro': 'datetime', 'confianca': 'float64'},
+}
+
+DATE_FORMATS = {'date': '%Y-%m-%d', 'datetime': '%Y-%m-%d %H:%M:%S'}
+
+# Mesmo nome de coluna tem o mesmo tipo em todas as tabelas
+_COLUMN_KINDS = {coluna: kind for colunas in TYPED_COLUMNS.values() for coluna, kind in colunas.items()}
+
+
+def categorical_columns(tipo, df):
+    """Colunas categóricas declaradas para o tipo que existem no DataFrame"""
+    return [c for c in CATEGORICAL_COLUMNS.get(tipo, ()) if c in df.columns]
+
+
+def apply_categories(tipo, df):
+    """
+    Converte as colunas categóricas do tipo para 'category'
+    
+    Args:
+        tipo: Tipo de dado
+        df: DataFrame lido do armazenamento (strings)
+    
+    Returns:
+        DataFrame com as colunas convertidas (as demais inalteradas)
+    """
+    for coluna in categorical_columns(tipo, df):
+        if not isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].astype('category')
+    return df
+
+
+def concat_categorical(tipo, frames):
+    """
+    Concatena DataFrames mantendo as colunas categóricas como 'category'
+    
+    O pandas só preserva o tipo quando as categorias são iguais; as de cada
+    coluna são unidas antes (add_categories não recodifica as linhas).
+    """
+    frames = [apply_types(tipo, apply_categories(tipo, df.copy(deep=False))) for df in frames]
+    for coluna in categorical_columns(tipo, frames[0]):
+        if not all(coluna in df.columns for df in frames):
+            continue
+        categorias = list(frames[0][coluna].cat.categories)
+        vistas = set(categorias)
+        for df in frames[1:]:
+            for categoria in df[coluna].cat.categories:
+                if categoria not in vistas:
+                    vistas.add(categoria)
+                    categorias.append(categoria)
+        for df in frames:
+            existentes = set(df[coluna].cat.categories)
+            novas = [c for c in categorias if c not in existentes]
+            if novas:
+                df[coluna] = df[coluna].cat.add_categories(novas)
+            if list(df[coluna].cat.categories) != categorias:
+                df[coluna] = df[coluna].cat.reorder_categories(categorias)
+    return pd.concat(frames, ignore_index=True)
+
+
+def allow_value(df, coluna, valor):
+    """Inclui valor nas categorias da coluna (se categórica) antes de uma atribuição"""
+    serie = df[coluna]
+    if isinstance(serie.dtype, pd.CategoricalDtype) and pd.notna(valor) and valor not in serie.cat.categories:
+        df[coluna] = serie.cat.add_categories([valor])
+
+
+def drop_unused_categories(tipo, df, colunas=None):
+    """Remove categorias sem linhas (após exclusões ou atualizações)"""
+    for coluna in colunas if colunas is not None else categorical_columns(tipo, df):
+        if coluna in df.columns and isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].cat.remove_unused_categories()
+    return df
+
+
+def typed_columns(tipo, df):
+    """Colunas tipadas declaradas para o tipo que existem no DataFrame (coluna → tipo)"""
+    return {c: kind for c, kind in TYPED_COLUMNS.get(tipo, {}).items() if c in df.columns}
+
+
+def is_typed(serie):
+    """Se a coluna está convertida (datetime64 ou o número declarado) em vez de texto"""
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        return True
+    kind = _COLUMN_KINDS.get(serie.name)
+    return kind is not None and kind not in DATE_FORMATS and serie.dtype == kind
+
+
+def _parse(serie, kind):
+    """
+    Converte a coluna de texto para o tipo declarado
+    
+    O formato canônico é tentado primeiro; os demais valores passam por uma
+    conversão tolerante (datas como '01/05/2010', números com vírgula,
+    percentuais como '85.00%' gravados pelo reconhecimento facial) e os que
+    ainda assim não convertem viram NaT/NaN.
+    """
+    texto = serie.where(serie.notna(), '').astype(str).str.strip()
+    if kind in DATE_FORMATS:
+        convertida = pd.to_datetime(texto, format=DATE_FORMATS[kind], errors='coerce')
+        resto = convertida.isna() & (texto != '')
+        if resto.any():
+            convertida[resto] = pd.to_datetime(texto[resto], format='mixed', dayfirst=True, errors='coerce')
+        return convertida
+    texto = texto.str.replace(',', '.', regex=False)
+    percentual = texto.str.endswith('%')
+    convertida = pd.to_numeric(texto.str.rstrip('%'), errors='coerce')
+    return convertida.where(~percentual, convertida / 100).astype(kind)
+
+
+def invalid_values(tipo, df):
+    """
+    Valores preenchidos sem conversão nas colunas tipadas do tipo
+    
+    Args:
+        tipo: Tipo de dado
+        df: DataFrame com os valores a gravar
+    
+    Returns:
+        dict: coluna → máscara booleana das linhas com valor inválido
+    """
+    invalidos = {}
+    for coluna, kind in typed_columns(tipo, df).items():
+        if is_typed(df[coluna]):
+            continue
+        texto = df[coluna].where(df[coluna].notna(), '').astype(str).str.strip()
+        mascara = _parse(df[coluna], kind).isna() & (texto != '')
+        if mascara.any():
+            invalidos[coluna] = mascara
+    return invalidos
+
+
+def apply_types(tipo, df, colunas=None, originais=None):
+    """
+    Converte as colunas tipadas do tipo que ainda estão como texto
+    
+    Args:
+        tipo: Tipo de dado
+        df: DataFrame lido do armazenamento (strings)
+        colunas: Restringe a conversão a essas colunas (None = todas)
+        originais: Dicionário preenchido com coluna → {id: texto} dos valores
+                   sem conversão (que ficam NaT/NaN), para text_frame
+    
+    Returns:
+        DataFrame com as colunas convertidas (as demais inalteradas)
+    """
+    for coluna, kind in typed_columns(tipo, df).items():
+        if (colunas is not None and coluna not in colunas) or is_typed(df[coluna]):
+            continue
+        convertida = _parse(df[coluna], kind)
+        if originais is not None and 'id' in df.columns:
+            texto = df[coluna].where(df[coluna].notna(), '').astype(str)
+            perdidos = convertida.isna() & (texto.str.strip() != '')
+            if perdidos.any():
+                originais[coluna] = dict(zip(df.loc[perdidos, 'id'].tolist(), texto[perdidos].tolist()))
+        df[coluna] = convertida
+    return df
+
+
+def as_text(serie):
+    """
+    Valores da coluna no formato canônico do armazenamento (vazio para NaT/NaN)
+    
+    Colunas que não estão convertidas são devolvidas sem alteração.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        formato = DATE_FORMATS[_COLUMN_KINDS.get(serie.name, 'datetime')]
+        return serie.dt.strftime(formato).where(serie.notna(), '').astype(object)
+    if is_typed(serie):
+        return serie.astype(str).where(serie.notna(), '').astype(object)
+    return serie
+
+
+def text_frame(df, originais=None):
+    """
+    DataFrame com as colunas convertidas de volta a texto (para gravar)
+    
+    Args:
+        df: DataFrame com colunas tipadas
+        originais: coluna → {id: texto} de apply_types; as células vazias
+                   desses IDs voltam ao texto lido do armazenamento
+    """
+    tipadas = [c for c in df.columns if is_typed(df[c])]
+    if not tipadas:
+        return df
+    df = df.copy(deep=False)
+    for coluna in tipadas:
+        texto = as_text(df[coluna])
+        if originais and originais.get(coluna) and 'id' in df.columns:
+            lidos = df['id'].map(originais[coluna])
+            texto = texto.where((texto != '') | lidos.isna(), lidos)
+        df[coluna] = texto
+    return df
+
+
+def text_value(coluna, valor):
+    """Um valor convertido (Timestamp, float) no formato canônico da coluna"""
+    if isinstance(valor, pd.Timestamp):
+        return valor.strftime(DATE_FORMATS[_COLUMN_KINDS.get(coluna, 'datetime')])
+    kind = _COLUMN_KINDS.get(coluna)
+    if kind not in (None, *DATE_FORMATS) and isinstance(valor, (float, np.floating)):
+        return '' if pd.isna(valor) else as_text(pd.Series([valor], dtype=kind, name=coluna)).iloc[0]
+    if valor is pd.NaT:
+        return ''
+    return valor
+
+
+def canonical_value(coluna, valor):
+    """
+    Valor de uma coluna tipada no formato canônico do armazenamento
+    
+    Datas e números em outro formato reconhecível são normalizados; valores
+    vazios, sem conversão ou de colunas não tipadas são devolvidos como estão.
+    """
+    kind = _COLUMN_KINDS.get(coluna)
+    if kind is None or not isinstance(valor, str) or valor.strip() == '':
+        return valor
+    convertido = _parse(pd.Series([valor], dtype=object), kind).iloc[0]
+    return valor if pd.isna(convertido) else text_value(coluna, convertido)
+
+
+def align_value(df, coluna, valor):
+    """
+    Valor a atribuir em df[coluna] com o tipo que a coluna tem
+    
+    Um texto em coluna convertida é convertido (NaT/NaN se não tiver
+    conversão); um valor convertido em coluna de texto é gravado como texto.
+    """
+    if is_typed(df[coluna]):
+        if isinstance(valor, str):
+            return _parse(pd.Series([valor], dtype=object), _COLUMN_KINDS.get(coluna, 'datetime')).iloc[0]
+        return valor
+    if df[coluna].dtype == object:
+        return text_value(coluna, valor)
+    return valor
+
+
+def age_in_years(nascimento, referencia=None):
+    """
+    Idade completa em anos de uma coluna de datas de nascimento (vetorizado)
+    
+    Args:
+        nascimento: Série datetime64 (NaT para datas não informadas)
+        referencia: Data de referência (padrão: hoje)
+    
+    Returns:
+        Série de inteiros anuláveis (Int64)
+    """
+    referencia = pd.Timestamp(referencia) if referencia is not None else pd.Timestamp.now().normalize()
+    ainda_nao = (nascimento.dt.month > referencia.month) | (
+        (nascimento.dt.month == referencia.month) & (nascimento.dt.day > referencia.day))
+    return (referencia.year - nascimento.dt.year - ainda_nao.astype(int)).astype('Int64')
@@ -720,35 +720,31 @@ def add_test_students():
     print("ADICIONANDO 5 ALUNOS DE TESTE")
     print("=" * 60)
     
+    # Adicionar todos os cadastros em lote (uma única escrita)
+    resultados = dm.add_records('cadastro', [student['cadastro'] for student in test_students])
     alunos_ids = []
     
-    for i, student in enumerate(test_students, 1):
-        print(f"\nAdicionando aluno {i}/5: {student['cadastro']['nome_completo']}")
+    for i, (student, resultado) in enumerate(zip(test_students, resultados), 1):
+        print(f"\nAluno {i}/5: {student['cadastro']['nome_completo']}")
+        if not resultado['sucesso']:
+            print(f"  ✗ Cadastro rejeitado: {resultado['erro']}")
+            continue
+        alunos_ids.append(resultado['id'])
+        print(f"  ✓ Cadastro criado - ID: {resultado['id']}")
         
-        # Adicionar cadastro
-        aluno_id = dm.add_record('cadastro', student['cadastro'])
-        alunos_ids.append(aluno_id)
-        print(f"  ✓ Cadastro criado - ID: {aluno_id}")
-        
-        # Adicionar PEI
-        student['pei']['aluno_id'] = aluno_id
-        dm.add_record('pei', student['pei'])
-        print(f"  ✓ PEI cadastrado")
-        
-        # Adicionar socioeconômico
-        student['socioeconomico']['aluno_id'] = aluno_id
-        dm.add_record('socioeconomico', student['socioeconomico'])
-        print(f"  ✓ Socioeconômico cadastrado")
-        
-        # Adicionar questionário SAEB
-        student['questionario_saeb']['aluno_id'] = aluno_id
-        dm.add_record('questionario_saeb', student['questionario_saeb'])
-        print(f"  ✓ Questionário SAEB cadastrado")
-        
-        # Adicionar saúde
-        student['saude']['aluno_id'] = aluno_id
-        dm.add_record('saude', student['saude'])
-        print(f"  ✓ Saúde cadastrada")
+        for tipo in ['pei', 'socioeconomico', 'questionario_saeb', 'saude']:
+            student[tipo]['aluno_id'] = resultado['id']
+    
+    # Adicionar PEI, socioeconômico, questionário SAEB e saúde em lote por tabela
+    for tipo, rotulo in [('pei', 'PEI'), ('socioeconomico', 'Socioeconômico'),
+                         ('questionario_saeb', 'Questionário SAEB'), ('saude', 'Saúde')]:
+        registros = [student[tipo] for student in test_students if 'aluno_id' in student[tipo]]
+        resultados = dm.add_records(tipo, registros)
+        gravados = sum(1 for r in resultados if r['sucesso'])
+        print(f"\n  ✓ {rotulo}: {gravados}/{len(registros)} registro(s) cadastrado(s)")
+        for resultado in resultados:
+            if not resultado['sucesso']:
+                print(f"  ✗ {rotulo} rejeitado: {resultado['erro']}")
     
     print("\n" + "=" * 60)
     print("✅ TODOS OS 5 ALUNOS FORAM ADICIONADOS COM SUCESSO!")
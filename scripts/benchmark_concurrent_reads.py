@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark de leituras concorrentes no DataManager (várias threads, com e sem escritor)
+Compara o lock de leitura/escrita (leituras compartilhadas) com o lock exclusivo antigo
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from contextlib import contextmanager
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from data_manager import DataManager
+
+def gerar_dados(data_dir, backend, num_alunos):
+    """Grava num_alunos cadastros e um PEI por aluno"""
+    dm = DataManager(data_dir=data_dir, backend=backend)
+    colunas = list(dm.get_data('cadastro').columns)
+    df = pd.DataFrame('', index=range(num_alunos), columns=colunas)
+    df['id'] = range(1, num_alunos + 1)
+    df['nome_completo'] = [f'Aluno {i}' for i in range(1, num_alunos + 1)]
+    df['data_nascimento'] = '2012-01-01'
+    df['status'] = 'Ativo'
+    df['turno'] = ['Manhã', 'Tarde'][0]
+    dm.save_data('cadastro', df)
+    
+    colunas = list(dm.get_data('pei').columns)
+    pei = pd.DataFrame('', index=range(num_alunos), columns=colunas)
+    pei['id'] = range(1, num_alunos + 1)
+    pei['aluno_id'] = range(1, num_alunos + 1)
+    pei['necessidade_especial'] = 'Não'
+    dm.save_data('pei', pei)
+
+def exclusivo(dm):
+    """Volta ao comportamento antigo: toda leitura pega o lock exclusivo"""
+    @contextmanager
+    def secao(*tipos):
+        with dm._lock:
+            yield
+    dm._read_section = secao
+
+def rodar(dm, num_leitores, duracao, com_escritor, num_alunos):
+    """Leitores (get_data, get_record, get_by_aluno) por duracao segundos; retorna métricas"""
+    parar = threading.Event()
+    latencias = [[] for _ in range(num_leitores)]
+    escritas = [0]
+    
+    def leitor(n):
+        i = n
+        while not parar.is_set():
+            aluno_id = 1 + (i * 7919) % num_alunos
+            inicio = time.perf_counter()
+            if i % 3 == 0:
+                dm.get_data('cadastro')
+            elif i % 3 == 1:
+                dm.get_record('cadastro', aluno_id)
+            else:
+                dm.get_by_aluno('pei', aluno_id)
+            latencias[n].append(time.perf_counter() - inicio)
+            i += 1
+    
+    def escritor():
+        # Atualização de uma linha: reescrita completa do CSV (gravação lenta)
+        i = 0
+        while not parar.is_set():
+            dm.update_record('cadastro', 1 + i % num_alunos, {'telefone': f'8599999{i:04d}'})
+            escritas[0] += 1
+            i += 1
+    
+    threads = [threading.Thread(target=leitor, args=(n,)) for n in range(num_leitores)]
+    if com_escritor:
+        threads.append(threading.Thread(target=escritor))
+    for t in threads:
+        t.start()
+    time.sleep(duracao)
+    parar.set()
+    for t in threads:
+        t.join()
+    
+    todas = pd.Series([l for por_thread in latencias for l in por_thread]) * 1000
+    return {
+        'leituras/s': len(todas) / duracao,
+        'p50 (ms)': todas.quantile(0.5),
+        'p99 (ms)': todas.quantile(0.99),
+        'máx (ms)': todas.max(),
+        'escritas': escritas[0],
+    }
+
+def benchmark(backend, num_alunos, leitores, duracao, com_escritor):
+    temp_dir = tempfile.mkdtemp(prefix=f'bench_rw_{backend}_')
+    try:
+        data_dir = os.path.join(temp_dir, 'data')
+        gerar_dados(data_dir, backend, num_alunos)
+        
+        resultados = {}
+        for modo in ['exclusivo', 'leitura/escrita']:
+            for n in leitores:
+                dm = DataManager(data_dir=data_dir, backend=backend)
+                if modo == 'exclusivo':
+                    exclusivo(dm)
+                # Tabelas em cache antes da medição
+                dm.get_data('cadastro')
+                dm.get_data('pei')
+                resultados[(modo, n)] = rodar(dm, n, duracao, com_escritor, num_alunos)
+        return resultados
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de leituras concorrentes no DataManager")
+    parser.add_argument('--students', type=int, default=20000, help="Alunos cadastrados (padrão: 20000)")
+    parser.add_argument('--readers', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help="Threads leitoras (padrão: 1 2 4 8)")
+    parser.add_argument('--seconds', type=float, default=3.0, help="Duração de cada medição (padrão: 3)")
+    parser.add_argument('--no-writer', action='store_true', help="Sem a thread escritora")
+    parser.add_argument('--backends', nargs='+', default=['csv', 'sqlite'])
+    args = parser.parse_args()
+    
+    escritor = not args.no_writer
+    print("=" * 86)
+    print(f"BENCHMARK DE LEITURAS CONCORRENTES ({args.students} alunos, "
+          f"{'com' if escritor else 'sem'} escritor, {args.seconds:.0f}s por medição)")
+    print("=" * 86)
+    
+    for backend in args.backends:
+        resultados = benchmark(backend, args.students, args.readers, args.seconds, escritor)
+        
+        print(f"\nBackend {backend}")
+        print("-" * 86)
+        metricas = list(next(iter(resultados.values())))
+        print(f"{'lock':18}{'leitores':>9}" + "".join(f"{m:>12}" for m in metricas))
+        for (modo, n), valores in resultados.items():
+            print(f"{modo:18}{n:>9}" + "".join(
+                f"{valores[m]:>12.0f}" if m in ('leituras/s', 'escritas') else f"{valores[m]:>12.2f}"
+                for m in metricas))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memória do caminho de leitura do DataManager
+Compara o pico de RSS de renderizações simuladas (5-7 get_data por página)
+com cópia completa por leitura (comportamento anterior) e com visões rasas do cache
+"""
+import os
+import sys
+import json
+import shutil
+import resource
+import argparse
+import tempfile
+import subprocess
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def pico_rss_mb():
+    """Pico de memória residente do processo atual em MB"""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB, macOS em bytes
+    return pico / 1024 / 1024 if sys.platform == 'darwin' else pico / 1024
+
+def executar_modo(modo, linhas, renders):
+    """Executado em um subprocesso: simula as renderizações e mede o pico de RSS"""
+    import pandas as pd
+    from data_manager import DataManager
+    
+    temp_dir = tempfile.mkdtemp(prefix='bench_memoria_')
+    try:
+        dm = DataManager(data_dir=os.path.join(temp_dir, 'data'))
+        colunas = list(dm.get_data('attendance').columns)
+        df = pd.DataFrame('', index=range(linhas), columns=colunas)
+        df['id'] = range(1, linhas + 1)
+        df['aluno_id'] = [1 + i % 2000 for i in range(linhas)]
+        df['data'] = [f'2026-{1 + i % 12:02d}-{1 + i % 28:02d}' for i in range(linhas)]
+        df['hora'] = '07:30:00'
+        df['tipo'] = 'entrada'
+        df['verificado'] = 'Sim'
+        df['observacoes'] = 'Registro automático por reconhecimento facial'
+        dm.save_data('attendance', df)
+        del df
+        
+        dm.get_data('attendance')  # Aquece o cache
+        rss_base = pico_rss_mb()
+        
+        copiar = modo == 'copia'
+        for _ in range(renders):
+            # Uma página mantém as leituras vivas até terminar de renderizar
+            pagina = [dm.get_data('attendance', copy=copiar) for _ in range(7)]
+            hoje = pagina[0][pagina[0]['data'] == '2026-03-03']
+            contagem = pagina[1].groupby('data').size()
+            del pagina, hoje, contagem
+        
+        return {'modo': modo, 'rss_base_mb': rss_base, 'rss_pico_mb': pico_rss_mb()}
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Pico de RSS: cópia por leitura x visão rasa do cache")
+    parser.add_argument('--rows', type=int, default=50000, help="Linhas de presença (padrão: 50000)")
+    parser.add_argument('--renders', type=int, default=20, help="Renderizações simuladas (padrão: 20)")
+    parser.add_argument('--modo', choices=['copia', 'visao'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.modo:
+        print(json.dumps(executar_modo(args.modo, args.rows, args.renders)))
+        return
+    
+    print("=" * 70)
+    print(f"BENCHMARK DE MEMÓRIA ({args.rows} presenças, {args.renders} renderizações)")
+    print("=" * 70)
+    
+    # Cada modo roda em um processo novo para que o pico de RSS seja independente
+    for modo, descricao in [('copia', 'Antes: cópia por get_data'),
+                            ('visao', 'Depois: visão rasa do cache')]:
+        saida = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--modo', modo,
+             '--rows', str(args.rows), '--renders', str(args.renders)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        resultado = json.loads(saida.strip().splitlines()[-1])
+        print(f"{descricao:32} pico RSS: {resultado['rss_pico_mb']:8.1f} MB "
+              f"(após carga: {resultado['rss_base_mb']:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
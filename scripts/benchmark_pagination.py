@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark da paginação (get_data_paginated) sem a tabela em cache
+Compara a leitura só da página com o caminho antigo (carregar tudo e fatiar)
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from data_manager import DataManager
+
+def gerar_presencas(dm, num_linhas):
+    """Grava num_linhas presenças sintéticas em 12 meses"""
+    colunas = list(dm.get_data('attendance').columns)
+    df = pd.DataFrame('', index=range(num_linhas), columns=colunas)
+    df['id'] = range(1, num_linhas + 1)
+    df['aluno_id'] = [1 + i % 500 for i in range(num_linhas)]
+    df['data'] = [f'2026-{1 + i * 12 // num_linhas:02d}-{1 + i % 28:02d}' for i in range(num_linhas)]
+    df['hora'] = '07:00'
+    df['tipo'] = 'entrada'
+    dm.save_data('attendance', df)
+    dm.clear_cache()
+
+def medir(func, repeticoes):
+    """Tempo médio (ms) de func"""
+    inicio = time.perf_counter()
+    for i in range(repeticoes):
+        func(i)
+    return (time.perf_counter() - inicio) * 1000 / repeticoes
+
+def benchmark(backend, num_linhas, ops, page_size):
+    temp_dir = tempfile.mkdtemp(prefix=f'bench_pag_{backend}_')
+    try:
+        data_dir = os.path.join(temp_dir, 'data')
+        gerar_presencas(DataManager(data_dir=data_dir, backend=backend), num_linhas)
+        dm = DataManager(data_dir=data_dir, backend=backend)
+        total_paginas = num_linhas // page_size
+        
+        resultados = {}
+        # Primeira página: inclui a construção do índice de posições (CSV)
+        resultados['primeira leitura'] = medir(lambda i: dm.get_data_paginated('attendance', 1, page_size), 1)
+        resultados['página inicial'] = medir(lambda i: dm.get_data_paginated('attendance', 1, page_size), ops)
+        resultados['página do meio'] = medir(
+            lambda i: dm.get_data_paginated('attendance', total_paginas // 2, page_size), ops)
+        resultados['última página'] = medir(
+            lambda i: dm.get_data_paginated('attendance', total_paginas, page_size), ops)
+        
+        # Caminho antigo: tabela inteira carregada e fatiada a cada página
+        def carregar_e_fatiar(i):
+            dm.clear_cache()
+            dm.get_data('attendance').iloc[:page_size]
+        resultados['carregar tudo + iloc'] = medir(carregar_e_fatiar, max(1, ops // 5))
+        return resultados
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da paginação sem carregar a tabela")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 500000],
+                        help="Linhas de presença (padrão: 10000 100000 500000)")
+    parser.add_argument('--ops', type=int, default=20, help="Leituras por medição (padrão: 20)")
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--backends', nargs='+', default=['csv', 'sqlite'])
+    args = parser.parse_args()
+    
+    print("=" * 78)
+    print(f"BENCHMARK DE PAGINAÇÃO (attendance, {args.page_size} linhas por página, ms)")
+    print("=" * 78)
+    
+    for backend in args.backends:
+        por_tamanho = {n: benchmark(backend, n, args.ops, args.page_size) for n in args.sizes}
+        
+        print(f"\nBackend {backend}")
+        print("-" * 78)
+        print(f"{'operação':24}" + "".join(f"{n:>14}" for n in args.sizes))
+        for operacao in por_tamanho[args.sizes[0]]:
+            print(f"{operacao:24}" + "".join(f"{por_tamanho[n][operacao]:>14.2f}" for n in args.sizes))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark comparando os backends de armazenamento (CSV x SQLite)
+Mede leitura fria, consultas e escritas do DataManager com 1k, 10k e 100k alunos
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from data_manager import DataManager
+
+SATELITES = ['pei', 'socioeconomico', 'saude']
+
+def gerar_dados(dm, num_alunos):
+    """Popula as tabelas principais com num_alunos alunos sintéticos"""
+    ids = list(range(1, num_alunos + 1))
+    
+    colunas = list(dm.get_data('cadastro').columns)
+    cadastro = pd.DataFrame('', index=range(num_alunos), columns=colunas)
+    cadastro['id'] = ids
+    cadastro['nome_completo'] = [f'Aluno Benchmark {i}' for i in ids]
+    cadastro['data_nascimento'] = '2010-01-01'
+    cadastro['cpf'] = [f'{i:011d}' for i in ids]
+    cadastro['status'] = 'Ativo'
+    cadastro['turno'] = 'Matutino'
+    dm.save_data('cadastro', cadastro)
+    
+    for tipo in SATELITES:
+        colunas = list(dm.get_data(tipo).columns)
+        df = pd.DataFrame('', index=range(num_alunos), columns=colunas)
+        df['id'] = ids
+        df['aluno_id'] = ids
+        if 'necessidade_especial' in df.columns:
+            df['necessidade_especial'] = 'Não'
+        dm.save_data(tipo, df)
+    
+    dm.clear_cache()
+
+def medir(func, repeticoes=1):
+    """Retorna o tempo médio (ms) de func"""
+    inicio = time.perf_counter()
+    for i in range(repeticoes):
+        func(i)
+    return (time.perf_counter() - inicio) * 1000 / repeticoes
+
+def benchmark_backend(backend, num_alunos, ops):
+    """Executa o benchmark para um backend e tamanho de base"""
+    temp_dir = tempfile.mkdtemp(prefix=f'bench_{backend}_')
+    try:
+        data_dir = os.path.join(temp_dir, 'data')
+        gerar_dados(DataManager(data_dir=data_dir, backend=backend), num_alunos)
+        
+        dm = DataManager(data_dir=data_dir, backend=backend)
+        resultados = {}
+        
+        resultados['leitura fria'] = medir(lambda i: dm.get_data('cadastro'))
+        resultados['leitura cache'] = medir(lambda i: dm.get_data('cadastro'), ops)
+        resultados['get_all_student_data'] = medir(
+            lambda i: dm.get_all_student_data(1 + i * 7 % num_alunos), ops)
+        resultados['add_record (presença)'] = medir(
+            lambda i: dm.add_record('attendance', {'aluno_id': 1 + i % num_alunos,
+                                                   'data': '2026-03-02'}), ops)
+        resultados['update_record'] = medir(
+            lambda i: dm.update_record('cadastro', 1 + i % num_alunos, {'turno': 'Vespertino'}), ops)
+        resultados['delete_record'] = medir(
+            lambda i: dm.delete_record('saude', num_alunos - i), ops)
+        resultados['transação (matrícula)'] = medir(lambda i: dm.execute_transaction([
+            ('add', 'cadastro', {'nome_completo': f'Novo {i}', 'data_nascimento': '2010-01-01',
+                                 'status': 'Ativo'}),
+            ('add', 'pei', {'aluno_id': num_alunos + i + 1, 'necessidade_especial': 'Não'}),
+            ('add', 'socioeconomico', {'aluno_id': num_alunos + i + 1}),
+            ('add', 'saude', {'aluno_id': num_alunos + i + 1}),
+        ]), ops)
+        return resultados
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CSV x SQLite do DataManager")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help="Quantidades de alunos (padrão: 1000 10000 100000)")
+    parser.add_argument('--ops', type=int, default=10, help="Operações por medição (padrão: 10)")
+    parser.add_argument('--backends', nargs='+', default=['csv', 'sqlite'])
+    args = parser.parse_args()
+    
+    print("=" * 78)
+    print("BENCHMARK DE ARMAZENAMENTO (tempo médio por operação, ms)")
+    print("=" * 78)
+    
+    for num_alunos in args.sizes:
+        por_backend = {b: benchmark_backend(b, num_alunos, args.ops) for b in args.backends}
+        
+        print(f"\n{num_alunos} alunos")
+        print("-" * 78)
+        print(f"{'operação':28}" + "".join(f"{b:>16}" for b in args.backends))
+        for operacao in por_backend[args.backends[0]]:
+            linha = f"{operacao:28}"
+            for b in args.backends:
+                linha += f"{por_backend[b][operacao]:>16.2f}"
+            print(linha)
+
+if __name__ == "__main__":
+    main()
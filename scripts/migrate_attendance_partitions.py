@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Migração de data/attendance.csv para partições mensais (data/attendance/AAAA-MM.csv)
+O DataManager continua usando o CSV único até que este script seja executado;
+as contagens são conferidas ao final
+"""
+import os
+import sys
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from data_manager import DataManager
+from storage import MIGRATED_SUFFIX
+
+def migrate_attendance_partitions(data_dir='data'):
+    """
+    Converte attendance.csv em partições mensais
+    
+    Args:
+        data_dir: Diretório de dados com os CSVs
+    
+    Returns:
+        dict: Número de registros por partição
+    
+    Raises:
+        RuntimeError: Se o total de registros divergir do arquivo original
+    """
+    legado = os.path.join(data_dir, 'attendance.csv')
+    total_original = None
+    if os.path.exists(legado):
+        try:
+            total_original = len(pd.read_csv(legado, dtype=str, keep_default_na=False))
+        except pd.errors.EmptyDataError:
+            total_original = 0
+    
+    dm = DataManager(data_dir=data_dir, backend='csv')
+    storage = dm._storage
+    storage.migrate_partitions()
+    
+    particoes = {}
+    for particao in storage.partitions('attendance'):
+        df = pd.read_csv(storage.partition_path('attendance', particao), dtype=str, keep_default_na=False)
+        particoes[particao] = len(df)
+    
+    if total_original is not None and sum(particoes.values()) != total_original:
+        raise RuntimeError(f"Contagem divergente: attendance.csv={total_original}, "
+                           f"partições={sum(particoes.values())}")
+    return particoes
+
+def main():
+    parser = argparse.ArgumentParser(description="Particiona attendance.csv por mês")
+    parser.add_argument('--data-dir', default='data', help="Diretório de dados (padrão: data)")
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("MIGRAÇÃO ATTENDANCE → PARTIÇÕES MENSAIS")
+    print("=" * 60)
+    
+    try:
+        particoes = migrate_attendance_partitions(args.data_dir)
+    except RuntimeError as e:
+        print(f"✗ {e}")
+        return 1
+    
+    for particao, total in particoes.items():
+        print(f"  ✓ {particao:12} {total:>8} registros")
+    
+    print(f"\n✅ Partições em {os.path.join(args.data_dir, 'attendance')}/ "
+          f"(arquivo original mantido como attendance.csv{MIGRATED_SUFFIX})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Migração única dos arquivos CSV para o backend SQLite
+Copia todas as tabelas de data/*.csv (e as sequências de IDs) para data/matricula.db e confere as contagens
+"""
+import os
+import sys
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_manager import DataManager
+from storage import SQLiteStorage
+
+def migrate_csv_to_sqlite(data_dir='data', overwrite=False):
+    """
+    Migra todas as tabelas CSV para o banco SQLite
+    
+    Args:
+        data_dir: Diretório de dados com os CSVs
+        overwrite: Se True, substitui um banco SQLite já existente
+    
+    Returns:
+        dict: Número de registros migrados por tipo
+    
+    Raises:
+        FileExistsError: Se o banco já existir e overwrite for False
+    """
+    dm_csv = DataManager(data_dir=data_dir, backend='csv')
+    db_path = os.path.join(data_dir, 'matricula.db')
+    
+    if os.path.exists(db_path) and not overwrite:
+        raise FileExistsError(f"Banco SQLite já existe: {db_path} (use --force para substituir)")
+    
+    sqlite = SQLiteStorage(db_path)
+    migrados = {}
+    
+    try:
+        with sqlite.transaction():
+            for tipo in dm_csv.files:
+                df = dm_csv._storage.load(tipo)
+                if df is None:
+                    continue
+                sqlite.write_table(tipo, df)
+                # IDs apagados do fim da tabela continuam reservados
+                sqlite.seed_sequence(tipo, dm_csv._storage.last_id(tipo))
+                migrados[tipo] = len(df)
+        
+        # Confere as contagens após o commit
+        for tipo, total in migrados.items():
+            df = sqlite.load(tipo)
+            if df is None or len(df) != total:
+                raise RuntimeError(f"Contagem divergente em {tipo}: CSV={total}, SQLite={0 if df is None else len(df)}")
+    finally:
+        sqlite.close()
+    
+    return migrados
+
+def main():
+    parser = argparse.ArgumentParser(description="Migra os dados CSV para o backend SQLite")
+    parser.add_argument('--data-dir', default='data', help="Diretório de dados (padrão: data)")
+    parser.add_argument('--force', action='store_true', help="Substitui o banco SQLite existente")
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("MIGRAÇÃO CSV → SQLITE")
+    print("=" * 60)
+    
+    try:
+        migrados = migrate_csv_to_sqlite(args.data_dir, overwrite=args.force)
+    except (FileExistsError, RuntimeError) as e:
+        print(f"✗ {e}")
+        return 1
+    
+    for tipo, total in migrados.items():
+        print(f"  ✓ {tipo:20} {total:>8} registros")
+    
+    print("\n✅ Migração concluída. Use DataManager(backend='sqlite') ou MATRICULA_BACKEND=sqlite")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
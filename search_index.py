@@ -0,0 +1,101 @@
+"""
+Índice invertido de trigramas para busca textual por substring
+Usado pelo DataManager nas buscas por nome (sem acento e sem diferenciar maiúsculas)
+"""
+import unicodedata
+
+import pandas as pd
+
+
+def normalize_text(texto):
+    """
+    Normaliza um texto para busca: sem acentos, minúsculo e com espaços simples
+    
+    Args:
+        texto: Valor a normalizar (None/NaN viram string vazia)
+    
+    Returns:
+        str: Texto normalizado
+    """
+    if texto is None or (not isinstance(texto, str) and pd.isna(texto)):
+        return ''
+    decomposto = unicodedata.normalize('NFKD', str(texto))
+    sem_acento = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return ' '.join(sem_acento.casefold().split())
+
+
+def trigrams(texto):
+    """Conjunto de trigramas de um texto já normalizado"""
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class TrigramIndex:
+    """
+    Índice trigrama → IDs dos registros que contêm o trigrama
+    
+    Uma busca intersecta as listas dos trigramas do termo (começando pela
+    menor) e confirma a substring apenas nos candidatos. Termos com menos
+    de três caracteres não têm trigramas e são conferidos em todos os textos.
+    """
+    
+    def __init__(self):
+        self._postings = {}
+        self._texts = {}
+    
+    def __len__(self):
+        return len(self._texts)
+    
+    def add(self, record_id, texto):
+        """Indexa (ou reindexa) o texto de um registro"""
+        self.remove(record_id)
+        normalizado = normalize_text(texto)
+        self._texts[record_id] = normalizado
+        for trigrama in trigrams(normalizado):
+            self._postings.setdefault(trigrama, set()).add(record_id)
+    
+    def remove(self, record_id):
+        """Remove um registro do índice (sem efeito se não estiver indexado)"""
+        normalizado = self._texts.pop(record_id, None)
+        if normalizado is None:
+            return
+        for trigrama in trigrams(normalizado):
+            ids = self._postings.get(trigrama)
+            if ids is not None:
+                ids.discard(record_id)
+                if not ids:
+                    del self._postings[trigrama]
+    
+    def search(self, termo):
+        """
+        Retorna os IDs dos registros cujo texto contém o termo
+        
+        Args:
+            termo: Trecho a buscar (acentos e maiúsculas são ignorados)
+        
+        Returns:
+            set: IDs dos registros encontrados
+        """
+        normalizado = normalize_text(termo)
+        if not normalizado:
+            return set(self._texts)
+        
+        chaves = trigrams(normalizado)
+        if not chaves:
+            return {rid for rid, texto in self._texts.items() if normalizado in texto}
+        
+        listas = []
+        for trigrama in chaves:
+            ids = self._postings.get(trigrama)
+            if not ids:
+                return set()
+            listas.append(ids)
+        listas.sort(key=len)
+        
+        candidatos = set(listas[0])
+        for ids in listas[1:]:
+            candidatos &= ids
+            if not candidatos:
+                return candidatos
+        
+        # Trigramas em comum não garantem a substring: confirma nos candidatos
+        return {rid for rid in candidatos if normalizado in self._texts[rid]}
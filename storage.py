@@ -0,0 +1,1134 @@
+"""
+Engines de armazenamento usados pelo DataManager
+Inclui: CSV (padrão, um arquivo por tabela) e SQLite (sqlite3 da biblioteca padrão)
+"""
+import io
+import json
+from array import array
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from schema import text_frame, text_value
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos, apenas entre threads
+    fcntl = None
+
+# Colunas inteiras e colunas indexadas no backend SQLite
+INTEGER_COLUMNS = ('id', 'aluno_id')
+INDEXED_COLUMNS = ('id', 'aluno_id', 'cpf', 'data')
+
+# Tabelas particionadas por mês (tipo -> coluna de data 'AAAA-MM-DD'); no
+# backend CSV cada mês fica em um arquivo (attendance/2026-10.csv)
+PARTITIONED_TABLES = {'attendance': 'data'}
+PARTITION_HEADER = '_header.csv'
+PARTITION_UNDATED = 'sem_data'
+MIGRATED_SUFFIX = '.migrated'
+
+# Journal de commit de transações multi-tabela do backend CSV
+JOURNAL_FILENAME = '.transaction_journal.json'
+
+# Tabela de versões do backend SQLite (validação de cache)
+VERSIONS_TABLE = '"_versions"'
+
+# Sequências de ID por tabela (último ID entregue)
+SEQUENCES_FILENAME = '.sequences.json'
+SEQUENCES_LOCK_FILENAME = '.sequences.lock'
+SEQUENCES_TABLE = '"_sequences"'
+
+# Lock de escrita compartilhado por todos os processos que usam o diretório de dados
+WRITE_LOCK_FILENAME = '.write.lock'
+
+
+@contextmanager
+def file_lock(path, shared=False):
+    """
+    Lock entre processos sobre um arquivo de lock (fcntl.flock)
+    
+    Exclusivo por padrão; com shared=True, compartilhado (vários leitores
+    ao mesmo tempo, nenhum enquanto houver um exclusivo). Sem fcntl
+    (Windows) o bloco roda sem lock entre processos; o lock entre threads
+    fica a cargo do chamador.
+    """
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class ReentrantFileLock:
+    """
+    Lock de escrita entre processos (file_lock) reentrante na thread que o detém
+    
+    Dentro do processo as threads são serializadas por um RLock; só a
+    primeira entrada da thread adquire o flock (um segundo flock no mesmo
+    processo, por outro descritor, bloquearia a si mesmo).
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._owner = None
+    
+    @contextmanager
+    def hold(self):
+        with self._lock:
+            if self._depth > 0:
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+            
+            with file_lock(self.path):
+                self._depth = 1
+                self._owner = threading.get_ident()
+                try:
+                    yield
+                finally:
+                    self._owner = None
+                    self._depth = 0
+    
+    @contextmanager
+    def hold_shared(self):
+        """
+        Lock compartilhado para leitura: espera a escrita em andamento (de
+        qualquer processo ou thread) e impede que outra comece até o fim
+        
+        Na thread que detém o lock de escrita não espera (lê o que ela grava).
+        """
+        if self._owner == threading.get_ident():
+            yield
+            return
+        with file_lock(self.path, shared=True):
+            yield
+
+
+class RowOffsetIndex:
+    """
+    Posição em bytes do início de cada registro de um CSV
+    
+    Permite ler as linhas [inicio, fim) com um seek e uma leitura, sem
+    interpretar o resto do arquivo. Campos entre aspas podem conter quebras de
+    linha: um registro só termina quando o número de aspas lidas é par.
+    
+    O índice é construído com uma passada pelo arquivo e, quando o arquivo só
+    cresceu (inserções anexadas ao final), estendido a partir do último
+    registro conhecido. Uma reescrita (novo inode, arquivo menor ou último
+    registro alterado) faz a varredura recomeçar do início.
+    """
+    
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._reset()
+    
+    def _reset(self):
+        self.header = b''
+        self.offsets = array('q')
+        self._stat = None
+        self._cauda = b''
+    
+    def __len__(self):
+        return len(self.offsets)
+    
+    def refresh(self):
+        """Atualiza o índice com o estado atual do arquivo (FileNotFoundError se não existir)"""
+        st = os.stat(self.filepath)
+        atual = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if atual == self._stat:
+            return
+        
+        with open(self.filepath, 'rb') as f:
+            inicio = 0
+            if self._stat is not None and st.st_ino == self._stat[0] and st.st_size >= self._stat[2]:
+                # Só cresceu? Confere o último registro e continua a partir dele
+                retomada = self.offsets[-1] if self.offsets else len(self.header)
+                f.seek(retomada)
+                if f.read(len(self._cauda)) == self._cauda:
+                    inicio = retomada
+                    if self.offsets:
+                        self.offsets.pop()
+            if inicio == 0:
+                self._reset()
+            self._scan(f, inicio)
+        self._stat = atual
+    
+    def _scan(self, f, posicao):
+        f.seek(posicao)
+        inicio_registro = None
+        aspas_pares = True
+        for linha in f:
+            if inicio_registro is None:
+                inicio_registro = posicao
+            if inicio_registro == 0:
+                self.header += linha
+            posicao += len(linha)
+            if linha.count(b'"') % 2:
+                aspas_pares = not aspas_pares
+            if not aspas_pares:
+                continue
+            if inicio_registro > 0 and linha.strip():
+                self.offsets.append(inicio_registro)
+            inicio_registro = None
+        if inicio_registro is not None and inicio_registro > 0:
+            self.offsets.append(inicio_registro)
+        
+        # Último registro, para detectar reescrita na próxima atualização
+        ultimo = self.offsets[-1] if self.offsets else len(self.header)
+        f.seek(ultimo)
+        self._cauda = f.read(posicao - ultimo)
+    
+    def read(self, inicio, fim):
+        """Linhas [inicio, fim) como DataFrame de strings (com as colunas do cabeçalho)"""
+        fim = min(fim, len(self.offsets))
+        if inicio >= fim:
+            return pd.read_csv(io.BytesIO(self.header), dtype=str, keep_default_na=False)
+        with open(self.filepath, 'rb') as f:
+            f.seek(self.offsets[inicio])
+            if fim < len(self.offsets):
+                dados = f.read(self.offsets[fim] - self.offsets[inicio])
+            else:
+                dados = f.read(self._stat[2] - self.offsets[inicio])
+        if not self.header.endswith(b'\n'):
+            dados = b'\n' + dados
+        return pd.read_csv(io.BytesIO(self.header + dados), dtype=str, keep_default_na=False)
+
+
+def filter_date_range(df, coluna, inicio, fim):
+    """
+    Filtra os registros com coluna entre inicio e fim (datas 'AAAA-MM-DD', inclusive)
+    
+    Colunas já convertidas para datetime64 são comparadas como datas; as
+    demais, sobre o texto (mesmo resultado para datas no formato canônico).
+    """
+    if coluna not in df.columns:
+        return df
+    if pd.api.types.is_datetime64_any_dtype(df[coluna].dtype):
+        datas = df[coluna]
+        return df[(datas >= pd.Timestamp(inicio)) & (datas <= pd.Timestamp(fim))].reset_index(drop=True)
+    datas = df[coluna].astype(str)
+    return df[(datas >= inicio) & (datas <= fim)].reset_index(drop=True)
+
+
+def _same_content(filepath, conteudo):
+    """Se o arquivo existe e tem exatamente esse conteúdo (bytes)"""
+    try:
+        if os.path.getsize(filepath) != len(conteudo):
+            return False
+        with open(filepath, 'rb') as f:
+            return f.read() == conteudo
+    except FileNotFoundError:
+        return False
+
+
+def partition_keys(df, coluna):
+    """Partição mensal ('AAAA-MM') de cada registro; datas inválidas vão para 'sem_data'"""
+    if coluna not in df.columns:
+        return pd.Series(PARTITION_UNDATED, index=df.index)
+    datas = df[coluna].astype(str)
+    return datas.str.slice(0, 7).where(datas.str.match(r'\d{4}-\d{2}'), PARTITION_UNDATED)
+
+
+def partition_order(df, coluna):
+    """Posições que põem os registros na ordem de load() das partições (por mês; estável em cada uma)"""
+    return partition_keys(df, coluna).reset_index(drop=True).sort_values(kind='stable').index
+
+
+def _usecols(columns):
+    """Filtro de colunas para read_csv (None = todas); ignora colunas inexistentes"""
+    if columns is None:
+        return None
+    pedidas = set(columns)
+    return lambda coluna: coluna in pedidas
+
+
+def serialize_rows(rows, columns):
+    """
+    Serializa registros como linhas CSV (sem cabeçalho) na ordem das colunas
+    
+    Args:
+        rows: Lista de dicionários
+        columns: Ordem das colunas da tabela
+    
+    Returns:
+        tuple: (texto CSV, DataFrame com os valores como seriam lidos do arquivo)
+    """
+    buffer = io.StringIO()
+    pd.DataFrame(rows, columns=columns).to_csv(buffer, index=False, header=False)
+    texto = buffer.getvalue()
+    df = pd.read_csv(io.StringIO(texto), header=None, names=columns,
+                     dtype=str, keep_default_na=False)
+    return texto, df
+
+
+class CSVStorage:
+    """
+    Armazena cada tabela em um arquivo CSV
+    
+    Não há escrita por linha: atualizações e exclusões reescrevem o arquivo
+    inteiro (write_table); inserções são anexadas ao final do arquivo.
+    
+    As tabelas de PARTITIONED_TABLES ficam em um diretório com um arquivo por
+    mês (attendance/AAAA-MM.csv) e o cabeçalho em _header.csv; load() junta
+    as partições e load_range() lê apenas as do intervalo pedido. Enquanto o
+    CSV único antigo (attendance.csv) existir, ele continua sendo usado; a
+    conversão é feita por migrate_partitions()
+    (scripts/migrate_attendance_partitions.py).
+    """
+    name = 'csv'
+    transactional = False
+    row_writes = False
+    
+    def __init__(self, files, data_dir):
+        self.files = files
+        self.data_dir = data_dir
+        self.journal_path = os.path.join(data_dir, JOURNAL_FILENAME)
+        self.sequences_path = os.path.join(data_dir, SEQUENCES_FILENAME)
+        self._sequences_lock = threading.Lock()
+        self._write_lock = ReentrantFileLock(os.path.join(data_dir, WRITE_LOCK_FILENAME))
+        # Índices de posição dos registros por arquivo (leitura paginada)
+        self._row_indexes = {}
+    
+    def write_lock(self):
+        """
+        Seção de escrita exclusiva entre processos (e threads)
+        
+        O DataManager faz leitura + alteração + gravação dentro dela, de modo
+        que dois processos não reescrevem a mesma tabela a partir de versões
+        diferentes.
+        """
+        return self._write_lock.hold()
+    
+    def read_lock(self):
+        """
+        Leitura compartilhada entre processos (e threads)
+        
+        Inserções são anexadas ao arquivo no lugar (e uma inserção em vários
+        meses grava várias partições); sob este lock a leitura espera a
+        escrita em andamento e nunca vê um arquivo ou tabela pela metade.
+        """
+        return self._write_lock.hold_shared()
+    
+    def is_partitioned(self, tipo):
+        """Se a tabela está em partições mensais (e não no CSV único ainda não migrado)"""
+        return tipo in PARTITIONED_TABLES and not os.path.exists(self.files[tipo])
+    
+    def partition_dir(self, tipo):
+        """Diretório das partições de uma tabela particionada (data/attendance)"""
+        return os.path.splitext(self.files[tipo])[0]
+    
+    def partition_path(self, tipo, particao):
+        """Arquivo de uma partição ('AAAA-MM' ou 'sem_data')"""
+        return os.path.join(self.partition_dir(tipo), f'{particao}.csv')
+    
+    def partitions(self, tipo):
+        """Partições existentes em ordem cronológica ('sem_data' por último)"""
+        try:
+            nomes = os.listdir(self.partition_dir(tipo))
+        except FileNotFoundError:
+            return []
+        return sorted(n[:-4] for n in nomes if n.endswith('.csv') and not n.startswith(('.', '_')))
+    
+    def _table_files(self, tipo):
+        """Arquivos que compõem a tabela (cabeçalho e partições, ou o CSV único)"""
+        if not self.is_partitioned(tipo):
+            return [self.files[tipo]]
+        return [os.path.join(self.partition_dir(tipo), PARTITION_HEADER)] + \
+            [self.partition_path(tipo, p) for p in self.partitions(tipo)]
+    
+    def exists(self, tipo):
+        return os.path.exists(self._table_files(tipo)[0])
+    
+    def signature(self, tipo):
+        """
+        Assinatura da versão atual do arquivo (muda a cada escrita, inclusive de outro processo)
+        
+        Returns:
+            tuple ou None: (st_mtime_ns, st_size, st_ino) ou None se o arquivo não existir;
+                           nas tabelas particionadas, uma tupla dessas por arquivo
+        """
+        assinaturas = []
+        for filepath in self._table_files(tipo):
+            try:
+                st = os.stat(filepath)
+            except FileNotFoundError:
+                if not assinaturas:
+                    return None
+                continue
+            assinaturas.append((st.st_mtime_ns, st.st_size, st.st_ino))
+        if not self.is_partitioned(tipo):
+            return assinaturas[0]
+        return tuple(assinaturas)
+    
+    def _write_temp(self, tipo, df):
+        """Grava o DataFrame em um arquivo temporário no mesmo diretório (fsync incluído)"""
+        return self._write_temp_file(self.files[tipo], df)
+    
+    def _write_temp_file(self, filepath, df):
+        """Grava o DataFrame (ou o CSV já serializado, em bytes) em um temporário ao lado de filepath"""
+        conteudo = df if isinstance(df, bytes) else df.to_csv(index=False).encode('utf-8')
+        fd, temp_path = tempfile.mkstemp(
+            prefix=f'.{os.path.basename(filepath)}.', suffix='.tmp',
+            dir=os.path.dirname(filepath) or '.'
+        )
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(conteudo)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(filepath):
+                shutil.copymode(filepath, temp_path)
+            else:
+                os.chmod(temp_path, 0o644)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return temp_path
+    
+    def commit_tables(self, tables):
+        """
+        Grava várias tabelas de forma atômica (uma escrita por tabela)
+        
+        Cada tabela é gravada em um arquivo temporário; em seguida o journal
+        com os renames pendentes é gravado e só então os arquivos são
+        substituídos. Uma queda no meio dos renames é completada por recover().
+        
+        Args:
+            tables: Dicionário tipo -> DataFrame
+        """
+        with self.write_lock():
+            self._commit_tables(tables)
+    
+    def _commit_tables(self, tables):
+        pendentes = []
+        remocoes = []
+        try:
+            for tipo, df in tables.items():
+                # Colunas tipadas voltam ao texto canônico
+                df = text_frame(df)
+                if self.is_partitioned(tipo):
+                    remocoes.extend(self._write_partition_temps(tipo, df, pendentes))
+                else:
+                    pendentes.append((self._write_temp(tipo, df), self.files[tipo]))
+        except BaseException:
+            for temp_path, _ in pendentes:
+                os.unlink(temp_path)
+            raise
+        
+        com_journal = len(pendentes) + len(remocoes) > 1
+        if com_journal:
+            with open(self.journal_path, 'w', encoding='utf-8') as f:
+                json.dump({'renames': pendentes, 'removes': remocoes}, f)
+                f.flush()
+                os.fsync(f.fileno())
+        
+        for temp_path, filepath in pendentes:
+            os.replace(temp_path, filepath)
+        for filepath in remocoes:
+            os.unlink(filepath)
+        
+        if com_journal:
+            os.unlink(self.journal_path)
+        
+        # IDs gravados fora do alocador (save_data) não podem ser entregues de novo
+        for tipo, df in tables.items():
+            if 'id' in df.columns and len(df) > 0:
+                self._raise_sequence(tipo, pd.to_numeric(df['id'], errors='coerce').max())
+    
+    def recover(self):
+        """
+        Completa um commit interrompido e remove temporários órfãos
+        
+        Roda sob o lock de escrita: journal e temporários de um commit em
+        andamento em outro processo não são tocados.
+        """
+        with self.write_lock():
+            self._recover()
+    
+    def _recover(self):
+        if os.path.exists(self.journal_path):
+            try:
+                with open(self.journal_path, encoding='utf-8') as f:
+                    journal = json.load(f)
+            except (OSError, ValueError):
+                journal = {}
+            for temp_path, filepath in journal.get('renames', []):
+                if os.path.exists(temp_path):
+                    os.replace(temp_path, filepath)
+            for filepath in journal.get('removes', []):
+                if os.path.exists(filepath):
+                    os.unlink(filepath)
+            os.unlink(self.journal_path)
+        
+        # Temporários sem journal pertencem a commits que não chegaram a valer
+        if os.path.isdir(self.data_dir):
+            prefixos = tuple(f'.{os.path.basename(f)}.' for f in self.files.values())
+            for nome in os.listdir(self.data_dir):
+                if nome.startswith(prefixos) and nome.endswith('.tmp'):
+                    os.unlink(os.path.join(self.data_dir, nome))
+            for tipo in PARTITIONED_TABLES:
+                diretorio = self.partition_dir(tipo)
+                if os.path.isdir(diretorio):
+                    for nome in os.listdir(diretorio):
+                        if nome.startswith('.') and nome.endswith('.tmp'):
+                            os.unlink(os.path.join(diretorio, nome))
+            
+            # Temporários de sequência só são órfãos fora do lock (outro
+            # processo pode estar gravando a sequência agora)
+            with self._sequences_locked():
+                for nome in os.listdir(self.data_dir):
+                    if nome.startswith(f'{SEQUENCES_FILENAME}.') and nome.endswith('.tmp'):
+                        os.unlink(os.path.join(self.data_dir, nome))
+    
+    def migrate_partitions(self):
+        """
+        Converte o CSV único de uma tabela particionada (attendance.csv) em partições mensais
+        
+        As partições são gravadas no diretório da tabela e o arquivo antigo é
+        mantido como attendance.csv.migrated; até o rename, o CSV único continua
+        valendo (uma queda no meio apenas exige rodar a migração de novo).
+        
+        Returns:
+            list: Tabelas migradas
+        """
+        migradas = []
+        with self.write_lock():
+            for tipo in PARTITIONED_TABLES:
+                legado = self.files.get(tipo)
+                if legado is None or not os.path.exists(legado):
+                    continue
+                try:
+                    df = pd.read_csv(legado, dtype=str, keep_default_na=False)
+                except pd.errors.EmptyDataError:
+                    df = None
+                if df is not None:
+                    pendentes = []
+                    try:
+                        remocoes = self._write_partition_temps(tipo, df, pendentes)
+                    except BaseException:
+                        for temp_path, _ in pendentes:
+                            os.unlink(temp_path)
+                        raise
+                    for temp_path, filepath in pendentes:
+                        os.replace(temp_path, filepath)
+                    for filepath in remocoes:
+                        os.unlink(filepath)
+                os.replace(legado, legado + MIGRATED_SUFFIX)
+                migradas.append(tipo)
+        return migradas
+    
+    def _write_partition_temps(self, tipo, df, pendentes):
+        """
+        Grava cabeçalho e partições de uma tabela particionada em temporários
+        
+        Apenas os arquivos cujo conteúdo muda são regravados: atualizar ou
+        excluir um registro regrava só a partição do mês dele. Os pares
+        (temporário, destino) são acrescentados a pendentes.
+        
+        Returns:
+            list: Partições existentes que deixam de ter registros (a remover)
+        """
+        diretorio = self.partition_dir(tipo)
+        os.makedirs(diretorio, exist_ok=True)
+        
+        chaves = partition_keys(df, PARTITIONED_TABLES[tipo])
+        arquivos = [(os.path.join(diretorio, PARTITION_HEADER), df.iloc[0:0])] + \
+            [(self.partition_path(tipo, particao), grupo) for particao, grupo in df.groupby(chaves, sort=True)]
+        for filepath, grupo in arquivos:
+            conteudo = grupo.to_csv(index=False).encode('utf-8')
+            if not _same_content(filepath, conteudo):
+                pendentes.append((self._write_temp_file(filepath, conteudo), filepath))
+        
+        novas = set(chaves)
+        return [self.partition_path(tipo, p) for p in self.partitions(tipo) if p not in novas]
+    
+    def _load_partitions(self, tipo, particoes, columns=None):
+        """
+        Lê e junta as partições indicadas, com as colunas do cabeçalho (ou só as pedidas)
+        
+        As partições são juntadas em ordem de mês ('sem_data' por último), cada
+        uma na ordem do arquivo: a mesma ordem de load_page().
+        """
+        try:
+            header = list(pd.read_csv(os.path.join(self.partition_dir(tipo), PARTITION_HEADER),
+                                      dtype=str, nrows=0).columns)
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            return None
+        usecols = _usecols(columns)
+        columns = [c for c in header if usecols is None or usecols(c)]
+        
+        frames = []
+        for particao in particoes:
+            try:
+                frames.append(pd.read_csv(self.partition_path(tipo, particao), dtype=str,
+                                          keep_default_na=False, usecols=usecols))
+            except (FileNotFoundError, pd.errors.EmptyDataError):
+                continue
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        
+        df = pd.concat(frames, ignore_index=True)
+        if list(df.columns) != columns:
+            df = df.reindex(columns=columns, fill_value='')
+        return df
+    
+    def load(self, tipo, columns=None):
+        """
+        Lê a tabela como strings; retorna None se o arquivo não existir ou estiver vazio
+        
+        Com columns, apenas essas colunas são interpretadas (usecols); colunas
+        que não existem na tabela são ignoradas.
+        """
+        with self.read_lock():
+            if self.is_partitioned(tipo):
+                return self._load_partitions(tipo, self.partitions(tipo), columns)
+            try:
+                return pd.read_csv(self.files[tipo], dtype=str, keep_default_na=False, usecols=_usecols(columns))
+            except (FileNotFoundError, pd.errors.EmptyDataError):
+                return None
+    
+    def load_range(self, tipo, inicio, fim):
+        """
+        Lê os registros de uma tabela particionada com data entre inicio e fim
+        
+        Apenas as partições mensais do intervalo são abertas (no CSV único
+        ainda não migrado, a tabela inteira é lida e filtrada).
+        
+        Args:
+            tipo: Tipo particionado (PARTITIONED_TABLES)
+            inicio: Data inicial 'AAAA-MM-DD' (inclusive)
+            fim: Data final 'AAAA-MM-DD' (inclusive)
+        
+        Returns:
+            DataFrame (strings) ou None se a tabela não existir
+        """
+        if not self.is_partitioned(tipo):
+            df = self.load(tipo)
+            return filter_date_range(df, PARTITIONED_TABLES[tipo], inicio, fim) if df is not None else None
+        with self.read_lock():
+            particoes = [p for p in self.partitions(tipo)
+                         if p != PARTITION_UNDATED and inicio[:7] <= p <= fim[:7]]
+            df = self._load_partitions(tipo, particoes)
+        if df is None:
+            return None
+        return filter_date_range(df, PARTITIONED_TABLES[tipo], inicio, fim)
+    
+    def load_page(self, tipo, offset, limit):
+        """
+        Lê apenas os registros [offset, offset + limit) da tabela, na ordem de load()
+        
+        Usa o RowOffsetIndex do arquivo: depois da primeira varredura, o custo
+        é proporcional à página e não ao tamanho da tabela.
+        
+        Returns:
+            tuple ou None: (DataFrame de strings, total de registros) ou None
+                           se a tabela não existir
+        """
+        with self.read_lock():
+            return self._load_page(tipo, offset, limit)
+    
+    def _load_page(self, tipo, offset, limit):
+        if not self.exists(tipo):
+            return None
+        if self.is_partitioned(tipo):
+            return self._load_page_partitioned(tipo, offset, limit)
+        
+        filepath = self.files[tipo]
+        indice = self._row_indexes.setdefault(filepath, RowOffsetIndex(filepath))
+        try:
+            indice.refresh()
+        except FileNotFoundError:
+            self._row_indexes.pop(filepath, None)
+            return None
+        return indice.read(offset, offset + limit), len(indice)
+    
+    def _load_page_partitioned(self, tipo, offset, limit):
+        """
+        Página de uma tabela particionada na ordem de load() (partições em ordem de mês)
+        
+        Cada partição tem o seu RowOffsetIndex: as anteriores à página só
+        contribuem com a contagem de linhas e apenas as linhas da página são lidas.
+        """
+        columns = list(pd.read_csv(os.path.join(self.partition_dir(tipo), PARTITION_HEADER),
+                                   dtype=str, nrows=0).columns)
+        frames = []
+        total = 0
+        for particao in self.partitions(tipo):
+            filepath = self.partition_path(tipo, particao)
+            indice = self._row_indexes.setdefault(filepath, RowOffsetIndex(filepath))
+            try:
+                indice.refresh()
+            except FileNotFoundError:
+                self._row_indexes.pop(filepath, None)
+                continue
+            inicio = max(offset - total, 0)
+            fim = min(offset + limit - total, len(indice))
+            if inicio < fim:
+                frames.append(indice.read(inicio, fim))
+            total += len(indice)
+        
+        if not frames:
+            return pd.DataFrame(columns=columns), total
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        if list(df.columns) != columns:
+            df = df.reindex(columns=columns, fill_value='')
+        return df, total
+    
+    def write_table(self, tipo, df):
+        """Reescreve a tabela de forma atômica (arquivo temporário + rename)"""
+        self.commit_tables({tipo: df})
+    
+    @staticmethod
+    def _append_text(filepath, texto):
+        # Garante que a última linha do arquivo termina com quebra de linha
+        prefixo = ''
+        if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
+            with open(filepath, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) not in (b'\n', b'\r'):
+                    prefixo = '\n'
+        
+        with open(filepath, 'a', encoding='utf-8', newline='') as f:
+            f.write(prefixo + texto)
+    
+    def append_rows(self, tipo, rows, columns):
+        """Anexa registros ao final do arquivo e retorna as linhas como lidas do CSV"""
+        texto, df = serialize_rows(rows, columns)
+        
+        with self.write_lock():
+            if not self.is_partitioned(tipo):
+                self._append_text(self.files[tipo], texto)
+                return df
+            
+            # Cada registro vai para a partição do seu mês (criada com cabeçalho)
+            chaves = partition_keys(df, PARTITIONED_TABLES[tipo])
+            for particao, grupo in df.groupby(chaves, sort=False):
+                filepath = self.partition_path(tipo, particao)
+                self._append_text(filepath, grupo.to_csv(index=False, header=not os.path.exists(filepath)))
+        return df
+    
+    def sync(self, tipo):
+        """Força a gravação física do(s) arquivo(s) da tabela (fsync)"""
+        for filepath in self._table_files(tipo):
+            fd = os.open(filepath, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+    
+    @contextmanager
+    def transaction(self):
+        yield
+    
+    def export_csv(self, tipo, dest_path):
+        if self.is_partitioned(tipo):
+            df = self.load(tipo)
+            if df is not None:
+                df.to_csv(dest_path, index=False)
+            return
+        with self.read_lock():
+            shutil.copy2(self.files[tipo], dest_path)
+    
+    def import_csv(self, tipo, src_path):
+        with self.write_lock():
+            if self.is_partitioned(tipo):
+                self._commit_tables({tipo: pd.read_csv(src_path, dtype=str, keep_default_na=False)})
+                return
+            shutil.copy2(src_path, self.files[tipo])
+            self._raise_sequence(tipo, self._max_id(tipo))
+    
+    def write_to_zip(self, zipf, tipo, arcname):
+        # Tabelas particionadas entram no backup como um único CSV
+        if self.is_partitioned(tipo):
+            df = self.load(tipo)
+            if df is not None:
+                zipf.writestr(arcname, df.to_csv(index=False))
+        elif self.exists(tipo):
+            with self.read_lock():
+                zipf.write(self.files[tipo], arcname)
+    
+    @contextmanager
+    def _sequences_locked(self):
+        """Lock das sequências entre threads e entre processos"""
+        with self._sequences_lock, file_lock(os.path.join(self.data_dir, SEQUENCES_LOCK_FILENAME)):
+            yield
+    
+    def _read_sequences(self):
+        try:
+            with open(self.sequences_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    def _write_sequences(self, sequences):
+        fd, temp_path = tempfile.mkstemp(prefix=f'{SEQUENCES_FILENAME}.', suffix='.tmp', dir=self.data_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(sequences, f)
+            os.replace(temp_path, self.sequences_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+    
+    def _max_id(self, tipo):
+        """Maior ID gravado no arquivo (lê apenas a coluna id)"""
+        try:
+            ids = pd.concat([
+                pd.read_csv(filepath, usecols=['id'], dtype=str, keep_default_na=False)['id']
+                for filepath in self._table_files(tipo)
+            ])
+        except (FileNotFoundError, pd.errors.EmptyDataError, ValueError):
+            return 0
+        maximo = pd.to_numeric(ids, errors='coerce').max()
+        return int(maximo) if pd.notna(maximo) else 0
+    
+    def _raise_sequence(self, tipo, maximo):
+        """Garante que a sequência (se já existir) não fique abaixo de maximo"""
+        if pd.isna(maximo):
+            return
+        with self._sequences_locked():
+            sequences = self._read_sequences()
+            if tipo in sequences and sequences[tipo] < int(maximo):
+                sequences[tipo] = int(maximo)
+                self._write_sequences(sequences)
+    
+    def last_id(self, tipo):
+        """Último ID já entregue: o maior entre a sequência e o maior ID gravado"""
+        return max(self._read_sequences().get(tipo, 0), self._max_id(tipo))
+    
+    def allocate_ids(self, tipo, quantidade=1):
+        """
+        Reserva IDs consecutivos na sequência da tabela
+        
+        A sequência fica em data/.sequences.json; na primeira alocação de uma
+        tabela ela é semeada com o maior ID do arquivo.
+        
+        Args:
+            tipo: Tipo de dado
+            quantidade: Número de IDs a reservar
+        
+        Returns:
+            range: IDs reservados
+        """
+        with self._sequences_locked():
+            sequences = self._read_sequences()
+            ultimo = sequences.get(tipo)
+            if ultimo is None:
+                ultimo = self._max_id(tipo)
+            sequences[tipo] = ultimo + quantidade
+            self._write_sequences(sequences)
+        return range(ultimo + 1, ultimo + quantidade + 1)
+
+
+class SQLiteStorage:
+    """
+    Armazena todas as tabelas em um banco SQLite
+    
+    Cada tabela guarda as colunas como TEXT (mesmo conteúdo do CSV), exceto
+    id/aluno_id, que são INTEGER; id, aluno_id, cpf e data são indexados.
+    Escritas são por linha e transações usam o mecanismo nativo do SQLite.
+    """
+    name = 'sqlite'
+    transactional = True
+    row_writes = True
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        # Uma conexão por thread (sqlite3 não compartilha conexões entre threads)
+        self._local = threading.local()
+        self._write_lock = ReentrantFileLock(
+            os.path.join(os.path.dirname(db_path) or '.', WRITE_LOCK_FILENAME)
+        )
+    
+    def write_lock(self):
+        """
+        Seção de escrita exclusiva entre processos (e threads)
+        
+        Cada escrita já é atômica no SQLite; o lock serializa a leitura +
+        alteração + atualização do cache feitas pelo DataManager. Não é uma
+        transação: rollbacks continuam restritos a execute_transaction.
+        """
+        return self._write_lock.hold()
+    
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            # Contador de versão por tabela, usado para validar o cache
+            conn.execute(f'CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} '
+                         '(tipo TEXT PRIMARY KEY, version INTEGER NOT NULL)')
+            # Último ID entregue por tabela
+            conn.execute(f'CREATE TABLE IF NOT EXISTS {SEQUENCES_TABLE} '
+                         '(tipo TEXT PRIMARY KEY, ultimo INTEGER NOT NULL)')
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+    
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+    
+    def recover(self):
+        """O SQLite recupera transações interrompidas por conta própria"""
+        pass
+    
+    @staticmethod
+    def _quote(nome):
+        return '"' + str(nome).replace('"', '""') + '"'
+    
+    @staticmethod
+    def _to_sql_value(coluna, valor):
+        valor = text_value(coluna, valor)
+        if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+            return None if coluna in INTEGER_COLUMNS else ''
+        if coluna in INTEGER_COLUMNS:
+            try:
+                return int(valor)
+            except (TypeError, ValueError):
+                return 0
+        return str(valor)
+    
+    def _columns(self, tipo):
+        conn = self._connection()
+        return [row[1] for row in conn.execute(f'PRAGMA table_info({self._quote(tipo)})')]
+    
+    def signature(self, tipo):
+        """
+        Versão atual da tabela (incrementada a cada escrita, inclusive de outro processo)
+        
+        Returns:
+            tuple: (versão,)
+        """
+        row = self._connection().execute(
+            f'SELECT version FROM {VERSIONS_TABLE} WHERE tipo = ?', (tipo,)
+        ).fetchone()
+        return (row[0] if row else 0,)
+    
+    def _bump_version(self, tipo):
+        self._connection().execute(
+            f'INSERT INTO {VERSIONS_TABLE} (tipo, version) VALUES (?, 1) '
+            'ON CONFLICT(tipo) DO UPDATE SET version = version + 1', (tipo,)
+        )
+    
+    def exists(self, tipo):
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (tipo,)
+        ).fetchone()
+        return row is not None
+    
+    def is_partitioned(self, tipo):
+        """Tabelas do SQLite não são particionadas (load_range usa o índice da coluna de data)"""
+        return False
+    
+    @contextmanager
+    def transaction(self):
+        """Transação nativa; transações aninhadas participam da externa"""
+        conn = self._connection()
+        if self._local.depth > 0:
+            self._local.depth += 1
+            try:
+                yield
+            finally:
+                self._local.depth -= 1
+            return
+        
+        conn.execute('BEGIN IMMEDIATE')
+        self._local.depth = 1
+        try:
+            yield
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            self._local.depth = 0
+    
+    def load(self, tipo, columns=None):
+        """Lê a tabela (ou só as colunas pedidas que existirem) como strings; None se não existir"""
+        if not self.exists(tipo):
+            return None
+        conn = self._connection()
+        selecao = '*'
+        if columns is not None:
+            existentes = [c for c in self._columns(tipo) if c in set(columns)]
+            if not existentes:
+                return pd.DataFrame()
+            selecao = ', '.join(self._quote(c) for c in existentes)
+        df = pd.read_sql_query(f'SELECT {selecao} FROM {self._quote(tipo)} ORDER BY rowid', conn)
+        return df.fillna('').astype(str)
+    
+    def load_range(self, tipo, inicio, fim):
+        """Lê os registros com data entre inicio e fim pelo índice da coluna de data"""
+        if not self.exists(tipo):
+            return None
+        coluna = self._quote(PARTITIONED_TABLES[tipo])
+        df = pd.read_sql_query(
+            f'SELECT * FROM {self._quote(tipo)} WHERE {coluna} >= ? AND {coluna} <= ? ORDER BY rowid',
+            self._connection(), params=(inicio, fim)
+        )
+        return df.fillna('').astype(str)
+    
+    def load_page(self, tipo, offset, limit):
+        """Registros [offset, offset + limit) em ordem de rowid (LIMIT/OFFSET) e o total"""
+        if not self.exists(tipo):
+            return None
+        conn = self._connection()
+        total = conn.execute(f'SELECT COUNT(*) FROM {self._quote(tipo)}').fetchone()[0]
+        df = pd.read_sql_query(f'SELECT * FROM {self._quote(tipo)} ORDER BY rowid LIMIT ? OFFSET ?',
+                               conn, params=(limit, offset))
+        return df.fillna('').astype(str), total
+    
+    def _create_table(self, tipo, columns):
+        conn = self._connection()
+        definicoes = []
+        for coluna in columns:
+            if coluna in INTEGER_COLUMNS:
+                definicoes.append(f'{self._quote(coluna)} INTEGER')
+            else:
+                definicoes.append(f'{self._quote(coluna)} TEXT')
+        conn.execute(f'CREATE TABLE {self._quote(tipo)} ({", ".join(definicoes)})')
+        for coluna in INDEXED_COLUMNS:
+            if coluna in columns:
+                conn.execute(
+                    f'CREATE INDEX {self._quote(f"idx_{tipo}_{coluna}")} '
+                    f'ON {self._quote(tipo)} ({self._quote(coluna)})'
+                )
+    
+    def _insert(self, tipo, columns, registros):
+        conn = self._connection()
+        colunas_sql = ', '.join(self._quote(c) for c in columns)
+        marcadores = ', '.join('?' for _ in columns)
+        valores = [
+            tuple(self._to_sql_value(c, registro.get(c)) for c in columns)
+            for registro in registros
+        ]
+        conn.executemany(
+            f'INSERT INTO {self._quote(tipo)} ({colunas_sql}) VALUES ({marcadores})', valores
+        )
+    
+    def write_table(self, tipo, df):
+        """Substitui a tabela inteira pelo conteúdo do DataFrame"""
+        df = text_frame(df)
+        columns = [str(c) for c in df.columns]
+        with self.transaction():
+            conn = self._connection()
+            conn.execute(f'DROP TABLE IF EXISTS {self._quote(tipo)}')
+            self._create_table(tipo, columns)
+            self._insert(tipo, columns, df.to_dict('records'))
+            self._bump_version(tipo)
+    
+    def append_rows(self, tipo, rows, columns):
+        """Insere registros e retorna as linhas com os mesmos valores do backend CSV"""
+        _, df = serialize_rows(rows, columns)
+        with self.transaction():
+            self._insert(tipo, columns, df.to_dict('records'))
+            self._bump_version(tipo)
+        return df
+    
+    def update_row(self, tipo, record_id, changes):
+        colunas = [c for c in changes if c in self._columns(tipo)]
+        if not colunas:
+            return
+        atribuicoes = ', '.join(f'{self._quote(c)} = ?' for c in colunas)
+        valores = [self._to_sql_value(c, changes[c]) for c in colunas]
+        with self.transaction():
+            self._connection().execute(
+                f'UPDATE {self._quote(tipo)} SET {atribuicoes} WHERE "id" = ?',
+                valores + [int(record_id)]
+            )
+            self._bump_version(tipo)
+    
+    def delete_row(self, tipo, record_id):
+        with self.transaction():
+            self._connection().execute(
+                f'DELETE FROM {self._quote(tipo)} WHERE "id" = ?', (int(record_id),)
+            )
+            self._bump_version(tipo)
+    
+    def sync(self, tipo):
+        """Transfere o WAL para o banco com sincronização completa (synchronous=NORMAL não faz fsync por commit)"""
+        self._connection().execute('PRAGMA wal_checkpoint(FULL)')
+    
+    def export_csv(self, tipo, dest_path):
+        df = self.load(tipo)
+        if df is not None:
+            df.to_csv(dest_path, index=False)
+    
+    def import_csv(self, tipo, src_path):
+        df = pd.read_csv(src_path, dtype=str, keep_default_na=False)
+        self.write_table(tipo, df)
+    
+    def write_to_zip(self, zipf, tipo, arcname):
+        df = self.load(tipo)
+        if df is not None:
+            zipf.writestr(arcname, df.to_csv(index=False))
+    
+    def allocate_ids(self, tipo, quantidade=1):
+        """
+        Reserva IDs consecutivos na sequência da tabela
+        
+        A sequência fica na tabela _sequences e é atualizada em uma transação
+        BEGIN IMMEDIATE (exclusiva entre processos). O MAX(id) usa o índice da
+        coluna, então IDs gravados fora do alocador também são respeitados.
+        
+        Returns:
+            range: IDs reservados
+        """
+        with self.transaction():
+            conn = self._connection()
+            row = conn.execute(f'SELECT ultimo FROM {SEQUENCES_TABLE} WHERE tipo = ?', (tipo,)).fetchone()
+            ultimo = row[0] if row else 0
+            if self.exists(tipo) and 'id' in self._columns(tipo):
+                maximo = conn.execute(f'SELECT MAX("id") FROM {self._quote(tipo)}').fetchone()[0]
+                ultimo = max(ultimo, maximo or 0)
+            conn.execute(
+                f'INSERT INTO {SEQUENCES_TABLE} (tipo, ultimo) VALUES (?, ?) '
+                'ON CONFLICT(tipo) DO UPDATE SET ultimo = excluded.ultimo', (tipo, ultimo + quantidade)
+            )
+        return range(ultimo + 1, ultimo + quantidade + 1)
+    
+    def seed_sequence(self, tipo, ultimo):
+        """Garante que a sequência da tabela não fique abaixo de ultimo (migração)"""
+        with self.transaction():
+            self._connection().execute(
+                f'INSERT INTO {SEQUENCES_TABLE} (tipo, ultimo) VALUES (?, ?) '
+                'ON CONFLICT(tipo) DO UPDATE SET ultimo = MAX(ultimo, excluded.ultimo)', (tipo, int(ultimo))
+            )
+
+
+def create_storage(backend, data_dir, files):
+    """
+    Cria o engine de armazenamento
+    
+    Args:
+        backend: 'csv' ou 'sqlite'
+        data_dir: Diretório de dados
+        files: Mapeamento tipo -> caminho do CSV
+    
+    Returns:
+        CSVStorage ou SQLiteStorage
+    """
+    if backend == 'csv':
+        return CSVStorage(files, data_dir)
+    if backend == 'sqlite':
+        return SQLiteStorage(os.path.join(data_dir, 'matricula.db'))
+    raise ValueError(f"Backend de armazenamento inválido: {backend}")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Testes do modo de inserção append-only do DataManager
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_manager import DataManager
+
+def test_append_only_insert():
+    """Inserções anexam linhas ao CSV sem reescrever o arquivo"""
+    print("="*70)
+    print("TESTE: INSERÇÃO APPEND-ONLY")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        dm = DataManager(data_dir=os.path.join(temp_dir, 'data'))
+        
+        aluno_id = dm.add_record('cadastro', {
+            'nome_completo': 'Ana Append',
+            'data_nascimento': '2010-01-01',
+            'status': 'Ativo',
+            'cpf': '123.456.789-01'
+        })
+        
+        # Várias presenças: cada uma deve apenas anexar uma linha (partição de março/2026,
+        # criada pela primeira presença do mês)
+        attendance_file = dm._storage.partition_path('attendance', '2026-03')
+        for i in range(5):
+            tamanho_antes = os.path.getsize(attendance_file) if i > 0 else 0
+            conteudo_antes = b''
+            if i > 0:
+                with open(attendance_file, 'rb') as f:
+                    conteudo_antes = f.read()
+            
+            dm.add_record('attendance', {
+                'aluno_id': aluno_id,
+                'data': f'2026-03-0{i + 1}',
+                'hora': '07:30:00',
+                'observacoes': 'Entrada, "portão" 2'
+            })
+            
+            with open(attendance_file, 'rb') as f:
+                conteudo_depois = f.read()
+            assert conteudo_depois.startswith(conteudo_antes)
+            assert os.path.getsize(attendance_file) > tamanho_antes
+        
+        print(f"✓ {dm._appended_rows['attendance']} linhas anexadas sem reescrita")
+        
+        # Cache e índices atualizados no lugar
+        assert dm.get_record('cadastro', aluno_id)['nome_completo'] == 'Ana Append'
+        assert dm.get_record_by_cpf('12345678901')['nome_completo'] == 'Ana Append'
+        assert len(dm.get_data('attendance')) == 5
+        
+        # Um novo DataManager lê exatamente o mesmo conteúdo do disco
+        df_memoria = dm.get_data('attendance')
+        df_disco = DataManager(data_dir=dm.data_dir).get_data('attendance')
+        assert df_memoria.reset_index(drop=True).equals(df_disco)
+        print("✓ Conteúdo em cache idêntico ao conteúdo do arquivo")
+        
+        # Compactação reescreve o arquivo e zera o contador
+        assert 'attendance' in dm.compact()
+        assert dm._appended_rows['attendance'] == 0
+        assert len(dm.get_data('attendance')) == 5
+        print("✓ Compactação explícita reescreveu o arquivo")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Inserção Append-Only: PASSOU")
+
+if __name__ == "__main__":
+    test_append_only_insert()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Testes da fachada asyncio do DataManager (executor limitado e single-flight)
+"""
+
+import sys
+import os
+import time
+import shutil
+import asyncio
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_manager import DataManager
+from async_data_manager import AsyncDataManager
+
+def _contar_chamadas(dm, metodo, atraso=0.1):
+    """Substitui dm.metodo por uma versão lenta que conta as chamadas"""
+    chamadas = []
+    original = getattr(dm, metodo)
+    def lento(*args, **kwargs):
+        chamadas.append(threading.current_thread().name)
+        time.sleep(atraso)
+        return original(*args, **kwargs)
+    setattr(dm, metodo, lento)
+    return chamadas
+
+def test_async_reads_and_writes():
+    """Leituras e escritas awaitable, fora da thread do event loop"""
+    print("="*70)
+    print("TESTE: ASYNC DATA MANAGER")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        async def cenario():
+            async with AsyncDataManager(data_dir=os.path.join(temp_dir, 'data'), max_workers=2) as adm:
+                ids = [await adm.add_record('cadastro', {'nome_completo': f'Aluno {i}',
+                                                         'data_nascimento': '2012-01-01', 'status': 'Ativo'})
+                       for i in range(1, 6)]
+                assert ids == [1, 2, 3, 4, 5]
+                try:
+                    await adm.add_record('cadastro', {'nome_completo': 'Sem data'})
+                    assert False, "validação deveria falhar"
+                except ValueError:
+                    pass
+                
+                assert len(await adm.get_data('cadastro')) == 5
+                assert (await adm.get_record('cadastro', 3))['nome_completo'] == 'Aluno 3'
+                consulta = adm.query('cadastro').where('nome_completo', 'contains', 'Aluno').order_by('id', desc=True)
+                assert (await consulta.execute())['id'].tolist() == [5, 4, 3, 2, 1]
+                assert await consulta.count() == 5 and (await consulta.first())['id'] == 5
+                assert (await adm.query('cadastro').paginate(2, 2))['data']['id'].tolist() == [3, 4]
+                
+                assert await adm.update_record('cadastro', 2, {'nome_completo': 'Renomeado'})
+                assert (await adm.get_record('cadastro', 2))['nome_completo'] == 'Renomeado'
+                
+                backup = await adm.create_backup(os.path.join(temp_dir, 'backups', 'b.zip'))
+                assert os.path.exists(backup)
+                
+                # O event loop não bloqueia durante uma leitura lenta
+                _contar_chamadas(adm.data_manager, 'get_data', atraso=0.3)
+                ticks = 0
+                leitura = asyncio.ensure_future(adm.get_data('pei'))
+                while not leitura.done():
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+                assert ticks > 5
+        
+        asyncio.run(cenario())
+        print("✓ get_data/get_record/query/add/update/create_backup awaitable sem bloquear o loop")
+        
+        # close grava o buffer do write-behind e encerra a thread de flush
+        async def fechar():
+            adm = AsyncDataManager(data_dir=os.path.join(temp_dir, 'wb'), write_behind=['attendance'],
+                                   flush_interval_ms=60000)
+            await adm.add_record('attendance', {'aluno_id': 1, 'data': '2026-03-02', 'hora': '07:30:00'})
+            flusher = adm.data_manager._flusher
+            assert flusher.is_alive()
+            await adm.close()
+            flusher.join(timeout=5)
+            assert not flusher.is_alive()
+            assert len(DataManager(data_dir=os.path.join(temp_dir, 'wb')).get_data('attendance')) == 1
+        
+        asyncio.run(fechar())
+        print("✓ close grava o write-behind e encerra a thread de flush")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def test_single_flight_reads():
+    """Leituras idênticas simultâneas viram uma só; escritas não reaproveitam leituras antigas"""
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        dm = DataManager(data_dir=os.path.join(temp_dir, 'data'))
+        dm.add_records('cadastro', [
+            {'nome_completo': f'Aluno {i}', 'data_nascimento': '2012-01-01', 'status': 'Ativo'}
+            for i in range(1, 11)
+        ])
+        
+        async def cenario():
+            adm = AsyncDataManager(dm, max_workers=4)
+            chamadas = _contar_chamadas(dm, 'get_data')
+            
+            # 20 pedidos iguais: uma leitura; cada chamador recebe a sua cópia
+            resultados = await asyncio.gather(*[adm.get_data('cadastro') for _ in range(20)])
+            assert len(chamadas) == 1 and adm.coalesced == 19
+            resultados[0]['nome_completo'] = 'Alterado'
+            assert all(r['nome_completo'].tolist()[0] == 'Aluno 1' for r in resultados[1:])
+            
+            # Pedidos diferentes (outras colunas, outra tabela) não se misturam
+            await asyncio.gather(adm.get_data('cadastro', columns=['id']), adm.get_data('pei'),
+                                 adm.get_data('cadastro', columns=['id']))
+            assert len(chamadas) == 3 and adm.coalesced == 20
+            
+            # Leitura que começou antes de uma escrita não serve a quem pede depois dela
+            antiga = asyncio.ensure_future(adm.get_data('cadastro'))
+            await asyncio.sleep(0.01)
+            await adm.add_record('cadastro', {'nome_completo': 'Aluno Novo',
+                                              'data_nascimento': '2012-01-01', 'status': 'Ativo'})
+            nova = await adm.get_data('cadastro')
+            await antiga
+            assert len(nova) == 11 and len(chamadas) == 5
+            
+            # Consultas idênticas também são unificadas
+            consultas = [adm.query('cadastro').where('status', '=', 'Ativo').limit(3).execute() for _ in range(5)]
+            assert [len(r) for r in await asyncio.gather(*consultas)] == [3] * 5
+            assert adm.coalesced == 20 + 4
+            await adm.close()
+        
+        asyncio.run(cenario())
+        print("✓ Single-flight: leituras iguais unificadas, separadas por escritas")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste do AsyncDataManager: PASSOU")
+
+if __name__ == "__main__":
+    test_async_reads_and_writes()
+    test_single_flight_reads()
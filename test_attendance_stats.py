@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Testes dos agregados de presença (contagens por dia/aluno/turno e frequência)
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_manager import DataManager
+from attendance_stats import AttendanceAggregates
+
+def test_aggregates_match_full_scan():
+    """Agregados iguais ao groupby sobre os registros, mantidos a cada escrita"""
+    print("="*70)
+    print("TESTE: AGREGADOS DE PRESENÇA")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        for backend in ['csv', 'sqlite']:
+            data_dir = os.path.join(temp_dir, backend, 'data')
+            dm = DataManager(data_dir=data_dir, backend=backend)
+            dm.add_records('cadastro', [
+                {'nome_completo': f'Aluno {i}', 'data_nascimento': '2012-01-01', 'status': 'Ativo',
+                 'turno': 'Manhã' if i % 2 else 'Tarde', 'ano_escolar': f'{6 + i % 3}º Ano'}
+                for i in range(1, 7)
+            ])
+            dm.add_records('attendance', [
+                {'aluno_id': 1 + i % 6, 'data': f'2026-03-{1 + i % 9:02d}', 'hora': '07:00'} for i in range(40)
+            ])
+            
+            def conferir():
+                df = dm.get_data('attendance')
+                df = df[(df['data'] >= '2026-03-02') & (df['data'] <= '2026-03-07')]
+                stats = dm.get_attendance_stats('2026-03-02', '2026-03-07', top=3)
+                assert stats['total'] == len(df)
+                assert stats['by_day'].to_dict() == df.groupby('data').size().to_dict()
+                assert stats['school_days'] == df['data'].nunique()
+                contagem = df['aluno_id'].value_counts()
+                assert sorted(stats['by_student'].tolist(), reverse=True) == contagem.head(3).tolist()
+                cadastro = dm.get_data('cadastro').set_index('id')
+                for campo, chave in [('turno', 'by_shift'), ('ano_escolar', 'by_class')]:
+                    grupos = df['aluno_id'].map(cadastro[campo].astype(str)).value_counts()
+                    assert stats[chave].to_dict() == grupos.to_dict()
+            
+            conferir()
+            
+            # Agregados construídos uma vez e atualizados pelas escritas seguintes
+            agregados = dm._indexes['attendance']['presencas']
+            novo_id = dm.add_record('attendance', {'aluno_id': 2, 'data': '2026-03-05', 'hora': '08:00'})
+            dm.update_record('attendance', 1, {'data': '2026-03-06'})
+            dm.delete_record('attendance', 2)
+            assert dm._indexes['attendance']['presencas'] is agregados
+            conferir()
+            
+            dm.delete_record('attendance', novo_id)
+            conferir()
+            
+            # Mudança de turno/turma move as presenças do aluno sem reconstruir os agregados
+            dm.update_record('cadastro', 1, {'turno': 'Noite', 'ano_escolar': '9º Ano'})
+            assert dm._indexes['attendance']['presencas'] is agregados
+            assert 'Noite' in dm.get_attendance_stats()['by_shift']
+            conferir()
+            assert dm.get_attendance_stats(aluno_id=1)['by_shift'].index.tolist() == ['Noite']
+            assert dm.get_attendance_stats(aluno_id=2)['by_student'].index.tolist() == [2]
+            print(f"✓ Backend {backend}: contagens iguais ao groupby após inserir, atualizar e excluir")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Agregados de Presença: PASSOU")
+
+def test_student_frequency_and_streaks():
+    """Taxa de frequência e sequências de faltas sobre os dias letivos"""
+    agregados = AttendanceAggregates()
+    for data in ['2026-03-02', '2026-03-03', '2026-03-04', '2026-03-05', '2026-03-06', '2026-03-09']:
+        agregados.add(1, data)
+    for data in ['2026-03-02', '2026-03-06']:
+        agregados.add(2, data)
+    agregados.add(2, '2026-03-06')
+    agregados.add(3, '')
+    
+    assert len(agregados) == 9
+    assert agregados.frequency(2) == {
+        'present_days': 2, 'school_days': 6, 'rate': 2 / 6 * 100,
+        'current_absence_streak': 1, 'longest_absence_streak': 3
+    }
+    assert agregados.frequency(2, '2026-03-03', '2026-03-06')['present_days'] == 1
+    assert agregados.frequency(3)['current_absence_streak'] == 6
+    assert agregados.by_student(top=1) == {1: 6}
+    assert agregados.by_day('2026-03-06', aluno_id=2) == {'2026-03-06': 2}
+    
+    # Remoção do último registro de um dia tira o dia dos dias letivos
+    agregados.remove(1, '2026-03-09')
+    agregados.remove(1, '2026-03-09')
+    assert agregados.school_days('2026-03-06') == ['2026-03-06']
+    assert agregados.frequency(2)['current_absence_streak'] == 0
+    assert len(agregados) == 8
+    print("✓ Frequência e sequências de faltas")
+    
+    # Totais por grupo acompanham inserções, exclusões e mudanças de grupo
+    agregados.set_group('turno', 1, 'Manhã')
+    agregados.set_group('turno', 2, 'Tarde')
+    assert agregados.by_group('turno') == {'Manhã': 5, 'Tarde': 3}
+    agregados.add(2, '2026-03-09')
+    agregados.remove(1, '2026-03-02')
+    assert agregados.by_group('turno', '2026-03-06') == {'Tarde': 3, 'Manhã': 1}
+    agregados.set_group('turno', 2, 'Manhã')
+    assert agregados.by_group('turno') == {'Manhã': 8} and agregados.group_of('turno', 2) == 'Manhã'
+    agregados.set_group('turno', 1, None)
+    assert agregados.by_group('turno') == {'Manhã': 4} and agregados.count() == 8
+    print("✓ Totais por grupo mantidos incrementalmente")
+
+if __name__ == "__main__":
+    test_aggregates_match_full_scan()
+    test_student_frequency_and_streaks()
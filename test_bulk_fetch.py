@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Testes da leitura em lote de vários alunos (exportações e relatórios)
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_manager import DataManager
+
+def test_students_bundle_matches_per_student_fetch():
+    """get_students_bundle devolve o mesmo que get_all_student_data, lendo cada tabela uma vez"""
+    print("="*70)
+    print("TESTE: LEITURA EM LOTE (get_students_bundle)")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        dm = DataManager(data_dir=os.path.join(temp_dir, 'data'))
+        ids = []
+        for i in range(4):
+            ids.append(dm.add_record('cadastro', {
+                'nome_completo': f'Aluno Lote {i}',
+                'data_nascimento': '2012-01-01',
+                'status': 'Ativo'
+            }))
+        dm.add_record('pei', {'aluno_id': ids[0], 'necessidade_especial': 'Sim'})
+        dm.add_record('pei', {'aluno_id': ids[0], 'necessidade_especial': 'Não'})
+        dm.add_record('saude', {'aluno_id': ids[1], 'tipo_sanguineo': 'O'})
+        dm.add_record('socioeconomico', {'aluno_id': ids[2]})
+        
+        # Conta as leituras de tabela feitas pelo lote
+        leituras = []
+        get_original = dm._get_data_internal
+        dm._get_data_internal = lambda tipo: leituras.append(tipo) or get_original(tipo)
+        bundle = dm.get_students_bundle(ids + [999])
+        assert sorted(leituras) == sorted(set(leituras)) and len(leituras) == 6
+        dm._get_data_internal = get_original
+        print("✓ Cada tabela lida uma única vez para todos os alunos")
+        
+        for aluno_id in ids:
+            assert bundle[aluno_id] == dm.get_all_student_data(aluno_id), aluno_id
+        assert bundle[ids[0]]['pei']['necessidade_especial'] == 'Sim'
+        assert set(bundle[ids[3]]) == {'cadastro'}
+        assert bundle[999] == {}
+        assert dm.get_students_bundle([]) == {}
+        print("✓ Mesmo resultado de get_all_student_data por aluno")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Leitura em Lote: PASSOU")
+
+def test_summary_report_uses_satellite_tables():
+    """Relatório resumido do ZIP gerado com as análises de PEI, socioeconômico e saúde"""
+    try:
+        from modulos.export_zip import gerar_relatorio_resumido
+    except ImportError as e:
+        print(f"⚠️  Relatório resumido não testado (dependência ausente: {e.name})")
+        return
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        dm = DataManager(data_dir=os.path.join(temp_dir, 'data'))
+        ids = [dm.add_record('cadastro', {'nome_completo': f'Aluno Relatório {i}', 'data_nascimento': '2012-01-01',
+                                          'status': 'Ativo', 'turno': 'Manhã', 'ano_escolar': '6º Ano'})
+               for i in range(3)]
+        dm.add_record('pei', {'aluno_id': ids[0], 'necessidade_especial': 'Sim',
+                              'tipo_deficiencia': 'Visual, Auditiva'})
+        dm.add_record('pei', {'aluno_id': ids[1], 'necessidade_especial': 'Não'})
+        dm.add_record('socioeconomico', {'aluno_id': ids[0], 'possui_internet': 'Sim'})
+        dm.add_record('saude', {'aluno_id': ids[1], 'tipo_sanguineo': 'O', 'vacinacao_em_dia': 'Sim'})
+        
+        relatorio = gerar_relatorio_resumido(dm, dm.get_data('cadastro'))
+        assert "Alunos com PEI cadastrado: 2 (66.7%)" in relatorio
+        assert "3. ANÁLISE SOCIOECONÔMICA" in relatorio and "Com Internet: 1 (100.0%)" in relatorio
+        assert "4. ANÁLISE DE SAÚDE" in relatorio and "Vacinação em Dia: 1 (100.0%)" in relatorio
+        assert "Alunos com Necessidade Especial: 1" in relatorio and "  - Auditiva: 1" in relatorio
+        print("✓ Relatório resumido com as análises das tabelas satélite")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_students_bundle_matches_per_student_fetch()
+    test_summary_report_uses_satellite_tables()
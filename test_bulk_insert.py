@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Testes da inserção em lote (add_records)
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_manager import DataManager
+
+def test_add_records_single_write():
+    """Validação por registro, bloco de IDs e uma única escrita por lote"""
+    print("="*70)
+    print("TESTE: INSERÇÃO EM LOTE (add_records)")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        for backend in ['csv', 'sqlite']:
+            data_dir = os.path.join(temp_dir, backend, 'data')
+            dm = DataManager(data_dir=data_dir, backend=backend)
+            dm.add_record('cadastro', {'nome_completo': 'Primeiro Aluno', 'data_nascimento': '2012-01-01',
+                                       'status': 'Ativo', 'cpf': '111.111.111-11'})
+            
+            # Conta escritas e leituras completas feitas pelo lote
+            escritas, leituras = [], []
+            append_original = dm._storage.append_rows
+            load_original = dm._storage.load
+            dm._storage.append_rows = lambda *args: escritas.append(args[0]) or append_original(*args)
+            dm._storage.load = lambda *args: leituras.append(args[0]) or load_original(*args)
+            
+            resultados = dm.add_records('cadastro', [
+                {'nome_completo': 'Lote A', 'data_nascimento': '2012-05-10', 'status': 'Ativo',
+                 'cpf': '222.222.222-22'},
+                {'nome_completo': '', 'data_nascimento': '2012-05-10', 'status': 'Ativo'},
+                {'nome_completo': 'Lote C', 'data_nascimento': '2012-05-10', 'status': 'Ativo',
+                 'cpf': '123'},
+                {'nome_completo': 'Lote D', 'data_nascimento': '2099-01-01', 'status': 'Ativo'},
+                {'nome_completo': 'Lote E', 'data_nascimento': 'ontem', 'status': 'Ativo'},
+                {'nome_completo': 'Lote F', 'data_nascimento': '2013-02-03', 'status': 'Ativo'},
+            ])
+            dm._storage.append_rows = append_original
+            dm._storage.load = load_original
+            
+            assert [r['sucesso'] for r in resultados] == [True, False, False, False, False, True]
+            assert [r['id'] for r in resultados] == [2, None, None, None, None, 3]
+            assert resultados[1]['erro'] == "Campo obrigatório ausente ou vazio: nome_completo"
+            assert resultados[2]['erro'] == "CPF inválido: deve conter 11 dígitos"
+            assert resultados[3]['erro'] == "Data de nascimento não pode ser futura"
+            assert resultados[4]['erro'] == "Data de nascimento inválida"
+            assert escritas == ['cadastro'] and leituras == []
+            print(f"✓ Backend {backend}: erros por registro, IDs em bloco, uma escrita e nenhuma releitura")
+            
+            # Cache e índices iguais aos de uma instância nova
+            assert dm.get_record_by_cpf('222.222.222-22')['id'] == 2
+            assert [r['id'] for r in dm.search_by_name('lote')] == [2, 3]
+            novo = DataManager(data_dir=data_dir, backend=backend)
+            assert dm.get_data('cadastro').equals(novo.get_data('cadastro'))
+            
+            # Lote sem registros válidos não escreve nada
+            assert dm.add_records('pei', [{'necessidade_especial': 'Sim'}])[0]['sucesso'] is False
+            assert dm.add_records('pei', []) == []
+            assert dm.get_data('pei').empty
+            print(f"✓ Backend {backend}: cache igual ao arquivo relido")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Inserção em Lote: PASSOU")
+
+if __name__ == "__main__":
+    test_add_records_single_write()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Testes do cache em memória do DataManager
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from data_manager import DataManager
+
+def test_get_data_shares_cache_buffer():
+    """Leituras compartilham o buffer do cache; alterações do chamador não vazam"""
+    print("="*70)
+    print("TESTE: LEITURA ZERO-COPY")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        dm = DataManager(data_dir=os.path.join(temp_dir, 'data'))
+        for i in range(3):
+            dm.add_record('attendance', {'aluno_id': i + 1, 'data': '2026-03-02'})
+        
+        df1 = dm.get_data('attendance')
+        df2 = dm.get_data('attendance')
+        assert np.shares_memory(df1['aluno_id'].values, df2['aluno_id'].values)
+        print("✓ Duas leituras compartilham o mesmo buffer")
+        
+        # Colunas novas ou reatribuídas ficam só no DataFrame do chamador
+        df1['nova_coluna'] = 'x'
+        df1['observacoes'] = 'alterada'
+        df3 = dm.get_data('attendance')
+        assert 'nova_coluna' not in df3.columns
+        assert not (df3['observacoes'] == 'alterada').any()
+        print("✓ Colunas atribuídas pelo chamador não vazam para o cache")
+        
+        # Escritas do DataManager não alteram visões entregues antes
+        dm.update_record('attendance', 1, {'observacoes': 'atualizada', 'aluno_id': 9})
+        assert df2['aluno_id'].tolist() == [1, 2, 3] and not (df2['observacoes'] == 'atualizada').any()
+        assert dm.get_data('attendance')['aluno_id'].tolist() == [9, 2, 3]
+        print("✓ Atualizações não alteram visões já entregues")
+        
+        # Cópia explícita é independente e alterável
+        copia = dm.get_data('attendance', copy=True)
+        assert not np.shares_memory(copia['aluno_id'].values, df3['aluno_id'].values)
+        copia.loc[copia['aluno_id'] == 2, 'data'] = '1999-01-01'
+        assert (dm.get_data('attendance')['data'] == df3['data']).all()
+        print("✓ get_data(copy=True) retorna cópia independente")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Leitura Zero-Copy: PASSOU")
+
+def test_indexes_maintained_incrementally():
+    """Inserção, atualização e exclusão mantêm os índices sem reler a tabela"""
+    print("="*70)
+    print("TESTE: MANUTENÇÃO INCREMENTAL DE ÍNDICES")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        for backend in ['csv', 'sqlite']:
+            dm = DataManager(data_dir=os.path.join(temp_dir, backend, 'data'), backend=backend)
+            dm.add_record('cadastro', {'nome_completo': 'Ana Índice', 'data_nascimento': '2010-01-01',
+                                       'status': 'Ativo', 'cpf': '111.222.333-44'})
+            dm.get_data('cadastro')
+            
+            # Conta cargas completas e reconstruções de índices
+            chamadas = []
+            load_original = dm._storage.load
+            build_original = dm._build_indexes
+            dm._storage.load = lambda tipo: chamadas.append('load') or load_original(tipo)
+            dm._build_indexes = lambda tipo, df: chamadas.append('build') or build_original(tipo, df)
+            
+            bruno_id = dm.add_record('cadastro', {'nome_completo': 'Bruno Índice',
+                                                  'data_nascimento': '2010-01-01', 'status': 'Ativo'})
+            dm.update_record('cadastro', 1, {'nome_completo': 'Carla Índice', 'cpf': '555.666.777-88',
+                                             'turno': 'Noturno'})
+            dm.delete_record('cadastro', bruno_id)
+            
+            assert dm.get_record('cadastro', 1)['turno'] == 'Noturno'
+            assert dm.get_record('cadastro', bruno_id) is None
+            assert dm.get_record_by_cpf('111.222.333-44') is None
+            assert dm.get_record_by_cpf('55566677788')['nome_completo'] == 'Carla Índice'
+            assert [r['id'] for r in dm.search_by_name('Carla')] == [1]
+            assert dm.search_by_name('Ana') == [] and dm.search_by_name('Bruno') == []
+            assert chamadas == []
+            print(f"✓ Backend {backend}: índices atualizados sem carga nem reconstrução")
+            
+            # O cache mantido no lugar é idêntico a uma releitura
+            recarregado = DataManager(data_dir=dm.data_dir, backend=backend)
+            assert dm.get_data('cadastro').equals(recarregado.get_data('cadastro'))
+            assert dm._indexes['cadastro']['id'] == recarregado._indexes['cadastro']['id']
+            print(f"✓ Backend {backend}: cache igual ao armazenamento")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Índices Incrementais: PASSOU")
+
+def test_get_by_aluno_uses_index():
+    """get_by_aluno responde pelo índice aluno_id e acompanha as alterações"""
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        dm = DataManager(data_dir=os.path.join(temp_dir, 'data'))
+        dm.add_record('attendance', {'aluno_id': 1, 'data': '2026-03-02'})
+        dm.get_data('attendance')
+        segunda_id = dm.add_record('attendance', {'aluno_id': 2, 'data': '2026-03-02'})
+        terceira_id = dm.add_record('attendance', {'aluno_id': 2, 'data': '2026-03-03'})
+        
+        presencas = dm.get_by_aluno('attendance', 2)
+        assert presencas['id'].tolist() == [segunda_id, terceira_id]
+        assert list(presencas.columns) == list(dm.get_data('attendance').columns)
+        assert presencas['aluno_id'].dtype == dm.get_data('attendance')['aluno_id'].dtype
+        assert dm.get_by_aluno('attendance', '2')['id'].tolist() == [segunda_id, terceira_id]
+        
+        dm.update_record('attendance', segunda_id, {'aluno_id': 1})
+        dm.delete_record('attendance', terceira_id)
+        assert dm.get_by_aluno('attendance', 1)['id'].tolist() == [1, segunda_id]
+        assert len(dm.get_by_aluno('attendance', 2)) == 0
+        
+        # Linhas do próprio cache: mesmos tipos e valores de get_data, também
+        # depois de excluir uma linha do meio (posições deslocadas)
+        dm.add_records('attendance', [{'aluno_id': 3, 'data': f'2026-03-{d:02d}', 'confianca': '0.9'}
+                                      for d in range(4, 8)])
+        dm.delete_record('attendance', segunda_id)
+        df = dm.get_data('attendance')
+        presencas = dm.get_by_aluno('attendance', 3)
+        assert presencas.dtypes.equals(df.dtypes)
+        assert str(presencas['data'].dtype) == 'datetime64[ns]' and presencas['confianca'].tolist() == [0.9] * 4
+        assert presencas.equals(df[df['aluno_id'] == 3])
+        assert dm.query('attendance').where('aluno_id', '=', 3).count() == 4
+        assert len(dm.get_by_aluno('pei', 1)) == 0
+        print("✓ get_by_aluno usa o índice e acompanha inserção, atualização e exclusão")
+        
+        dm.add_record('pei', {'aluno_id': 1, 'necessidade_especial': 'Sim'})
+        assert dm.get_all_student_data(1)['pei']['necessidade_especial'] == 'Sim'
+        assert dm.get_student_data_lazy(1).pei['necessidade_especial'] == 'Sim'
+        print("✓ get_all_student_data e carregamento lazy pelo índice")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_get_data_shares_cache_buffer()
+    test_indexes_maintained_incrementally()
+    test_get_by_aluno_uses_index()
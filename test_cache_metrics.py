@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Testes das métricas do cache (acertos, faltas, descartes, tempos e memória)
+do orçamento de memória com descarte LRU e da leitura por colunas
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_manager import DataManager
+
+def test_cache_metrics():
+    """Contadores por tabela em get_cache_stats e no texto do Prometheus"""
+    print("="*70)
+    print("TESTE: MÉTRICAS DO CACHE")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        data_dir = os.path.join(temp_dir, 'data')
+        dm = DataManager(data_dir=data_dir)
+        dm.add_record('cadastro', {'nome_completo': 'Aluno Teste', 'data_nascimento': '2012-01-01',
+                                   'status': 'Ativo'})
+        dm.clear_cache()
+        dm.reset_cache_metrics()
+        
+        # Primeira leitura carrega a tabela; as seguintes vêm do cache
+        for _ in range(3):
+            dm.get_data('cadastro')
+        stats = dm.get_cache_stats()
+        assert stats['misses'] == {'cadastro': 1} and stats['hits'] == {'cadastro': 2}
+        assert stats['load_seconds']['cadastro'] > 0 and stats['index_seconds']['cadastro'] > 0
+        assert stats['memory_bytes']['cadastro'] >= dm.get_data('cadastro').memory_usage().sum()
+        print("✓ Acertos, faltas, tempos e memória por tabela")
+        
+        # Escrita de outra instância (outro processo) descarta a versão em cache
+        DataManager(data_dir=data_dir).add_record('cadastro', {
+            'nome_completo': 'Outro Aluno', 'data_nascimento': '2012-01-01', 'status': 'Ativo'})
+        assert len(dm.get_data('cadastro')) == 2
+        dm.clear_cache()
+        stats = dm.get_cache_stats()
+        assert stats['invalidations'] == {'cadastro': 2} and stats['misses'] == {'cadastro': 2}
+        assert stats['evictions'] == {}
+        assert stats['memory_bytes'] == {}
+        print("✓ Invalidações por mudança no armazenamento e clear_cache")
+        
+        texto = dm.get_cache_metrics_text()
+        assert '# TYPE matricula_cache_hits_total counter' in texto
+        assert 'matricula_cache_misses_total{table="cadastro"} 2' in texto
+        assert 'matricula_cache_invalidations_total{table="cadastro"} 2' in texto
+        print("✓ Texto no formato do Prometheus")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Métricas do Cache: PASSOU")
+
+def test_cache_memory_budget_lru():
+    """Orçamento em bytes com descarte LRU e tabelas fixadas"""
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        data_dir = os.path.join(temp_dir, 'data')
+        dm = DataManager(data_dir=data_dir)
+        for tipo in ['pei', 'saude', 'questionario_saeb']:
+            dm.add_records(tipo, [{'aluno_id': i, 'necessidade_especial': 'Não', 'observacoes': 'x' * 200}
+                                  for i in range(1, 51)])
+        dm.add_record('cadastro', {'nome_completo': 'Aluno Teste', 'data_nascimento': '2012-01-01',
+                                   'status': 'Ativo'})
+        dm.clear_cache()
+        
+        # Mede cada tabela sem limite e monta um orçamento que não comporta as quatro
+        for tipo in ['cadastro', 'pei', 'saude', 'questionario_saeb']:
+            dm.get_data(tipo)
+        custos = dm.get_cache_stats()['memory_bytes']
+        orcamento = custos['cadastro'] + custos['pei'] + max(custos['saude'], custos['questionario_saeb']) + 100
+        
+        dm = DataManager(data_dir=data_dir, cache_max_bytes=orcamento, pinned_tables=['cadastro'])
+        for tipo in ['cadastro', 'pei', 'saude']:
+            dm.get_data(tipo)
+        dm.get_data('pei')
+        dm.get_data('questionario_saeb')
+        
+        # saude era a menos usada recentemente; cadastro, fixada, continua em cache
+        stats = dm.get_cache_stats()
+        assert sorted(stats['cached_types']) == ['cadastro', 'pei', 'questionario_saeb']
+        assert stats['evictions'] == {'saude': 1} and stats['invalidations'] == {}
+        assert sum(stats['memory_bytes'].values()) <= orcamento
+        
+        # Tabela descartada é recarregada normalmente (com índices)
+        assert len(dm.get_data('saude')) == 50
+        assert dm.get_by_aluno('saude', 7)['aluno_id'].tolist() == [7]
+        assert 'cadastro' in dm.get_cache_stats()['cached_types']
+        print("✓ Descarte LRU dentro do orçamento, preservando tabelas fixadas")
+        
+        # Projeções (get_data com columns) entram no orçamento
+        orcamento = custos['cadastro'] + custos['pei'] + 100
+        dm = DataManager(data_dir=data_dir, cache_max_bytes=orcamento, pinned_tables=['cadastro'])
+        dm.get_data('cadastro')
+        dm.get_data('pei')
+        assert len(dm.get_data('saude', columns=['aluno_id', 'observacoes'])) == 50
+        stats = dm.get_cache_stats()
+        assert stats['cached_types'] == ['cadastro'] and list(stats['projected_columns']) == ['saude']
+        assert stats['evictions'] == {'pei': 1}
+        assert sum(stats['memory_bytes'].values()) + sum(stats['projected_memory_bytes'].values()) <= orcamento
+        
+        # Tabela inteira em cache substitui a projeção; projeções também são descartadas
+        dm.get_data('saude')
+        assert dm.get_cache_stats()['projected_columns'] == {}
+        dm.get_data('pei', columns=['aluno_id'])
+        stats = dm.get_cache_stats()
+        assert stats['cached_types'] == ['cadastro'] and list(stats['projected_columns']) == ['pei']
+        dm.get_data('saude')
+        assert dm.get_cache_stats()['projected_columns'] == {}
+        print("✓ Projeções contadas e descartadas no orçamento de memória")
+        
+        try:
+            DataManager(data_dir=data_dir, pinned_tables=['inexistente'])
+            assert False, "Tabela inválida aceita para fixar"
+        except ValueError:
+            pass
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def test_column_projection():
+    """Leitura só das colunas pedidas, com cache por coluna validado pela assinatura"""
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        for backend in ['csv', 'sqlite']:
+            data_dir = os.path.join(temp_dir, backend, 'data')
+            dm = DataManager(data_dir=data_dir, backend=backend)
+            dm.add_records('questionario_saeb', [{'aluno_id': i, 'sexo': 'F', 'cor_raca': 'Parda'}
+                                                 for i in range(1, 11)])
+            dm.clear_cache()
+            
+            leituras = []
+            load_original = dm._storage.load
+            dm._storage.load = lambda tipo, columns=None: leituras.append(columns) or load_original(tipo, columns)
+            
+            df = dm.get_data('questionario_saeb', columns=['aluno_id', 'inexistente'])
+            assert list(df.columns) == ['aluno_id'] and df['aluno_id'].tolist() == list(range(1, 11))
+            
+            # Colunas já lidas vêm do cache; só as novas são lidas do armazenamento
+            df = dm.get_data('questionario_saeb', columns=['sexo', 'aluno_id'])
+            assert list(df.columns) == ['sexo', 'aluno_id'] and (df['sexo'] == 'F').all()
+            dm.get_data('questionario_saeb', columns=['aluno_id', 'sexo', 'inexistente'])
+            assert leituras == [['aluno_id', 'inexistente'], ['sexo']]
+            assert 'questionario_saeb' not in dm.get_cache_stats()['cached_types']
+            
+            # Escrita (inclusive de outro processo) invalida o cache por coluna
+            dm._storage.load = load_original
+            dm.add_record('questionario_saeb', {'aluno_id': 11, 'sexo': 'M'})
+            dm.clear_cache()
+            assert dm.get_data('questionario_saeb', columns=['aluno_id', 'sexo'])['sexo'].tolist()[0] == 'F'
+            DataManager(data_dir=data_dir, backend=backend).update_record('questionario_saeb', 1, {'sexo': 'M'})
+            df = dm.get_data('questionario_saeb', columns=['aluno_id', 'sexo'])
+            assert df['sexo'].tolist()[0] == 'M' and df['aluno_id'].tolist()[-1] == 11
+            
+            # Com a tabela inteira em cache a projeção é feita sobre ela
+            completo = dm.get_data('questionario_saeb')
+            assert dm.get_data('questionario_saeb', columns=['cor_raca']).equals(completo[['cor_raca']])
+            print(f"✓ Backend {backend}: projeção de colunas com cache por coluna")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_cache_metrics()
+    test_cache_memory_budget_lru()
+    test_column_projection()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Testes do lock de leitura/escrita (leituras concorrentes no DataManager)
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_manager import DataManager
+from rwlock import ReadWriteLock
+
+def _em_thread(func):
+    """Roda func em outra thread; retorna (thread, evento de término)"""
+    terminou = threading.Event()
+    def alvo():
+        func()
+        terminou.set()
+    thread = threading.Thread(target=alvo, daemon=True)
+    thread.start()
+    return thread, terminou
+
+def test_read_write_lock():
+    """Leitores simultâneos, escritor exclusivo e leitores liberados no downgrade"""
+    print("="*70)
+    print("TESTE: LOCK DE LEITURA/ESCRITA")
+    print("="*70)
+    
+    lock = ReadWriteLock()
+    
+    def ler():
+        with lock.read():
+            pass
+    
+    def escrever():
+        with lock.write():
+            pass
+    
+    # Dois leitores ao mesmo tempo; o escritor espera os dois
+    with lock.read():
+        _, leu = _em_thread(ler)
+        assert leu.wait(2)
+        _, escreveu = _em_thread(escrever)
+        assert not escreveu.wait(0.2)
+    assert escreveu.wait(2)
+    print("✓ Leituras compartilhadas; escrita espera os leitores")
+    
+    # Escrita reentrante e exclusiva; leitura da própria thread não espera
+    with lock:
+        with lock.write():
+            with lock.read():
+                pass
+        _, leu = _em_thread(ler)
+        assert not leu.wait(0.2)
+        
+        # No downgrade os leitores entram; outro escritor continua esperando
+        with lock.downgrade():
+            assert leu.wait(2) and lock.downgraded()
+            _, escreveu = _em_thread(escrever)
+            assert not escreveu.wait(0.2)
+        assert not escreveu.wait(0.2)
+    assert escreveu.wait(2)
+    print("✓ Escrita exclusiva e reentrante; downgrade libera só os leitores")
+
+def test_reads_proceed_during_save():
+    """Leituras não esperam a gravação do arquivo e veem a versão anterior"""
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        data_dir = os.path.join(temp_dir, 'data')
+        dm = DataManager(data_dir=data_dir)
+        dm.add_records('cadastro', [
+            {'nome_completo': f'Aluno {i}', 'data_nascimento': '2012-01-01', 'status': 'Ativo'}
+            for i in range(1, 21)
+        ])
+        dm.add_records('pei', [{'aluno_id': i, 'necessidade_especial': 'Não'} for i in range(1, 21)])
+        
+        # Gravação "lenta": write_table só termina quando liberada
+        gravando = threading.Event()
+        liberar = threading.Event()
+        write_table = dm._storage.write_table
+        def write_table_lento(tipo, df):
+            gravando.set()
+            assert liberar.wait(5)
+            write_table(tipo, df)
+        dm._storage.write_table = write_table_lento
+        
+        _, atualizou = _em_thread(lambda: dm.update_record('cadastro', 3, {'nome_completo': 'Renomeado'}))
+        assert gravando.wait(2)
+        
+        # Durante a gravação: leituras respondem com a versão anterior, sem esperar
+        leituras = {}
+        def ler():
+            leituras['registro'] = dm.get_record('cadastro', 3)['nome_completo']
+            leituras['tabela'] = dm.get_data('cadastro')['nome_completo'].tolist()[2]
+            leituras['pei'] = len(dm.get_by_aluno('pei', 3))
+            leituras['pagina'] = len(dm.get_data_paginated('cadastro', 1, 5)['data'])
+        _, leu = _em_thread(ler)
+        assert leu.wait(2), "leitura bloqueada pela gravação"
+        assert leituras == {'registro': 'Aluno 3', 'tabela': 'Aluno 3', 'pei': 1, 'pagina': 5}
+        
+        # Outro escritor continua esperando a escrita em andamento
+        _, inseriu = _em_thread(lambda: dm.add_record('pei', {'aluno_id': 3, 'necessidade_especial': 'Sim'}))
+        assert not inseriu.wait(0.2)
+        
+        liberar.set()
+        assert atualizou.wait(5) and inseriu.wait(5)
+        dm._storage.write_table = write_table
+        assert dm.get_record('cadastro', 3)['nome_completo'] == 'Renomeado'
+        assert dm.get_data('cadastro').equals(DataManager(data_dir=data_dir).get_data('cadastro'))
+        print("✓ Leituras durante a gravação veem a versão anterior sem bloquear")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def test_concurrent_readers_and_writer():
+    """Leitores e escritor simultâneos: leituras sempre consistentes, sem erros"""
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        for backend in ['csv', 'sqlite']:
+            data_dir = os.path.join(temp_dir, backend, 'data')
+            dm = DataManager(data_dir=data_dir, backend=backend)
+            dm.add_records('cadastro', [
+                {'nome_completo': f'Aluno {i}', 'data_nascimento': '2012-01-01', 'status': 'Ativo',
+                 'telefone': '0'}
+                for i in range(1, 51)
+            ])
+            
+            parar = threading.Event()
+            erros = []
+            
+            def leitor():
+                try:
+                    while not parar.is_set():
+                        df = dm.get_data('cadastro')
+                        # Todas as linhas com o mesmo telefone: a escrita troca todas de uma vez
+                        assert df['telefone'].nunique() == 1 and len(df) == 50
+                        registro = dm.get_record('cadastro', 7)
+                        assert registro is not None and registro['nome_completo'] == 'Aluno 7'
+                except Exception as e:  # noqa: BLE001 - reportado pela thread principal
+                    erros.append(repr(e))
+            
+            leitores = [threading.Thread(target=leitor) for _ in range(4)]
+            for t in leitores:
+                t.start()
+            for versao in range(1, 11):
+                with dm._write_section():
+                    df = dm._get_data_internal('cadastro')
+                    df['telefone'] = str(versao)
+                    dm._save_data_internal('cadastro', df)
+            parar.set()
+            for t in leitores:
+                t.join()
+            
+            assert erros == [], erros[:3]
+            assert dm.get_data('cadastro')['telefone'].tolist() == ['10'] * 50
+            print(f"✓ Backend {backend}: 4 leitores e 1 escritor sem leituras inconsistentes")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Leituras Concorrentes: PASSOU")
+
+if __name__ == "__main__":
+    test_read_write_lock()
+    test_reads_proceed_during_save()
+    test_concurrent_readers_and_writer()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Testes da paginação lida direto do armazenamento (sem carregar a tabela inteira)
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+from data_manager import DataManager
+from storage import RowOffsetIndex
+
+def _iguais(a, b):
+    """Mesmos valores (cada página só tem as categorias das suas linhas)"""
+    def como_texto(df):
+        return df.astype({c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+    pd.testing.assert_frame_equal(como_texto(a), como_texto(b))
+    return True
+
+def _paginas(dm, tipo, page_size):
+    """Todas as páginas de get_data_paginated concatenadas"""
+    primeira = dm.get_data_paginated(tipo, 1, page_size)
+    paginas = [primeira['data']] + [dm.get_data_paginated(tipo, p, page_size)['data']
+                                    for p in range(2, primeira['total_pages'] + 1)]
+    return pd.concat(paginas), primeira['total_records']
+
+def test_streaming_pages_match_full_table():
+    """Páginas lidas do armazenamento iguais às fatias da tabela completa"""
+    print("="*70)
+    print("TESTE: PAGINAÇÃO SEM CARREGAR A TABELA")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        for backend in ['csv', 'sqlite']:
+            data_dir = os.path.join(temp_dir, backend, 'data')
+            dm = DataManager(data_dir=data_dir, backend=backend)
+            dm.add_records('attendance', [
+                {'aluno_id': i, 'data': f'2026-{1 + i % 3:02d}-10',
+                 'observacoes': 'linha 1\nlinha "2"' if i % 4 == 0 else ''}
+                for i in range(1, 24)
+            ])
+            dm.add_records('cadastro', [
+                {'nome_completo': f'Aluno {i}', 'data_nascimento': '2012-01-01', 'status': 'Ativo',
+                 'turno': ['Manhã', 'Tarde', 'Noite'][i % 3],
+                 'endereco': 'Rua A, 10\nApto 2' if i % 3 == 0 else 'Rua B'}
+                for i in range(1, 18)
+            ])
+            
+            for tipo in ['attendance', 'cadastro']:
+                completo = DataManager(data_dir=data_dir, backend=backend).get_data(tipo)
+                
+                # Sem nada em cache a tabela não é carregada
+                dm.clear_cache()
+                leituras = []
+                load_original = dm._storage.load
+                dm._storage.load = lambda *args, **kwargs: leituras.append(args) or load_original(*args, **kwargs)
+                pagina = dm.get_data_paginated(tipo, 2, 5)
+                dm._storage.load = load_original
+                assert leituras == [] and dm.get_cache_stats()['cached_types'] == []
+                assert _iguais(pagina['data'], completo.iloc[5:10])
+                assert pagina['total_records'] == len(completo) and pagina['has_next']
+                
+                # Todas as páginas juntas reproduzem a tabela; página além do fim vira a última
+                paginas, total = _paginas(dm, tipo, 4)
+                assert total == len(completo) and _iguais(paginas, completo)
+                ultima = dm.get_data_paginated(tipo, 99, 4)
+                assert _iguais(ultima['data'], completo.iloc[(ultima['total_pages'] - 1) * 4:])
+                
+                # QueryBuilder sem filtros usa o mesmo caminho
+                assert _iguais(dm.query(tipo).paginate(3, 5)['data'], completo.iloc[10:15])
+                
+                # Com a tabela em cache as páginas são as mesmas: partições em ordem de
+                # mês, cada uma na ordem do arquivo (demais tabelas: ordem de inserção)
+                if dm._storage.is_partitioned(tipo):
+                    assert completo['data'].is_monotonic_increasing
+                    assert all(ids.is_monotonic_increasing for _, ids in completo.groupby('data')['id'])
+                else:
+                    assert completo['id'].is_monotonic_increasing
+                assert _iguais(dm.get_data(tipo), completo)
+                assert _iguais(dm.get_data_paginated(tipo, 2, 5)['data'], pagina['data'])
+            
+            # Inserção em um mês anterior e data movida para outro mês: o cache
+            # acompanha a posição das linhas nas partições
+            dm.add_record('attendance', {'aluno_id': 3, 'data': '2026-01-20'})
+            dm.update_record('attendance', 3, {'data': '2026-03-05'})
+            completo = DataManager(data_dir=data_dir, backend=backend).get_data('attendance')
+            assert _iguais(dm.get_data('attendance'), completo)
+            assert _iguais(dm.get_by_aluno('attendance', 3), completo[completo['aluno_id'] == 3])
+            
+            # Inserções e exclusões posteriores aparecem nas páginas
+            DataManager(data_dir=data_dir, backend=backend).add_record('cadastro', {
+                'nome_completo': 'Aluno Novo', 'data_nascimento': '2012-01-01', 'status': 'Ativo'})
+            dm.delete_record('cadastro', 3)
+            dm.clear_cache()
+            paginas, total = _paginas(dm, 'cadastro', 5)
+            completo = DataManager(data_dir=data_dir, backend=backend).get_data('cadastro')
+            assert total == 17 and _iguais(paginas, completo)
+            print(f"✓ Backend {backend}: páginas iguais à tabela completa, sem carregá-la")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Paginação: PASSOU")
+
+def test_row_offset_index_extends_on_append():
+    """O índice de posições é estendido em inserções e refeito em reescritas"""
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        caminho = os.path.join(temp_dir, 'tabela.csv')
+        with open(caminho, 'w', encoding='utf-8') as f:
+            f.write('id,texto\n1,a\n2,"b\nc"\n3,d')
+        indice = RowOffsetIndex(caminho)
+        indice.refresh()
+        assert len(indice) == 3
+        assert indice.read(1, 2)['texto'].tolist() == ['b\nc']
+        
+        # Inserção no final: a última linha (sem quebra) é revarrida, o resto não
+        with open(caminho, 'a', encoding='utf-8') as f:
+            f.write('\n4,e\n')
+        varridas = []
+        scan_original = indice._scan
+        indice._scan = lambda f, posicao: varridas.append(posicao) or scan_original(f, posicao)
+        indice.refresh()
+        assert varridas == [indice.offsets[2]]
+        assert indice.read(2, 10)['id'].tolist() == ['3', '4']
+        
+        # Reescrita (arquivo novo) refaz o índice do início
+        with open(caminho + '.tmp', 'w', encoding='utf-8') as f:
+            f.write('id,texto\n9,z\n')
+        os.replace(caminho + '.tmp', caminho)
+        indice.refresh()
+        assert varridas[-1] == 0 and indice.read(0, 5)['id'].tolist() == ['9']
+        print("✓ Índice de posições estendido em inserções e refeito em reescritas")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_streaming_pages_match_full_table()
+    test_row_offset_index_extends_on_append()
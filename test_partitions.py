@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Testes do particionamento mensal de attendance (migração e leitura por intervalo)
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+from data_manager import DataManager
+from storage import MIGRATED_SUFFIX
+
+COLUNAS = ['id', 'aluno_id', 'data', 'hora', 'tipo', 'verificado', 'confianca', 'observacoes', 'data_registro']
+
+def test_attendance_partitions():
+    """Migração do CSV único, poda de partições e compatibilidade de get_data"""
+    from scripts.migrate_attendance_partitions import migrate_attendance_partitions
+    
+    print("="*70)
+    print("TESTE: PARTIÇÕES MENSAIS DE ATTENDANCE")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        data_dir = os.path.join(temp_dir, 'data')
+        os.makedirs(data_dir)
+        
+        # attendance.csv no formato antigo (arquivo único)
+        legado = pd.DataFrame([
+            {'id': 1, 'aluno_id': 1, 'data': '2026-01-30', 'hora': '07:00'},
+            {'id': 2, 'aluno_id': 2, 'data': '2026-02-02', 'hora': '07:05'},
+            {'id': 3, 'aluno_id': 1, 'data': '2026-02-03', 'hora': '07:10'},
+            {'id': 4, 'aluno_id': 2, 'data': '', 'hora': '07:15'},
+        ], columns=COLUNAS)
+        legado_path = os.path.join(data_dir, 'attendance.csv')
+        legado.to_csv(legado_path, index=False)
+        
+        # Sem rodar a migração o CSV único continua em uso
+        dm = DataManager(data_dir=data_dir)
+        assert not dm._storage.is_partitioned('attendance') and dm._storage.partitions('attendance') == []
+        assert dm.get_data_range('attendance', '2026-02-01', '2026-02-28')['id'].tolist() == [2, 3]
+        dm.add_record('attendance', {'aluno_id': 3, 'data': '2026-02-04', 'hora': '07:12'})
+        dm.delete_record('attendance', 5)
+        assert os.path.exists(legado_path) and not os.path.exists(os.path.join(data_dir, 'attendance'))
+        print("✓ attendance.csv antigo usado até a migração")
+        
+        assert migrate_attendance_partitions(data_dir) == {'2026-01': 1, '2026-02': 2, 'sem_data': 1}
+        dm = DataManager(data_dir=data_dir)
+        assert dm._storage.partitions('attendance') == ['2026-01', '2026-02', 'sem_data']
+        assert not os.path.exists(legado_path) and os.path.exists(legado_path + MIGRATED_SUFFIX)
+        assert dm.get_data('attendance')['id'].tolist() == [1, 2, 3, 4]
+        print("✓ attendance.csv migrado para partições mensais pelo script")
+        
+        # Atualização regrava apenas a partição do registro
+        antes = {p: os.stat(dm._storage.partition_path('attendance', p)) for p in ['2026-01', '2026-02', 'sem_data']}
+        dm.update_record('attendance', 3, {'hora': '07:11'})
+        depois = {p: os.stat(dm._storage.partition_path('attendance', p)) for p in antes}
+        assert [p for p in antes if (antes[p].st_ino, antes[p].st_mtime_ns) != (depois[p].st_ino, depois[p].st_mtime_ns)] \
+            == ['2026-02']
+        assert DataManager(data_dir=data_dir).get_record('attendance', 3)['hora'] == '07:11'
+        print("✓ Atualização regrava só a partição alterada")
+        
+        # Leitura por intervalo (sem a tabela em cache) abre apenas as partições do período
+        dm.clear_cache()
+        lidas = []
+        load_original = dm._storage._load_partitions
+        dm._storage._load_partitions = lambda tipo, particoes: lidas.append(particoes) or load_original(tipo, particoes)
+        assert dm.get_data_range('attendance', '2026-02-03')['id'].tolist() == [3]
+        assert dm.get_data_range('attendance', '2026-01-15', '2026-02-02')['id'].tolist() == [1, 2]
+        assert lidas == [['2026-02'], ['2026-01', '2026-02']]
+        dm._storage._load_partitions = load_original
+        print("✓ Leitura por intervalo só abre as partições do período")
+        
+        # Inserção em um mês novo cria a partição; exclusão do último registro a remove
+        novo_id = dm.add_record('attendance', {'aluno_id': 3, 'data': '2026-03-02', 'hora': '07:20'})
+        assert dm._storage.partitions('attendance') == ['2026-01', '2026-02', '2026-03', 'sem_data']
+        dm.delete_record('attendance', 1)
+        assert dm._storage.partitions('attendance') == ['2026-02', '2026-03', 'sem_data']
+        df_disco = DataManager(data_dir=data_dir).get_data('attendance')
+        assert sorted(df_disco['id'].tolist()) == [2, 3, 4, novo_id]
+        assert dm.get_data_range('attendance', '2026-03-01', '2026-03-31')['id'].tolist() == [novo_id]
+        print("✓ Partições criadas e removidas conforme os registros")
+        
+        # Backup guarda um único attendance.csv e a restauração volta às partições
+        backup = dm.create_backup(os.path.join(temp_dir, 'backup.zip'))
+        dm.delete_record('attendance', 2)
+        sucesso, mensagem = dm.restore_backup(backup)
+        assert sucesso, mensagem
+        assert sorted(dm.get_data('attendance')['id'].tolist()) == [2, 3, 4, novo_id]
+        assert dm._storage.partitions('attendance') == ['2026-02', '2026-03', 'sem_data']
+        print("✓ Backup e restauração com tabela particionada")
+        
+        try:
+            dm.get_data_range('cadastro', '2026-01-01')
+            assert False, "get_data_range aceitou tabela sem particionamento"
+        except ValueError:
+            pass
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Partições Mensais: PASSOU")
+
+def test_data_range_matches_full_filter():
+    """get_data_range é igual ao filtro sobre get_data (CSV, SQLite e buffer de write-behind)"""
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        for backend in ['csv', 'sqlite']:
+            data_dir = os.path.join(temp_dir, backend, 'data')
+            dm = DataManager(data_dir=data_dir, backend=backend, write_behind=['attendance'],
+                             flush_interval_ms=60000)
+            dm.add_records('attendance', [
+                {'aluno_id': i % 4, 'data': f'2026-{1 + i % 5:02d}-{1 + i % 27:02d}'} for i in range(60)
+            ])
+            dm.flush()
+            dm.add_record('attendance', {'aluno_id': 9, 'data': '2026-04-10'})
+            
+            # Cache descartado: a leitura por intervalo junta disco e buffer
+            dm.clear_cache()
+            intervalo = dm.get_data_range('attendance', '2026-02-10', '2026-04-10')
+            df = dm.get_data('attendance')
+            esperado = df[(df['data'] >= '2026-02-10') & (df['data'] <= '2026-04-10')]
+            assert sorted(intervalo['id'].tolist()) == sorted(esperado['id'].tolist())
+            assert 9 in intervalo['aluno_id'].tolist()
+            
+            # Com o cache válido o filtro usa o cache
+            assert dm.get_data_range('attendance', '2026-02-10', '2026-04-10')['id'].tolist() == \
+                esperado['id'].tolist()
+            dm.close()
+            print(f"✓ Backend {backend}: intervalo igual ao filtro completo")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_attendance_partitions()
+    test_data_range_matches_full_filter()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Testes do planejador de queries do QueryBuilder (uso de índices)
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_manager import DataManager
+
+def test_query_planner_uses_indexes():
+    """Filtros por índice primeiro, mesmos resultados das máscaras, count/first sem DataFrame"""
+    print("="*70)
+    print("TESTE: PLANEJADOR DE QUERIES")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        dm = DataManager(data_dir=os.path.join(temp_dir, 'data'))
+        for i in range(12):
+            dm.add_record('cadastro', {
+                'nome_completo': f"{'João' if i % 3 == 0 else 'Maria'} Planejador {i}",
+                'data_nascimento': '2012-01-01',
+                'status': 'Ativo' if i % 2 == 0 else 'Inativo',
+                'cpf': f'000.000.000-{i:02d}'
+            })
+        for aluno_id in [2, 2, 5]:
+            dm.add_record('attendance', {'aluno_id': aluno_id, 'data': '2026-03-02'})
+        
+        query = dm.query('cadastro') \
+                  .where('status', '=', 'Ativo') \
+                  .where('nome_completo', 'contains', 'joao') \
+                  .where('id', 'in', [1, 7, 99])
+        plano = query.explain()
+        linhas = plano.splitlines()
+        assert 'INDEX id in' in linhas[1] and 'INDEX nome_completo contains' in linhas[2]
+        assert 'SCAN  status =' in linhas[3]
+        assert query.execute()['id'].tolist() == [1, 7]
+        print(plano)
+        print("✓ Índices primeiro (menor conjunto antes), máscaras depois")
+        
+        # Resultados iguais aos da aplicação direta das máscaras
+        df = dm.get_data('cadastro')
+        assert dm.query('cadastro').where('cpf', '=', '000.000.000-05').execute()['id'].tolist() == [6]
+        assert dm.query('cadastro').where('nome_completo', 'startswith', 'Maria P').count() == \
+            len(df[df['nome_completo'].str.startswith('Maria P')])
+        assert dm.query('cadastro').where('nome_completo', 'startswith', 'maria').count() == 0
+        assert dm.query('attendance').where('aluno_id', '=', 2).execute()['aluno_id'].tolist() == [2, 2]
+        print("✓ Mesmos resultados das máscaras (cpf, startswith, aluno_id)")
+        
+        # count() e first() só com índices não montam o DataFrame filtrado
+        filtrado_original = DataManager.QueryBuilder._filtered
+        def sem_filtrar(self):
+            raise AssertionError("DataFrame filtrado montado")
+        DataManager.QueryBuilder._filtered = sem_filtrar
+        try:
+            assert dm.query('attendance').where('aluno_id', 'in', [2, 5]).count() == 3
+            assert dm.query('attendance').where('aluno_id', 'in', [2, 5]).offset(1).limit(1).count() == 1
+            assert dm.query('cadastro').where('id', '=', 3).first()['nome_completo'] == 'Maria Planejador 2'
+            assert dm.query('cadastro').where('id', 'in', [3, 5]).offset(1).first()['id'] == 5
+            assert dm.query('cadastro').where('id', '=', 99).first() is None
+        finally:
+            DataManager.QueryBuilder._filtered = filtrado_original
+        print("✓ count() e first() resolvidos pelo índice")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Planejador de Queries: PASSOU")
+
+if __name__ == "__main__":
+    test_query_planner_uses_indexes()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Testes das colunas categóricas e tipadas do esquema (schema.CATEGORICAL_COLUMNS e schema.TYPED_COLUMNS)
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+from data_manager import DataManager
+from schema import CATEGORICAL_COLUMNS, age_in_years
+
+def _categorica(serie):
+    return isinstance(serie.dtype, pd.CategoricalDtype)
+
+def test_categorical_columns_survive_writes():
+    """Colunas categóricas na carga, em inserções, atualizações, exclusões e no buffer"""
+    print("="*70)
+    print("TESTE: COLUNAS CATEGÓRICAS")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        for backend in ['csv', 'sqlite']:
+            data_dir = os.path.join(temp_dir, backend, 'data')
+            dm = DataManager(data_dir=data_dir, backend=backend, write_behind=['attendance'],
+                             flush_interval_ms=60000)
+            dm.add_records('cadastro', [
+                {'nome_completo': f'Aluno {i}', 'data_nascimento': '2012-01-01',
+                 'status': 'Ativo', 'turno': ['Manhã', 'Tarde'][i % 2], 'ano_escolar': f'{6 + i % 4}º Ano'}
+                for i in range(1, 41)
+            ])
+            
+            df = dm.get_data('cadastro')
+            assert all(_categorica(df[c]) for c in CATEGORICAL_COLUMNS['cadastro'] if c in df.columns)
+            assert not _categorica(df['nome_completo'])
+            
+            # Inserção com valor novo, atualização e exclusão mantêm 'category'
+            novo_id = dm.add_record('cadastro', {'nome_completo': 'Aluno Noite', 'status': 'Ativo',
+                                                 'data_nascimento': '2012-01-01', 'turno': 'Noite'})
+            dm.update_record('cadastro', 1, {'status': 'Transferido', 'turno': 'Integral'})
+            dm.delete_record('cadastro', novo_id)
+            df = dm.get_data('cadastro')
+            assert _categorica(df['status']) and _categorica(df['turno'])
+            assert sorted(df['turno'].cat.categories) == ['Integral', 'Manhã', 'Tarde']
+            assert df['status'].value_counts().to_dict() == {'Ativo': 39, 'Transferido': 1}
+            
+            # Cache mantido no lugar igual a uma releitura
+            assert df.equals(DataManager(data_dir=data_dir, backend=backend).get_data('cadastro'))
+            
+            # Linhas no buffer de write-behind também ficam categóricas
+            dm.get_data('attendance')
+            dm.add_record('attendance', {'aluno_id': 1, 'data': '2026-03-02', 'tipo': 'entrada'})
+            dm.add_record('attendance', {'aluno_id': 2, 'data': '2026-03-02', 'tipo': 'saida'})
+            presencas = dm.get_data('attendance')
+            assert _categorica(presencas['tipo']) and presencas['tipo'].tolist() == ['entrada', 'saida']
+            dm.close()
+            
+            # Filtros e ordenação sobre colunas categóricas
+            resultado = dm.query('cadastro').where('ano_escolar', '>=', '8º Ano') \
+                .order_by('turno', desc=True).execute()
+            assert set(resultado['ano_escolar']) == {'8º Ano', '9º Ano'}
+            assert resultado['turno'].tolist() == sorted(resultado['turno'].tolist(), reverse=True)
+            assert len(df[df['turno'].isin(['Manhã'])]) == 20
+            
+            # Busca por substring também em colunas categóricas
+            assert len(dm.search_records('cadastro', 'status', 'ativo')) == 39
+            assert len(dm.search_records('cadastro', 'ano_escolar', '9º')) == 10
+            print(f"✓ Backend {backend}: colunas categóricas preservadas nas escritas")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Colunas Categóricas: PASSOU")
+
+def test_categorical_memory():
+    """Colunas categóricas ocupam menos memória que uma string por linha"""
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        dm = DataManager(data_dir=os.path.join(temp_dir, 'data'))
+        dm.add_records('questionario_saeb', [
+            {'aluno_id': i, 'sexo': ['Masculino', 'Feminino'][i % 2], 'escola_interesse': 'Concordo totalmente'}
+            for i in range(1, 2001)
+        ])
+        dm.clear_cache()
+        df = dm.get_data('questionario_saeb')
+        como_texto = df.astype({c: object for c in CATEGORICAL_COLUMNS['questionario_saeb'] if c in df.columns})
+        assert df.memory_usage(deep=True).sum() * 4 < como_texto.memory_usage(deep=True).sum()
+        print("✓ Memória reduzida com colunas categóricas")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def test_typed_columns_round_trip():
+    """Datas convertidas na carga, gravadas de volta no texto canônico"""
+    print("="*70)
+    print("TESTE: COLUNAS TIPADAS")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        for backend in ['csv', 'sqlite']:
+            data_dir = os.path.join(temp_dir, backend, 'data')
+            dm = DataManager(data_dir=data_dir, backend=backend)
+            dm.add_records('cadastro', [
+                {'nome_completo': f'Aluno {i}', 'data_nascimento': f'201{i % 4}-0{1 + i % 9}-15',
+                 'status': 'Ativo'}
+                for i in range(1, 11)
+            ])
+            dm.add_records('attendance', [
+                {'aluno_id': i, 'data': f'2026-03-{i:02d}', 'confianca': '0.9',
+                 'data_registro': f'2026-03-{i:02d} 07:30:00'}
+                for i in range(1, 11)
+            ])
+            
+            df = dm.get_data('cadastro')
+            presencas = dm.get_data('attendance')
+            assert str(df['data_nascimento'].dtype) == 'datetime64[ns]'
+            assert str(presencas['data_registro'].dtype) == 'datetime64[ns]'
+            assert presencas['confianca'].dtype == 'float64'
+            assert dm.get_record('attendance', 1)['confianca'] == '0.9'
+            assert presencas.to_dict('records')[0]['confianca'] == 0.9
+            
+            # Filtro de intervalo vetorizado sobre datetime64
+            assert len(dm.get_data_range('attendance', '2026-03-03', '2026-03-05')) == 3
+            assert len(presencas[presencas['data'] >= '2026-03-08']) == 3
+            
+            # Busca por substring no texto das datas
+            assert len(dm.search_records('cadastro', 'data_nascimento', '2010')) == 2
+            assert len(dm.search_records('attendance', 'data_registro', '03-05 07:30')) == 1
+            
+            # Registros e índices continuam com o texto do armazenamento
+            assert dm.get_record('cadastro', 1)['data_nascimento'] == '2011-02-15'
+            assert dm.get_record('attendance', 2)['data_registro'] == '2026-03-02 07:30:00'
+            
+            # Atualização com data válida mantém o tipo; gravado no formato canônico
+            dm.update_record('cadastro', 1, {'data_nascimento': '2012-12-01'})
+            dm.update_record('attendance', 1, {'confianca': '0.75'})
+            relido = DataManager(data_dir=data_dir, backend=backend)
+            assert dm.get_data('cadastro').equals(relido.get_data('cadastro'))
+            assert dm.get_data('attendance').equals(relido.get_data('attendance'))
+            assert relido._storage.load('cadastro')['data_nascimento'].tolist()[0] == '2012-12-01'
+            assert relido._storage.load('attendance')['data_registro'].tolist()[0] == '2026-03-01 07:30:00'
+            
+            # Outro formato reconhecível: convertido e gravado no formato canônico
+            dm.update_record('cadastro', 2, {'data_nascimento': '01/05/2010'})
+            dm.add_record('attendance', {'aluno_id': 1, 'data': '11/03/2026', 'confianca': '85.00%'})
+            assert str(dm.get_data('cadastro')['data_nascimento'].dtype) == 'datetime64[ns]'
+            assert dm.get_record('cadastro', 2)['data_nascimento'] == '2010-05-01'
+            relido = DataManager(data_dir=data_dir, backend=backend)
+            assert dm.get_data('cadastro').equals(relido.get_data('cadastro'))
+            assert dm.get_data('attendance').equals(relido.get_data('attendance'))
+            gravada = relido._storage.load('attendance').iloc[-1]
+            assert (gravada['data'], gravada['confianca']) == ('2026-03-11', '0.85')
+            
+            # Valor sem conversão é rejeitado; a coluna mantém o tipo
+            for operacao in [lambda: dm.add_record('attendance', {'aluno_id': 1, 'confianca': 'alta'}),
+                             lambda: dm.update_record('cadastro', 3, {'data_matricula': 'ontem'})]:
+                try:
+                    operacao()
+                    assert False, "valor inválido aceito"
+                except ValueError:
+                    pass
+            resultados = dm.add_records('attendance', [{'aluno_id': 1, 'data': 'amanhã'}])
+            assert resultados[0]['erro'] == "Valor inválido em data"
+            assert dm.get_data('attendance')['confianca'].dtype == 'float64'
+            print(f"✓ Backend {backend}: colunas tipadas na carga e texto canônico no armazenamento")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Colunas Tipadas: PASSOU")
+
+def test_typed_columns_legacy_values():
+    """Valores antigos fora do formato não mudam o tipo da coluna nem se perdem nas reescritas"""
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        data_dir = os.path.join(temp_dir, 'data')
+        dm = DataManager(data_dir=data_dir)
+        dm.add_records('cadastro', [
+            {'nome_completo': f'Aluno {i}', 'data_nascimento': '2012-01-01', 'status': 'Ativo'}
+            for i in range(1, 4)
+        ])
+        caminho = dm.files['cadastro']
+        texto = open(caminho, encoding='utf-8').read()
+        texto = texto.replace('2012-01-01', '15/03/2011', 1).replace('2012-01-01', 'não informada', 1)
+        with open(caminho, 'w', encoding='utf-8') as f:
+            f.write(texto)
+        
+        dm = DataManager(data_dir=data_dir)
+        df = dm.get_data('cadastro')
+        assert str(df['data_nascimento'].dtype) == 'datetime64[ns]'
+        assert [d.strftime('%Y-%m-%d') if pd.notna(d) else None for d in df['data_nascimento']] == \
+            ['2011-03-15', None, '2012-01-01']
+        print("✓ Datas antigas em outro formato convertidas; sem conversão viram NaT")
+        
+        # Reescritas da tabela (atualização de outro aluno, transação) mantêm o texto original
+        def gravadas():
+            return pd.read_csv(caminho, dtype=str, keep_default_na=False)['data_nascimento'].tolist()
+        
+        assert dm.update_record('cadastro', 3, {'nome_completo': 'Aluno Três'})
+        assert gravadas() == ['2011-03-15', 'não informada', '2012-01-01']
+        sucesso, _, erro = dm.execute_transaction([('update', 'cadastro', 1, {'nome_completo': 'Aluno Um'})])
+        assert sucesso, erro
+        assert gravadas() == ['2011-03-15', 'não informada', '2012-01-01']
+        
+        # Rollback não descarta o texto original; alterar a própria célula o substitui
+        sucesso, _, _ = dm.execute_transaction([
+            ('update', 'cadastro', 2, {'data_nascimento': '2011-02-01'}),
+            ('add', 'cadastro', {'nome_completo': 'Sem data'})
+        ])
+        assert not sucesso
+        dm.update_record('cadastro', 3, {'nome_completo': 'Aluno 3'})
+        assert gravadas() == ['2011-03-15', 'não informada', '2012-01-01']
+        dm.update_record('cadastro', 2, {'data_nascimento': '2011-02-01'})
+        assert gravadas() == ['2011-03-15', '2011-02-01', '2012-01-01']
+        print("✓ Valores sem conversão gravados de volta sem alteração")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def test_age_in_years():
+    """Idade completa calculada sobre a coluna de datas"""
+    nascimento = pd.to_datetime(pd.Series(['2010-03-15', '2010-03-16', '', '2020-01-01']), errors='coerce')
+    idades = age_in_years(nascimento, '2026-03-15')
+    assert idades.tolist() == [16, 15, pd.NA, 6]
+    print("✓ Idade em anos vetorizada")
+
+if __name__ == "__main__":
+    test_categorical_columns_survive_writes()
+    test_categorical_memory()
+    test_typed_columns_round_trip()
+    test_typed_columns_legacy_values()
+    test_age_in_years()
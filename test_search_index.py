@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Testes do índice de trigramas usado nas buscas por nome
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_manager import DataManager
+from search_index import TrigramIndex, normalize_text
+
+def test_trigram_index():
+    """Busca por substring sem acentos/maiúsculas e manutenção incremental"""
+    print("="*70)
+    print("TESTE: ÍNDICE DE TRIGRAMAS")
+    print("="*70)
+    
+    assert normalize_text('  JOÃO   da Conceição ') == 'joao da conceicao'
+    
+    indice = TrigramIndex()
+    indice.add(1, 'João da Silva')
+    indice.add(2, 'Maria Conceição')
+    indice.add(3, 'Joana Silveira')
+    
+    assert indice.search('silva') == {1}
+    assert indice.search('SILV') == {1, 3}
+    assert indice.search('conceicao') == {2}
+    assert indice.search('jo') == {1, 3}
+    assert indice.search('xyz') == set()
+    print("✓ Substring sem diferenciar acentos e maiúsculas")
+    
+    indice.add(1, 'João Pereira')
+    indice.remove(3)
+    assert indice.search('silv') == set()
+    assert indice.search('pereira') == {1}
+    assert len(indice) == 2
+    print("✓ Reindexação e remoção por registro")
+    
+    print("\n✅ Teste de Índice de Trigramas: PASSOU")
+
+def test_name_search_uses_trigram_index():
+    """search_by_name, search_records e QueryBuilder contains usam o índice"""
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        dm = DataManager(data_dir=os.path.join(temp_dir, 'data'))
+        for nome, social, mae in [('José Antônio Souza', '', 'Márcia Souza'),
+                                  ('Ana Beatriz Lima', 'Bia', 'Cláudia Lima'),
+                                  ('Antonio Carlos Reis', '', 'Lúcia Reis')]:
+            dm.add_record('cadastro', {'nome_completo': nome, 'nome_social': social, 'nome_mae': mae,
+                                       'data_nascimento': '2012-01-01', 'status': 'Ativo'})
+        
+        assert [r['id'] for r in dm.search_by_name('antonio')] == [1, 3]
+        assert [r['id'] for r in dm.search_by_name('BIA')] == [2]
+        assert dm.search_records('cadastro', 'nome_mae', 'claudia')['id'].tolist() == [2]
+        assert dm.query('cadastro').where('nome_completo', 'contains', 'SOUZA').execute()['id'].tolist() == [1]
+        print("✓ Buscas por nome, nome social e nome da mãe pelo índice")
+        
+        # Inserções, atualizações e exclusões mantêm o índice sem reconstruir
+        dm.add_record('cadastro', {'nome_completo': 'Antônia Ferreira', 'data_nascimento': '2012-01-01',
+                                   'status': 'Ativo'})
+        dm.update_record('cadastro', 1, {'nome_completo': 'José Souza'})
+        dm.delete_record('cadastro', 3)
+        indice = dm._indexes['cadastro']['texto']['nome_completo']
+        assert [r['id'] for r in dm.search_by_name('antoni')] == [4]
+        assert dm._indexes['cadastro']['texto']['nome_completo'] is indice
+        print("✓ Índice mantido incrementalmente")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_trigram_index()
+    test_name_search_uses_trigram_index()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Testes das sequências de ID persistidas por tabela
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+from data_manager import DataManager
+
+def _alocar_em_processo(args):
+    """Executado em outro processo: reserva IDs um a um"""
+    data_dir, backend, quantidade = args
+    dm = DataManager(data_dir=data_dir, backend=backend)
+    return [dm.allocate_ids('attendance')[0] for _ in range(quantidade)]
+
+def test_sequences_are_monotonic_and_persisted():
+    """IDs crescem sem reutilização, em blocos, e sobrevivem a uma nova instância"""
+    print("="*70)
+    print("TESTE: SEQUÊNCIAS DE ID")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        for backend in ['csv', 'sqlite']:
+            data_dir = os.path.join(temp_dir, backend, 'data')
+            dm = DataManager(data_dir=data_dir, backend=backend)
+            
+            primeiro = dm.add_record('attendance', {'aluno_id': 1, 'data': '2026-03-02'})
+            segundo = dm.add_record('attendance', {'aluno_id': 1, 'data': '2026-03-03'})
+            assert (primeiro, segundo) == (1, 2)
+            
+            # Excluir o último registro não libera o ID
+            dm.delete_record('attendance', segundo)
+            assert dm.add_record('attendance', {'aluno_id': 1, 'data': '2026-03-04'}) == 3
+            
+            # Bloco para inserções em lote
+            assert list(dm.allocate_ids('attendance', 3)) == [4, 5, 6]
+            
+            # ID reservado é usado pelo add_record
+            reservado = dm.allocate_ids('cadastro')[0]
+            assert dm.add_record('cadastro', {'id': reservado, 'nome_completo': 'Reservado',
+                                              'data_nascimento': '2012-01-01', 'status': 'Ativo'}) == reservado
+            
+            # IDs gravados fora do alocador (save_data) não são entregues de novo
+            df = dm.get_data('attendance')
+            extra = pd.DataFrame([{'id': 50, 'aluno_id': 2, 'data': '2026-03-05'}])
+            dm.save_data('attendance', pd.concat([df, extra], ignore_index=True))
+            assert DataManager(data_dir=data_dir, backend=backend).allocate_ids('attendance')[0] == 51
+            print(f"✓ Backend {backend}: IDs monotônicos, em bloco e persistidos")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Sequências de ID: PASSOU")
+
+def test_sequences_are_safe_across_processes():
+    """Processos concorrentes nunca recebem o mesmo ID"""
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        for backend in ['csv', 'sqlite']:
+            data_dir = os.path.join(temp_dir, backend, 'data')
+            DataManager(data_dir=data_dir, backend=backend)
+            
+            with multiprocessing.get_context('spawn').Pool(3) as pool:
+                resultados = pool.map(_alocar_em_processo, [(data_dir, backend, 20)] * 3)
+            
+            ids = [i for lote in resultados for i in lote]
+            assert sorted(ids) == list(range(1, 61))
+            print(f"✓ Backend {backend}: 3 processos, 60 IDs distintos")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_sequences_are_monotonic_and_persisted()
+    test_sequences_are_safe_across_processes()
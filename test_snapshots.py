@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Testes das leituras com snapshot (versões das tabelas fixadas durante a leitura)
+"""
+
+import sys
+import os
+import gc
+import shutil
+import tempfile
+import threading
+import weakref
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_manager import DataManager
+
+def _em_thread(func):
+    """Roda func em outra thread e espera o fim"""
+    erros = []
+    def alvo():
+        try:
+            func()
+        except Exception as e:  # noqa: BLE001 - reportado pela thread principal
+            erros.append(repr(e))
+    thread = threading.Thread(target=alvo)
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive() and erros == [], erros
+
+def _popular(dm):
+    dm.add_records('cadastro', [
+        {'nome_completo': f'Aluno {i}', 'data_nascimento': '2012-01-01', 'status': 'Ativo',
+         'cpf': f'{i:011d}'}
+        for i in range(1, 11)
+    ])
+    dm.add_records('pei', [{'aluno_id': i, 'necessidade_especial': 'Não'} for i in range(1, 11)])
+
+def test_snapshot_pins_versions():
+    """Tabelas lidas na snapshot ficam na versão da abertura, mesmo com escritas de outras threads"""
+    print("="*70)
+    print("TESTE: LEITURAS COM SNAPSHOT")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        for backend in ['csv', 'sqlite']:
+            data_dir = os.path.join(temp_dir, backend, 'data')
+            dm = DataManager(data_dir=data_dir, backend=backend)
+            _popular(dm)
+            
+            with dm.snapshot() as snapshot:
+                cadastro = dm.get_data('cadastro')
+                versao = weakref.ref(snapshot.tables['cadastro'])
+                assert snapshot.pinned_tables() == ['cadastro']
+                
+                # Transação de outra thread: cadastro (já lido) e pei (ainda não lido)
+                _em_thread(lambda: dm.execute_transaction([
+                    ('update', 'cadastro', 2, {'nome_completo': 'Renomeado'}),
+                    ('delete', 'pei', 2),
+                    ('add', 'pei', {'aluno_id': 11, 'necessidade_especial': 'Sim'})
+                ]))
+                
+                # Mesmo instante para as duas tabelas: antes da transação
+                assert dm.get_data('cadastro').equals(cadastro)
+                assert dm.get_record('cadastro', 2)['nome_completo'] == 'Aluno 2'
+                assert dm.get_record_by_cpf('00000000002')['nome_completo'] == 'Aluno 2'
+                assert [r['nome_completo'] for r in dm.search_by_name('renomeado')] == []
+                assert len(dm.search_by_name('Aluno 2')) == 1
+                assert len(dm.get_data('pei')) == 10 and len(dm.get_by_aluno('pei', 2)) == 1
+                assert len(dm.query('pei').where('aluno_id', '=', 11).execute()) == 0
+                stats = dm.get_cache_stats()['snapshots']
+                assert stats == {'open': 1, 'retained_versions': 2}
+                
+                # Fora da snapshot (outra thread) já vale a versão nova
+                atual = {}
+                _em_thread(lambda: atual.update(registro=dm.get_record('cadastro', 2),
+                                                pei=len(dm.get_data('pei'))))
+                assert atual['registro']['nome_completo'] == 'Renomeado' and atual['pei'] == 10
+            
+            # Versão antiga liberada ao fechar a snapshot
+            del cadastro
+            gc.collect()
+            assert versao() is None
+            assert dm.get_cache_stats()['snapshots'] == {'open': 0, 'retained_versions': 0}
+            assert dm.get_record('cadastro', 2)['nome_completo'] == 'Renomeado'
+            assert len(dm.get_by_aluno('pei', 11)) == 1
+            print(f"✓ Backend {backend}: snapshot com versões consistentes, liberadas ao fechar")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def test_snapshot_own_writes_and_uncached_tables():
+    """A própria thread vê suas escritas; tabelas fora do cache são preservadas antes de regravar"""
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        data_dir = os.path.join(temp_dir, 'data')
+        dm = DataManager(data_dir=data_dir)
+        _popular(dm)
+        dm.clear_cache()
+        
+        with dm.snapshot():
+            assert len(dm.get_data('cadastro')) == 10
+            
+            # pei fora do cache e ainda não lido: regravado por outra thread
+            def regravar():
+                novo = dm.get_data('pei').iloc[:3]
+                dm.clear_cache()
+                dm.save_data('pei', novo)
+            _em_thread(regravar)
+            assert len(dm.get_data('pei')) == 10
+            
+            # Escrita da própria thread: as leituras seguintes veem o estado novo
+            novo_id = dm.add_record('cadastro', {'nome_completo': 'Aluno Novo',
+                                                 'data_nascimento': '2012-01-01', 'status': 'Ativo'})
+            assert dm.get_record('cadastro', novo_id)['nome_completo'] == 'Aluno Novo'
+            assert len(dm.get_data('cadastro')) == 11 and len(dm.get_data('pei')) == 3
+            
+            # Snapshot aninhada reutiliza a externa
+            with dm.snapshot() as interna:
+                assert interna.pinned_tables() == ['cadastro', 'pei']
+        
+        print("✓ Escritas da própria thread visíveis; tabela fora do cache preservada")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def test_reads_proceed_during_transaction_commit():
+    """Durante a gravação do commit de uma transação as leituras não esperam"""
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        data_dir = os.path.join(temp_dir, 'data')
+        dm = DataManager(data_dir=data_dir)
+        _popular(dm)
+        dm.get_data('pei')
+        
+        gravando = threading.Event()
+        liberar = threading.Event()
+        commit_tables = dm._storage.commit_tables
+        def commit_lento(journal):
+            gravando.set()
+            assert liberar.wait(5)
+            commit_tables(journal)
+        dm._storage.commit_tables = commit_lento
+        
+        resultado = []
+        transacao = threading.Thread(target=lambda: resultado.append(dm.execute_transaction([
+            ('update', 'cadastro', 1, {'nome_completo': 'Renomeado'}),
+            ('add', 'pei', {'aluno_id': 1, 'necessidade_especial': 'Sim'})
+        ])))
+        transacao.start()
+        assert gravando.wait(5)
+        
+        # Leituras durante o commit: versão anterior à transação, sem bloquear
+        leituras = {}
+        _em_thread(lambda: leituras.update(nome=dm.get_record('cadastro', 1)['nome_completo'],
+                                           pei=len(dm.get_by_aluno('pei', 1))))
+        assert leituras == {'nome': 'Aluno 1', 'pei': 1}
+        
+        liberar.set()
+        transacao.join(5)
+        dm._storage.commit_tables = commit_tables
+        assert resultado[0][0] and resultado[0][2] is None
+        assert dm.get_record('cadastro', 1)['nome_completo'] == 'Renomeado'
+        assert len(dm.get_by_aluno('pei', 1)) == 2
+        print("✓ Leituras durante o commit da transação veem a versão anterior")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Snapshots: PASSOU")
+
+if __name__ == "__main__":
+    test_snapshot_pins_versions()
+    test_snapshot_own_writes_and_uncached_tables()
+    test_reads_proceed_during_transaction_commit()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Testes dos engines de armazenamento do DataManager (CSV e SQLite)
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_manager import DataManager
+
+def _crud_basico(dm):
+    """Executa o mesmo fluxo de CRUD e retorna o estado final das tabelas"""
+    aluno_id = dm.add_record('cadastro', {
+        'nome_completo': 'Carla Backend',
+        'data_nascimento': '2011-05-20',
+        'status': 'Ativo',
+        'cpf': '987.654.321-00'
+    })
+    dm.add_record('pei', {'aluno_id': aluno_id, 'necessidade_especial': 'Sim'})
+    dm.update_record('cadastro', aluno_id, {'turno': 'Vespertino'})
+    
+    outro_id = dm.add_record('cadastro', {
+        'nome_completo': 'Removido Backend',
+        'data_nascimento': '2011-05-20',
+        'status': 'Ativo'
+    })
+    dm.delete_record('cadastro', outro_id)
+    
+    sucesso, _, erro = dm.execute_transaction([
+        ('add', 'saude', {'aluno_id': aluno_id}),
+        ('add', 'cadastro', {})  # Falha de validação: nada deve ser gravado
+    ])
+    assert not sucesso and erro
+    
+    return aluno_id
+
+def test_sqlite_backend_matches_csv():
+    """O backend SQLite expõe a mesma API e o mesmo resultado do CSV"""
+    print("="*70)
+    print("TESTE: BACKEND SQLITE x CSV")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        resultados = {}
+        for backend in ['csv', 'sqlite']:
+            dm = DataManager(data_dir=os.path.join(temp_dir, backend, 'data'), backend=backend)
+            aluno_id = _crud_basico(dm)
+            
+            # Recarrega do armazenamento com uma nova instância
+            dm_novo = DataManager(data_dir=dm.data_dir, backend=backend)
+            cadastro = dm_novo.get_data('cadastro')
+            assert len(cadastro) == 1
+            assert dm_novo.get_record('cadastro', aluno_id)['turno'] == 'Vespertino'
+            assert len(dm_novo.get_data('saude')) == 0
+            assert dm_novo.get_all_student_data(aluno_id)['pei']['necessidade_especial'] == 'Sim'
+            resultados[backend] = cadastro.drop(columns=['data_matricula'])
+            print(f"✓ Backend {backend}: CRUD e transação com rollback")
+        
+        assert resultados['csv'].equals(resultados['sqlite'])
+        print("✓ Mesmo conteúdo nos dois backends")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Backends: PASSOU")
+
+def test_migration_and_backup_roundtrip():
+    """Migração CSV → SQLite e backup/restauração no backend SQLite"""
+    from scripts.migrate_csv_to_sqlite import migrate_csv_to_sqlite
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        data_dir = os.path.join(temp_dir, 'data')
+        dm_csv = DataManager(data_dir=data_dir)
+        aluno_id = dm_csv.add_record('cadastro', {
+            'nome_completo': 'Diego Migração',
+            'data_nascimento': '2012-02-02',
+            'status': 'Ativo'
+        })
+        ultimo = dm_csv.add_record('cadastro', {
+            'nome_completo': 'Apagado Antes',
+            'data_nascimento': '2012-03-03',
+            'status': 'Ativo'
+        })
+        dm_csv.delete_record('cadastro', ultimo)
+        
+        migrados = migrate_csv_to_sqlite(data_dir)
+        assert migrados['cadastro'] == 1
+        
+        dm = DataManager(data_dir=data_dir, backend='sqlite')
+        assert dm.get_record('cadastro', aluno_id)['nome_completo'] == 'Diego Migração'
+        print("✓ Migração preservou os registros")
+        
+        novo_id = dm.add_record('cadastro', {
+            'nome_completo': 'Depois da Migração',
+            'data_nascimento': '2012-04-04',
+            'status': 'Ativo'
+        })
+        assert novo_id == ultimo + 1
+        dm.delete_record('cadastro', novo_id)
+        print("✓ Migração preservou a sequência de IDs")
+        
+        backup_path = dm.create_backup()
+        dm.delete_record('cadastro', aluno_id)
+        assert len(dm.get_data('cadastro')) == 0
+        
+        sucesso, mensagem = dm.restore_backup(backup_path)
+        assert sucesso, mensagem
+        assert dm.get_record('cadastro', aluno_id)['nome_completo'] == 'Diego Migração'
+        print("✓ Backup e restauração no backend SQLite")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def test_cache_revalidation_sees_external_writes():
+    """O cache só é relido quando outro processo/instância altera a tabela"""
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        for backend in ['csv', 'sqlite']:
+            data_dir = os.path.join(temp_dir, backend, 'data')
+            dm = DataManager(data_dir=data_dir, backend=backend)
+            outro = DataManager(data_dir=data_dir, backend=backend)
+            
+            # Conta as leituras feitas pelo engine
+            leituras = []
+            load_original = dm._storage.load
+            dm._storage.load = lambda tipo: leituras.append(tipo) or load_original(tipo)
+            
+            assert len(dm.get_data('attendance')) == 0
+            dm.get_data('attendance')
+            dm.get_data('attendance')
+            assert leituras == ['attendance']
+            
+            # Escrita de outra instância aparece no próximo acesso, sem esperar TTL
+            outro.add_record('attendance', {'aluno_id': 1, 'data': '2026-03-02'})
+            assert len(dm.get_data('attendance')) == 1
+            assert leituras == ['attendance', 'attendance']
+            
+            # Escrita própria (append) mantém o cache válido
+            dm.add_record('attendance', {'aluno_id': 2, 'data': '2026-03-02'})
+            assert len(dm.get_data('attendance')) == 2
+            assert leituras == ['attendance', 'attendance']
+            print(f"✓ Backend {backend}: cache revalidado pela assinatura do armazenamento")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_sqlite_backend_matches_csv()
+    test_migration_and_backup_roundtrip()
+    test_cache_revalidation_sees_external_writes()
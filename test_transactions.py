@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Testes do journal de transações do DataManager (backend CSV)
+"""
+
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+from data_manager import DataManager
+from storage import JOURNAL_FILENAME
+
+def test_transaction_one_write_per_table():
+    """Matrícula multi-tabela grava cada tabela uma única vez; rollback não grava nada"""
+    print("="*70)
+    print("TESTE: JOURNAL DE TRANSAÇÕES")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        dm = DataManager(data_dir=os.path.join(temp_dir, 'data'))
+        
+        # Conta as gravações feitas pelo engine
+        commits = []
+        commit_original = dm._storage.commit_tables
+        def commit_contado(tables):
+            commits.append(sorted(tables))
+            commit_original(tables)
+        dm._storage.commit_tables = commit_contado
+        
+        sucesso, resultados, erro = dm.execute_transaction([
+            ('add', 'cadastro', {'nome_completo': 'Eva Journal', 'data_nascimento': '2010-01-01',
+                                 'status': 'Ativo'}),
+            ('add', 'pei', {'aluno_id': 1, 'necessidade_especial': 'Sim'}),
+            ('add', 'socioeconomico', {'aluno_id': 1}),
+            ('add', 'saude', {'aluno_id': 1}),
+            ('update', 'cadastro', 1, {'turno': 'Noturno'}),
+        ])
+        assert sucesso, erro
+        assert commits == [['cadastro', 'pei', 'saude', 'socioeconomico']]
+        assert dm.get_record('cadastro', 1)['turno'] == 'Noturno'
+        print("✓ Uma escrita por tabela no commit")
+        
+        # Rollback: nenhuma escrita e nenhum arquivo alterado
+        # (arquivos das tabelas, incluindo cabeçalho e partições de attendance)
+        def ler_arquivos():
+            return {f: open(f, 'rb').read() for t in dm.files for f in dm._storage._table_files(t)}
+        conteudo_antes = ler_arquivos()
+        sucesso, _, erro = dm.execute_transaction([
+            ('add', 'cadastro', {'nome_completo': 'Não Gravado', 'data_nascimento': '2010-01-01',
+                                 'status': 'Ativo'}),
+            ('delete', 'pei', 1),
+            ('operacao_invalida', 'saude'),
+        ])
+        assert not sucesso and 'Operação inválida' in erro
+        assert len(commits) == 1
+        assert conteudo_antes == ler_arquivos()
+        assert len(dm.get_data('cadastro')) == 1
+        print("✓ Rollback descartou o journal sem tocar no disco")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Journal de Transações: PASSOU")
+
+def test_interrupted_commit_is_recovered():
+    """Um commit interrompido entre os renames é completado na inicialização"""
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        data_dir = os.path.join(temp_dir, 'data')
+        dm = DataManager(data_dir=data_dir)
+        
+        # Simula a queda: temporários e journal gravados, renames não executados
+        pendentes = []
+        for tipo in ['pei', 'saude']:
+            df = pd.DataFrame([{'id': 1, 'aluno_id': 7}], columns=dm.get_data(tipo).columns)
+            pendentes.append((dm._storage._write_temp(tipo, df), dm.files[tipo]))
+        with open(os.path.join(data_dir, JOURNAL_FILENAME), 'w', encoding='utf-8') as f:
+            json.dump({'renames': pendentes}, f)
+        
+        dm = DataManager(data_dir=data_dir)
+        assert dm.get_data('pei')['aluno_id'].tolist() == [7]
+        assert dm.get_data('saude')['aluno_id'].tolist() == [7]
+        assert not os.path.exists(os.path.join(data_dir, JOURNAL_FILENAME))
+        assert not [n for n in os.listdir(data_dir) if n.endswith('.tmp')]
+        print("✓ Commit interrompido completado pelo journal")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_transaction_one_write_per_table()
+    test_interrupted_commit_is_recovered()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Testes do modo write-behind (inserções de presença agrupadas em uma escrita)
+"""
+
+import sys
+import os
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_manager import DataManager
+
+def _linhas_gravadas(data_dir, backend):
+    """Linhas de presença efetivamente no armazenamento (instância sem cache)"""
+    return len(DataManager(data_dir=data_dir, backend=backend).get_data('attendance'))
+
+def test_write_behind_buffers_and_flushes():
+    """Inserções visíveis na hora, gravadas em lote por tamanho, por tempo e no close()"""
+    print("="*70)
+    print("TESTE: WRITE-BEHIND")
+    print("="*70)
+    
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        for backend in ['csv', 'sqlite']:
+            data_dir = os.path.join(temp_dir, backend, 'data')
+            dm = DataManager(data_dir=data_dir, backend=backend, write_behind=['attendance'],
+                             flush_interval_ms=60000, flush_max_rows=5)
+            dm.get_data('attendance')
+            
+            escritas = []
+            append_original = dm._storage.append_rows
+            dm._storage.append_rows = lambda *args: escritas.append(len(args[1])) or append_original(*args)
+            
+            ids = [dm.add_record('attendance', {'aluno_id': 7, 'data': '2026-03-02', 'hora': f'07:0{i}'})
+                   for i in range(3)]
+            assert escritas == [] and _linhas_gravadas(data_dir, backend) == 0
+            assert len(dm.get_data('attendance')) == 3
+            assert dm.get_by_aluno('attendance', 7)['id'].tolist() == ids
+            assert dm.get_cache_stats()['pending_writes'] == {'attendance': 3}
+            
+            # O buffer continua visível quando o cache é recarregado
+            dm.clear_cache()
+            assert dm.get_record('attendance', ids[1])['hora'] == '07:01'
+            print(f"✓ Backend {backend}: inserções visíveis antes da gravação")
+            
+            # Atualizar uma linha do buffer não a duplica no armazenamento
+            dm.update_record('attendance', ids[0], {'hora': '08:00'})
+            assert dm.flush() == 0
+            assert _linhas_gravadas(data_dir, backend) == 3
+            
+            # Ao atingir flush_max_rows o lote é gravado em uma escrita
+            escritas.clear()
+            for i in range(5):
+                dm.add_record('attendance', {'aluno_id': 8, 'data': '2026-03-02', 'hora': '07:30'})
+            assert escritas == [5]
+            assert _linhas_gravadas(data_dir, backend) == 8
+            
+            # close() grava o que restou
+            dm.add_record('attendance', {'aluno_id': 9, 'data': '2026-03-02', 'hora': '07:45'})
+            dm.close()
+            novo = DataManager(data_dir=data_dir, backend=backend)
+            df = novo.get_data('attendance')
+            assert sorted(df['id'].tolist()) == list(range(1, 10))
+            assert df[df['id'] == ids[0]]['hora'].tolist() == ['08:00']
+            assert dm.get_data('attendance').equals(df)
+            print(f"✓ Backend {backend}: gravação por tamanho do lote e no close(), sem duplicatas")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("\n✅ Teste de Write-Behind: PASSOU")
+
+def test_write_behind_flushes_on_interval():
+    """A thread de flush grava o buffer após flush_interval_ms"""
+    temp_dir = tempfile.mkdtemp(prefix='matricula_test_')
+    try:
+        data_dir = os.path.join(temp_dir, 'data')
+        dm = DataManager(data_dir=data_dir, write_behind=['attendance'],
+                         flush_interval_ms=50, durability='fsync')
+        dm.add_record('attendance', {'aluno_id': 1, 'data': '2026-03-02'})
+        
+        limite = time.time() + 5
+        while _linhas_gravadas(data_dir, 'csv') == 0 and time.time() < limite:
+            time.sleep(0.05)
+        assert _linhas_gravadas(data_dir, 'csv') == 1
+        assert dm.get_cache_stats()['pending_writes'] == {}
+        dm.close()
+        print("✓ Buffer gravado pela thread de flush")
+        
+        try:
+            DataManager(data_dir=data_dir, durability='nunca')
+            assert False, "Durabilidade inválida aceita"
+        except ValueError:
+            pass
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_write_behind_buffers_and_flushes()
+    test_write_behind_flushes_on_interval()